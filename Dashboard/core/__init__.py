@@ -0,0 +1,4 @@
+# =========================================================
+# CORE – shared data & risk engine for the Risk Terminal
+# Used by the Dashboard pages and the batch (notebook) jobs
+# =========================================================
@@ -0,0 +1,133 @@
+# =========================================================
+# ROLLING BETA / ALPHA / CORRELATION TO THE MARKET
+# Every ticker against one benchmark return series — by default
+# the equal-weight portfolio (Portfolio_All_Daily_Return) — for
+# several windows at once. Window cross-moments come from shared
+# cumulative sums, so the cost is O(N·T) per window.
+# =========================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .manifest import record
+from .paths import ROLLING_BETA_CSV
+from .rolling import padded_cumsum
+
+BETA_WINDOWS = (20, 60, 120)
+
+# share of a window's days both series must have for a value
+MIN_COVERAGE = 0.8
+
+
+def equal_weight_returns(returns):
+    """Portfolio_All_Daily_Return: the cross-sectional mean of daily returns."""
+    r = np.asarray(returns, dtype=np.float64)
+    valid = ~np.isnan(r)
+    total = np.where(valid, r, 0.0).sum(axis=1)
+    count = valid.sum(axis=1)
+    return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def rolling_beta(returns, benchmark=None, windows=BETA_WINDOWS, min_periods=None):
+    """
+    Rolling OLS of each (T, N) return column on a (T,) benchmark.
+
+    Returns a dict of (W, T, N) arrays — `beta`, `alpha` (daily
+    intercept), `corr` and `n` (pairs in the window) — with a
+    window's value on its last row. A window uses the days on which
+    both series exist and is NaN with fewer than `min_periods`
+    pairs (default: MIN_COVERAGE of the window).
+    """
+    y = np.asarray(returns, dtype=np.float64)
+    if y.ndim == 1:
+        y = y[:, None]
+    x = equal_weight_returns(y) if benchmark is None else np.asarray(benchmark, dtype=np.float64)
+    T, N = y.shape
+
+    valid = ~np.isnan(y) & ~np.isnan(x)[:, None]
+    # centre both series so the cross-moment sums stay well conditioned
+    x_c = x - np.nanmean(x)
+    y_c = y - np.nanmean(y, axis=0)
+    xv = np.where(valid, x_c[:, None], 0.0)
+    yv = np.where(valid, y_c, 0.0)
+
+    cs = {
+        "n": padded_cumsum(valid.astype(np.float64)),
+        "x": padded_cumsum(xv),
+        "y": padded_cumsum(yv),
+        "xx": padded_cumsum(xv * xv),
+        "yy": padded_cumsum(yv * yv),
+        "xy": padded_cumsum(xv * yv),
+    }
+
+    out = {k: np.full((len(windows), T, N), np.nan) for k in ("beta", "alpha", "corr", "n")}
+    for wi, w in enumerate(windows):
+        if w > T:
+            continue
+        s = {k: v[w:] - v[:-w] for k, v in cs.items()}
+        n = s["n"]
+        enough = n >= (np.ceil(MIN_COVERAGE * w) if min_periods is None else min_periods)
+        n_safe = np.where(enough, n, np.nan)
+
+        mean_x = s["x"] / n_safe
+        mean_y = s["y"] / n_safe
+        var_x = s["xx"] - n_safe * mean_x ** 2
+        var_y = s["yy"] - n_safe * mean_y ** 2
+        cov = s["xy"] - n_safe * mean_x * mean_y
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            beta = cov / var_x
+            corr = cov / np.sqrt(var_x * var_y)
+        # intercept on the raw (un-centred) returns
+        alpha = (mean_y + np.nanmean(y, axis=0)) - beta * (mean_x + np.nanmean(x))
+
+        rows = slice(w - 1, T)
+        out["beta"][wi, rows] = beta
+        out["alpha"][wi, rows] = alpha
+        out["corr"][wi, rows] = np.clip(corr, -1.0, 1.0)
+        out["n"][wi, rows] = n
+    return out
+
+
+def beta_table(returns, tickers, benchmark=None, windows=BETA_WINDOWS):
+    """
+    Latest rolling `Beta_{w}D`, `Alpha_{w}D` (daily) and `Corr_{w}D`
+    per ticker, plus the full-sample `Beta_All` / `Corr_All`.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    x = equal_weight_returns(r) if benchmark is None else np.asarray(benchmark, dtype=np.float64)
+    roll = rolling_beta(r, x, windows)
+
+    table = {"Stock": list(tickers)}
+    for wi, w in enumerate(windows):
+        table[f"Beta_{w}D"] = roll["beta"][wi, -1]
+        table[f"Alpha_{w}D"] = roll["alpha"][wi, -1]
+        table[f"Corr_{w}D"] = roll["corr"][wi, -1]
+
+    full = rolling_beta(r, x, (len(r),), min_periods=2)
+    table["Beta_All"] = full["beta"][0, -1]
+    table["Corr_All"] = full["corr"][0, -1]
+    return pd.DataFrame(table)
+
+
+def cube_beta_table(cube):
+    """beta_table() over the cube's `Daily Return` history, stamped `As_Of`."""
+    table = beta_table(cube.field("Daily Return"), cube.tickers)
+    table.insert(1, "As_Of", pd.Timestamp(cube.dates[-1]).strftime("%Y-%m-%d"))
+    return table.round(6)
+
+
+def write_beta_table(cube, path=ROLLING_BETA_CSV):
+    """Persist cube_beta_table() and record it in the manifest."""
+    cube_beta_table(cube).to_csv(path, index=False)
+    record(os.path.basename(path), data_dir=os.path.dirname(path))
+    return path
+
+
+if __name__ == "__main__":
+    from .cube import ensure_cube, open_cube
+
+    write_beta_table(open_cube(ensure_cube()))
+    print(pd.read_csv(ROLLING_BETA_CSV).sort_values("Beta_60D").to_string(index=False))
@@ -0,0 +1,61 @@
+# =========================================================
+# DERIVED ARTIFACT BUILD
+# One-off (re)build of every model / state file the dashboard
+# reads but the notebooks do not write. The nightly job
+# (core.incremental) keeps them current afterwards. The page
+# loaders only read them, fitting in memory when one is missing.
+# =========================================================
+
+import sys
+import time
+
+from .beta import write_beta_table
+from .corr_store import ensure_corr_store
+from .cube import ensure_cube, open_cube
+from .garch import write_garch_results
+from .hmm import filter_from_cube
+from .model_registry import build_registry
+from .online import OnlineRiskBook
+from .paths import (
+    GARCH_RESULTS_CSV,
+    HMM_MODEL,
+    ONLINE_STATE,
+    ROLLING_BETA_CSV,
+    VOL_MODEL_REGISTRY,
+)
+
+# name → (artifact, builder(cube))
+BUILDERS = {
+    "beta": (ROLLING_BETA_CSV, write_beta_table),
+    "online": (ONLINE_STATE, lambda cube: OnlineRiskBook.from_cube(cube).snapshot()),
+    "garch": (GARCH_RESULTS_CSV, write_garch_results),
+    "registry": (VOL_MODEL_REGISTRY, build_registry),
+    "hmm": (HMM_MODEL, lambda cube: filter_from_cube(cube).save()),
+}
+
+
+def build_artifacts(names=None, progress=None):
+    """
+    Build the named artifacts (default: all) from the current clean
+    panel, after bringing the cube and correlation store up to date.
+    `progress(name, path, seconds)` is called after each.
+    """
+    cube = open_cube(ensure_cube())
+    ensure_corr_store()
+    for name in names or BUILDERS:
+        path, build = BUILDERS[name]
+        t0 = time.perf_counter()
+        build(cube)
+        if progress:
+            progress(name, path, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    unknown = [a for a in sys.argv[1:] if a not in BUILDERS]
+    if unknown:
+        sys.exit(f"usage: python -m core.build [{' | '.join(BUILDERS)} ...]")
+
+    def show(name, path, seconds):
+        print(f"{name:>8} → {path} ({seconds:.1f}s)")
+
+    build_artifacts(sys.argv[1:], show)
@@ -0,0 +1,174 @@
+# =========================================================
+# PACKED CORRELATION STORE
+# float32 upper triangle (diagonal included) of the stock ×
+# stock correlation matrix, row-major, plus a ticker index.
+# meta.json names the current content-addressed data file.
+# N(N+1)/2 cells instead of N² text cells; any sub-block is
+# gathered straight from the memmap without a dense rebuild.
+# =========================================================
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .manifest import is_current, stamp_derived
+from .paths import CORR_CSV, CORR_STORE_DIR
+
+TRIU_PREFIX = "corr_triu"
+TRIU_FILE = f"{TRIU_PREFIX}.f4"          # unversioned name from older stores
+META_FILE = "meta.json"
+
+DTYPE = np.float32
+
+
+def _row_offsets(n):
+    """Packed offset of (i, i) for every row i."""
+    i = np.arange(n, dtype=np.int64)
+    return i * n - i * (i - 1) // 2
+
+
+# =========================================================
+# BUILD
+# =========================================================
+def _pack(corr_df):
+    if list(corr_df.index) != list(corr_df.columns):
+        raise ValueError("Correlation matrix must have matching row/column tickers")
+
+    iu = np.triu_indices(len(corr_df))
+    return corr_df.to_numpy(dtype=np.float64)[iu].astype(DTYPE)
+
+
+def write_corr_store(corr_df, store_dir=CORR_STORE_DIR):
+    """Pack a square, ticker-indexed correlation frame."""
+    packed = _pack(corr_df)
+    os.makedirs(store_dir, exist_ok=True)
+
+    n = len(corr_df)
+
+    # the data file is named by its content and never overwritten, so
+    # swapping meta.json in is the single step that publishes a version
+    name = f"{TRIU_PREFIX}.{hashlib.sha256(packed.tobytes()).hexdigest()[:16]}.f4"
+    path = os.path.join(store_dir, name)
+    packed.tofile(f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+    meta = {
+        "n": n,
+        "dtype": np.dtype(DTYPE).str,
+        "packing": "upper",
+        "file": name,
+        "tickers": [str(t) for t in corr_df.index],
+    }
+    meta_path = os.path.join(store_dir, META_FILE)
+    with open(f"{meta_path}.tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+    # superseded versions; open maps keep their (unlinked) file alive
+    for old in os.listdir(store_dir):
+        if old.startswith(TRIU_PREFIX) and old.endswith(".f4") and old != name:
+            os.remove(os.path.join(store_dir, old))
+    return store_dir
+
+
+def build_corr_store(csv_path=CORR_CSV, store_dir=CORR_STORE_DIR):
+    """One-off conversion of the correlation CSV into the packed store."""
+    write_corr_store(pd.read_csv(csv_path, index_col=0), store_dir)
+    stamp_derived(store_dir, csv_path)
+    return store_dir
+
+
+def ensure_corr_store(csv_path=CORR_CSV, store_dir=CORR_STORE_DIR):
+    """Build the store on first use, or when the CSV content has changed."""
+    if is_current(store_dir, csv_path):
+        return store_dir
+
+    return build_corr_store(csv_path, store_dir)
+
+
+# =========================================================
+# READ
+# =========================================================
+class CorrStore:
+    """
+    Read-only view over the packed triangle.
+
+    Only the cells a request touches are paged in, so a 50-name
+    block out of a 3,000-name universe reads ~2,500 floats.
+    """
+
+    def __init__(self, packed, tickers):
+        self.packed = packed
+        self.tickers = tickers
+        self._idx = {t: i for i, t in enumerate(tickers)}
+        self._offsets = _row_offsets(len(tickers))
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def index_of(self, tickers):
+        return np.array([self._idx[t] for t in tickers], dtype=np.int64)
+
+    def _gather(self, rows, cols):
+        r, c = np.meshgrid(rows, cols, indexing="ij")
+        lo, hi = np.minimum(r, c), np.maximum(r, c)
+        return np.asarray(self.packed[self._offsets[lo] + (hi - lo)], dtype=np.float64)
+
+    def block(self, rows, cols=None):
+        """Correlation sub-block for ticker lists `rows` × `cols`."""
+        rows = list(rows)
+        cols = rows if cols is None else list(cols)
+        values = self._gather(self.index_of(rows), self.index_of(cols))
+        return pd.DataFrame(values, index=rows, columns=cols)
+
+    def pair(self, a, b):
+        i, j = sorted((self._idx[a], self._idx[b]))
+        return float(self.packed[self._offsets[i] + (j - i)])
+
+    def dense(self):
+        """Full N × N matrix as a ticker-indexed float64 frame."""
+        n = len(self.tickers)
+        out = np.empty((n, n), dtype=np.float64)
+        iu = np.triu_indices(n)
+        out[iu] = self.packed
+        out.T[iu] = self.packed
+        return pd.DataFrame(out, index=self.tickers, columns=self.tickers)
+
+
+def open_corr_store(store_dir=CORR_STORE_DIR):
+    """Map the packed triangle read-only."""
+    with open(os.path.join(store_dir, META_FILE)) as f:
+        meta = json.load(f)
+
+    n = meta["n"]
+    packed = np.memmap(
+        os.path.join(store_dir, meta.get("file", TRIU_FILE)),
+        dtype=np.dtype(meta["dtype"]),
+        mode="r",
+        shape=(n * (n + 1) // 2,)
+    )
+    return CorrStore(packed, meta["tickers"])
+
+
+def read_corr_store(csv_path=CORR_CSV, store_dir=CORR_STORE_DIR):
+    """
+    Map the built store when it matches the CSV, else pack the CSV
+    in memory. Never writes, for read-only callers.
+    """
+    if is_current(store_dir, csv_path):
+        return open_corr_store(store_dir)
+
+    corr_df = pd.read_csv(csv_path, index_col=0)
+    packed = _pack(corr_df)
+    packed.flags.writeable = False
+    return CorrStore(packed, [str(t) for t in corr_df.index])
+
+
+if __name__ == "__main__":
+    store = open_corr_store(build_corr_store())
+    size = store.packed.nbytes
+    print(f"Packed {len(store)} tickers into {size:,} bytes "
+          f"(CSV: {os.path.getsize(CORR_CSV):,} bytes)")
@@ -0,0 +1,245 @@
+# =========================================================
+# MEMORY-MAPPED PANEL CUBE
+# Date × Ticker × Field float64 array on disk + index sidecars.
+# Any ticker / field / date slice is a zero-copy np.memmap view.
+# meta.json names the current data and dates files.
+# =========================================================
+
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .manifest import is_current, stamp_derived
+from .paths import CLEAN_PANEL_CSV, PANEL_CUBE_DIR
+from .schema import DATE_COL, FIELDS, column_name, panel_tickers
+
+# unversioned names from older cubes; new writes add a version token
+CUBE_FILE = "cube.f8"
+DATES_FILE = "dates.npy"
+META_FILE = "meta.json"
+
+DTYPE = np.float64
+
+
+# =========================================================
+# BUILD
+# =========================================================
+def panel_to_cube(panel, tickers=None, fields=FIELDS):
+    """Reshape a wide `{TICKER}_{Field}` frame into a (T, N, F) array."""
+    if tickers is None:
+        tickers = panel_tickers(panel.columns)
+
+    T, N, F = len(panel), len(tickers), len(fields)
+    values = np.full((T, N, F), np.nan, dtype=DTYPE)
+
+    for i, t in enumerate(tickers):
+        for j, f in enumerate(fields):
+            col = column_name(t, f)
+            if col in panel.columns:
+                values[:, i, j] = panel[col].to_numpy(dtype=DTYPE)
+
+    return values, list(tickers), list(fields)
+
+
+def _versioned(name):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{uuid.uuid4().hex[:12]}{ext}"
+
+
+def _read_meta(cube_dir):
+    with open(os.path.join(cube_dir, META_FILE)) as f:
+        meta = json.load(f)
+    meta.setdefault("file", CUBE_FILE)
+    meta.setdefault("dates", DATES_FILE)
+    return meta
+
+
+def _save_dates(cube_dir, dates):
+    name = _versioned(DATES_FILE)
+    with open(os.path.join(cube_dir, name), "wb") as f:
+        np.save(f, dates)
+    return name
+
+
+def _publish(cube_dir, data_file, dates_file, shape, tickers, fields):
+    """
+    Swap in meta.json, the single step that makes a new version
+    visible, then drop superseded files (open maps keep their inode).
+    """
+    meta = {
+        "shape": list(shape),
+        "dtype": np.dtype(DTYPE).str,
+        "file": data_file,
+        "dates": dates_file,
+        "tickers": tickers,
+        "fields": fields,
+    }
+    path = os.path.join(cube_dir, META_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(f"{path}.tmp", path)
+
+    for name in os.listdir(cube_dir):
+        stale = (
+            name.startswith("cube.") and name.endswith(".f8") and name != data_file
+            or name.startswith("dates.") and name.endswith(".npy") and name != dates_file
+        )
+        if stale:
+            os.remove(os.path.join(cube_dir, name))
+
+
+def write_cube(panel, cube_dir=PANEL_CUBE_DIR, tickers=None, fields=FIELDS):
+    """
+    Write a wide panel frame as a cube + ticker/field/date sidecars,
+    into new files: sessions still mapping the old cube keep reading it.
+    """
+    os.makedirs(cube_dir, exist_ok=True)
+
+    values, tickers, fields = panel_to_cube(panel, tickers, fields)
+    dates = pd.to_datetime(panel[DATE_COL]).to_numpy(dtype="datetime64[ns]")
+
+    data_file = _versioned(CUBE_FILE)
+    values.tofile(os.path.join(cube_dir, data_file))
+    _publish(cube_dir, data_file, _save_dates(cube_dir, dates), values.shape, tickers, fields)
+    return cube_dir
+
+
+def append_cube(values, dates, cube_dir=PANEL_CUBE_DIR):
+    """Append (k, N, F) rows for new dates; earlier rows are untouched."""
+    cube = open_cube(cube_dir)
+    if values.shape[1:] != cube.shape[1:]:
+        raise ValueError(
+            f"Cannot append rows of shape {values.shape[1:]} "
+            f"to a cube of shape {cube.shape[1:]}"
+        )
+
+    # appending leaves every existing row (and map) where it was
+    meta = _read_meta(cube_dir)
+    with open(os.path.join(cube_dir, meta["file"]), "ab") as f:
+        np.ascontiguousarray(values, dtype=DTYPE).tofile(f)
+
+    all_dates = np.concatenate(
+        [cube.dates, np.asarray(dates, dtype="datetime64[ns]")]
+    )
+    _publish(
+        cube_dir,
+        meta["file"],
+        _save_dates(cube_dir, all_dates),
+        (len(all_dates),) + cube.shape[1:],
+        cube.tickers,
+        cube.fields
+    )
+    return cube_dir
+
+
+def build_cube(csv_path=CLEAN_PANEL_CSV, cube_dir=PANEL_CUBE_DIR):
+    """One-off conversion of the cleaned CSV into the cube."""
+    panel = pd.read_csv(csv_path, parse_dates=[DATE_COL])
+    write_cube(panel, cube_dir)
+    stamp_derived(cube_dir, csv_path)
+    return cube_dir
+
+
+def ensure_cube(csv_path=CLEAN_PANEL_CSV, cube_dir=PANEL_CUBE_DIR):
+    """Build the cube on first use, or when the CSV content has changed."""
+    if is_current(cube_dir, csv_path):
+        return cube_dir
+
+    return build_cube(csv_path, cube_dir)
+
+
+# =========================================================
+# READ
+# =========================================================
+class PanelCube:
+    """
+    Read-only view over the on-disk cube.
+
+    `values` is a (T, N, F) memmap; every accessor below returns a
+    view into it, so nothing is parsed or copied until it is used.
+    """
+
+    def __init__(self, values, dates, tickers, fields):
+        self.values = values
+        self.dates = dates
+        self.tickers = tickers
+        self.fields = fields
+        self._ticker_idx = {t: i for i, t in enumerate(tickers)}
+        self._field_idx = {f: j for j, f in enumerate(fields)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def ticker_index(self, ticker):
+        return self._ticker_idx[ticker]
+
+    def field_index(self, field):
+        return self._field_idx[field]
+
+    def field(self, field):
+        """(T, N) view of one field across all tickers."""
+        return self.values[:, :, self._field_idx[field]]
+
+    def ticker(self, ticker):
+        """(T, F) view of every field for one ticker."""
+        return self.values[:, self._ticker_idx[ticker], :]
+
+    def series(self, ticker, field):
+        """(T,) view of one ticker's field."""
+        return self.values[:, self._ticker_idx[ticker], self._field_idx[field]]
+
+    def date_slice(self, start=None, end=None):
+        """Row slice covering [start, end], for use on any view above."""
+        lo = 0 if start is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(start), "ns"), side="left"
+        )
+        hi = len(self.dates) if end is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(end), "ns"), side="right"
+        )
+        return slice(int(lo), int(hi))
+
+    def field_frame(self, field, rows=slice(None)):
+        """Date-indexed DataFrame wrapper around a field view (no copy)."""
+        return pd.DataFrame(
+            self.field(field)[rows],
+            index=pd.DatetimeIndex(self.dates[rows], name=DATE_COL),
+            columns=self.tickers,
+            copy=False
+        )
+
+
+def open_cube(cube_dir=PANEL_CUBE_DIR):
+    """Map the cube read-only; the OS page cache is shared across processes."""
+    meta = _read_meta(cube_dir)
+    values = np.memmap(
+        os.path.join(cube_dir, meta["file"]),
+        dtype=np.dtype(meta["dtype"]),
+        mode="r",
+        shape=tuple(meta["shape"])
+    )
+    dates = np.load(os.path.join(cube_dir, meta["dates"]))
+    return PanelCube(values, dates, meta["tickers"], meta["fields"])
+
+
+def read_cube(csv_path=CLEAN_PANEL_CSV, cube_dir=PANEL_CUBE_DIR):
+    """
+    Map the built cube when it matches the CSV, else build the same
+    cube in memory. Never writes, so read-only callers can use it on
+    a fresh clone.
+    """
+    if is_current(cube_dir, csv_path):
+        return open_cube(cube_dir)
+
+    panel = pd.read_csv(csv_path, parse_dates=[DATE_COL])
+    values, tickers, fields = panel_to_cube(panel)
+    values.flags.writeable = False
+    dates = pd.to_datetime(panel[DATE_COL]).to_numpy(dtype="datetime64[ns]")
+    return PanelCube(values, dates, tickers, fields)
+
+
+if __name__ == "__main__":
+    print(f"Panel cube written to {build_cube()}")
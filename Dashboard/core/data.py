@@ -0,0 +1,435 @@
+# =========================================================
+# DASHBOARD DATA ACCESS LAYER
+# One read-only copy of each Data/ artifact per server process,
+# shared by every page and every session. Each loader is keyed on
+# the artifact's content hash (core.manifest), so a refreshed file
+# is picked up on the next rerun without a server restart. Loaders
+# never write Data/: a derived file that has not been built yet is
+# rebuilt in memory instead.
+# =========================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .corr_store import read_corr_store
+from .cube import read_cube
+from .drawdown import drawdown_table
+from .factor_model import N_FACTORS, FactorRiskEngine, fit_from_cube
+from .hmm import N_STATES, GaussianHMM, RegimeFilter, regime_panel
+from .manifest import file_hash
+from .model_registry import ForecastService, ModelRegistry
+from .monte_carlo import MonteCarloVaR, simulation_pool
+from .online import OnlineRiskBook
+from .paths import (
+    CLEAN_PANEL_CSV,
+    CORR_CSV,
+    GARCH_RESULTS_CSV,
+    HMM_MODEL,
+    ML_RESULTS_CSV,
+    ONLINE_STATE,
+    PORTFOLIO_VOL_CSV,
+    ROLLING_BETA_CSV,
+    STOCK_RISK_CSV,
+    VOL_MODEL_REGISTRY,
+    WEIGHTS_CSV,
+)
+from .regime import REGIME_QUANTILES, classify, regime_names
+from .risk import RiskEngine, covariance_matrix
+from .stress import StressEngine
+from .tail_risk import tail_risk_table
+from .vol_forecast import train_universe
+from .walk_forward import backtest_summary, walk_forward
+
+
+def _frozen(df):
+    """
+    Rebuild `df` on read-only numeric arrays.
+
+    Cached objects are shared across sessions, so an accidental
+    in-place write must fail loudly instead of leaking to other
+    users; pages derive new frames (`.assign`, `.copy`) instead.
+    """
+    cols = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype.kind in "fiub":
+            values = values.copy()
+            values.flags.writeable = False
+            cols[col] = values
+        else:
+            cols[col] = df[col]
+
+    out = pd.DataFrame(cols, index=df.index, copy=False)
+    out.columns = df.columns
+    return out
+
+
+# Cached readers take content hashes as their arguments; the
+# previous version stays cached for sessions mid-rerun.
+_cached = st.cache_resource(show_spinner=False, max_entries=2)
+
+
+def _built_hash(path):
+    """
+    Content hash of a committed artifact that core.build / the nightly
+    job rewrites; it only goes missing if deleted by hand.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"{os.path.basename(path)} has not been built; "
+            "run `python -m core.build` from Dashboard/"
+        )
+    return file_hash(path)
+
+
+# =========================================================
+# LAYER 1 ARTIFACTS
+# =========================================================
+@_cached
+def _read_stock_risk(content_hash):
+    return _frozen(pd.read_csv(STOCK_RISK_CSV))
+
+
+def load_stock_risk():
+    """stock_risk_summary.csv: Stock, Avg_Daily_Return, Avg_20D_Volatility."""
+    return _read_stock_risk(file_hash(STOCK_RISK_CSV))
+
+
+@_cached
+def _read_weights(content_hash):
+    return _frozen(pd.read_csv(WEIGHTS_CSV))
+
+
+def load_weights():
+    """portfolio_weights_percentage.csv, sorted by weight (descending)."""
+    return _read_weights(file_hash(WEIGHTS_CSV))
+
+
+@_cached
+def _open_corr_store(content_hash):
+    return read_corr_store()
+
+
+@_cached
+def _read_correlation(content_hash):
+    return _frozen(_open_corr_store(content_hash).dense())
+
+
+def load_corr_store():
+    """Packed correlation store, for sub-blocks of selected tickers."""
+    return _open_corr_store(file_hash(CORR_CSV))
+
+
+def load_correlation():
+    """Stock × stock return correlation matrix, indexed by ticker."""
+    return _read_correlation(file_hash(CORR_CSV))
+
+
+@_cached
+def _read_portfolio_vol(content_hash):
+    port_vol = pd.read_csv(PORTFOLIO_VOL_CSV)
+    port_vol["Date"] = pd.to_datetime(port_vol["Date"])
+    return _frozen(port_vol)
+
+
+def load_portfolio_vol():
+    """Equal-weight portfolio 20d volatility with a parsed `Date`."""
+    return _read_portfolio_vol(file_hash(PORTFOLIO_VOL_CSV))
+
+
+@_cached
+def _read_live_risk(state_hash, panel_hash):
+    if state_hash is None:
+        book = OnlineRiskBook.from_cube(_open_panel(panel_hash))
+    else:
+        book = OnlineRiskBook.restore(ONLINE_STATE)
+    return _frozen(book.frame().assign(As_Of=book.as_of))
+
+
+def _live_hashes():
+    state_hash = file_hash(ONLINE_STATE) if os.path.exists(ONLINE_STATE) else None
+    return state_hash, file_hash(CLEAN_PANEL_CSV)
+
+
+def load_live_risk():
+    """
+    Latest 20d Volatility / 20d MA / Cumulative Return per ticker from
+    the nightly online snapshot, or seeded in memory from the panel
+    when no snapshot has been written yet.
+    """
+    return _read_live_risk(*_live_hashes())
+
+
+@_cached
+def _read_live_regimes(state_hash, panel_hash):
+    live = _read_live_risk(state_hash, panel_hash)
+    cube = _open_panel(panel_hash)
+    pos = [cube.ticker_index(t) for t in live["Stock"]]
+
+    # each stock's own 20d volatility history sets its thresholds
+    history = np.asarray(cube.field("20d Volatility"))[:, pos]
+    edges = np.nanquantile(history, REGIME_QUANTILES, axis=0).T
+    vol = live["20d Volatility"].to_numpy()
+    return _frozen(pd.DataFrame({
+        "Stock": live["Stock"],
+        "20d Volatility": vol,
+        "Low_Threshold": edges[:, 0],
+        "High_Threshold": edges[:, -1],
+        "Risk_Regime": regime_names(classify(vol, edges)),
+        "As_Of": live["As_Of"],
+    }))
+
+
+def load_live_regimes():
+    """
+    Live 20d volatility per stock (load_live_risk) binned into Low /
+    Medium / High against that stock's historical quantiles.
+    """
+    return _read_live_regimes(*_live_hashes())
+
+
+# =========================================================
+# RETURN PANEL & TAIL RISK
+# =========================================================
+@_cached
+def _open_panel(panel_hash):
+    """Built cube when current, else an in-memory one (never writes)."""
+    return read_cube()
+
+
+@_cached
+def _read_returns(panel_hash):
+    cube = _open_panel(panel_hash)
+    return _frozen(cube.field_frame("Daily Return").copy())
+
+
+def load_returns():
+    """Date × ticker Daily Return panel (panel ticker order)."""
+    return _read_returns(file_hash(CLEAN_PANEL_CSV))
+
+
+@_cached
+def _read_tail_risk(panel_hash):
+    returns = _read_returns(panel_hash)
+    return _frozen(tail_risk_table(returns.to_numpy(), returns.columns))
+
+
+def load_tail_risk():
+    """Historical VaR / ES per stock (core.tail_risk column layout)."""
+    return _read_tail_risk(file_hash(CLEAN_PANEL_CSV))
+
+
+@_cached
+def _read_rolling_beta(content_hash):
+    return _frozen(pd.read_csv(ROLLING_BETA_CSV, parse_dates=["As_Of"]))
+
+
+def load_rolling_beta():
+    """Latest rolling beta / alpha / correlation to the equal-weight market."""
+    return _read_rolling_beta(_built_hash(ROLLING_BETA_CSV))
+
+
+@_cached
+def _read_drawdowns(panel_hash):
+    returns = _read_returns(panel_hash)
+    return _frozen(drawdown_table(returns.to_numpy(), returns.columns, returns.index))
+
+
+def load_drawdowns():
+    """Max / current drawdown, duration and recovery per stock (core.drawdown)."""
+    return _read_drawdowns(file_hash(CLEAN_PANEL_CSV))
+
+
+@_cached
+def _build_stress_engine(panel_hash):
+    return StressEngine(_read_returns(panel_hash))
+
+
+def load_stress_engine():
+    """Historical-replay StressEngine over the full return panel."""
+    return _build_stress_engine(file_hash(CLEAN_PANEL_CSV))
+
+
+# =========================================================
+# RISK ENGINE
+# =========================================================
+@_cached
+def _build_risk_engine(weights_hash, corr_hash):
+    weights = _read_weights(weights_hash)
+    tickers = list(weights["Stock"])
+    vols = weights["Avg_20D_Volatility"].to_numpy()
+    returns = weights["Avg_Daily_Return"].to_numpy()
+    corr = _open_corr_store(corr_hash).block(tickers).to_numpy()
+    return RiskEngine(tickers, vols, covariance_matrix(vols, corr), returns)
+
+
+# one entry per factor count a session might flip between
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _build_factor_engine(weights_hash, panel_hash, n_factors):
+    weights = _read_weights(weights_hash)
+    model = fit_from_cube(_open_panel(panel_hash), n_factors)
+    return FactorRiskEngine(
+        weights["Stock"],
+        weights["Avg_20D_Volatility"].to_numpy(),
+        model,
+        weights["Avg_Daily_Return"].to_numpy()
+    )
+
+
+def load_risk_engine(model="full", n_factors=N_FACTORS):
+    """
+    RiskEngine over the weighted universe (weights-file order), on the
+    full correlation matrix (`model="full"`) or a PCA factor covariance
+    fitted to the return panel (`model="factor"`). Rebuilt only when
+    its inputs change.
+    """
+    if model == "factor":
+        return _build_factor_engine(
+            file_hash(WEIGHTS_CSV), file_hash(CLEAN_PANEL_CSV), n_factors
+        )
+    return _build_risk_engine(file_hash(WEIGHTS_CSV), file_hash(CORR_CSV))
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _build_monte_carlo(weights_hash, source_hash, model, n_factors, _engine):
+    return MonteCarloVaR.from_engine(_engine)
+
+
+@st.cache_resource(show_spinner=False)
+def load_simulation_pool():
+    """
+    One process pool for the whole server, shared by every session's
+    Monte Carlo runs; each run ships its inputs with its tasks.
+    """
+    return simulation_pool()
+
+
+def load_monte_carlo(model="full", n_factors=N_FACTORS):
+    """
+    MonteCarloVaR for load_risk_engine(model, n_factors); the Cholesky
+    (or factor) loading is computed once per engine version.
+    """
+    engine = load_risk_engine(model, n_factors)
+    source = CLEAN_PANEL_CSV if model == "factor" else CORR_CSV
+    return _build_monte_carlo(
+        file_hash(WEIGHTS_CSV), file_hash(source), model, n_factors, engine
+    )
+
+
+# =========================================================
+# REGIME MODEL
+# =========================================================
+@_cached
+def _read_regime_filter(content_hash):
+    regime_filter = RegimeFilter.load(HMM_MODEL)
+    regime_filter.log_p.flags.writeable = False
+    return regime_filter
+
+
+# one entry per state count a session might flip between
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _fit_regime_hmm(panel_hash, n_states, model_hash):
+    panel, names = regime_panel(_open_panel(panel_hash))
+    model = None
+    if model_hash is not None:
+        model = _read_regime_filter(model_hash).model
+        if model.n_states != n_states or model.names != names:
+            model = None
+    if model is None:
+        model = GaussianHMM.fit(panel, names, n_states)
+
+    filtered = model.filtered(panel)
+    panel.flags.writeable = False
+    filtered.flags.writeable = False
+    return model, panel, filtered
+
+
+def load_regime_hmm(n_states=N_STATES):
+    """
+    (GaussianHMM, returns, filtered probabilities) for the equal-weight
+    portfolio (series 0) and every ticker. The persisted model is used
+    when it matches `n_states` and the universe; other state counts
+    are fitted in one batch. Recomputed only when an input changes.
+    """
+    model_hash = file_hash(HMM_MODEL) if os.path.exists(HMM_MODEL) else None
+    return _fit_regime_hmm(file_hash(CLEAN_PANEL_CSV), n_states, model_hash)
+
+
+# =========================================================
+# LAYER 2 ARTIFACTS
+# =========================================================
+@_cached
+def _read_ml_results(content_hash):
+    return _frozen(pd.read_csv(ML_RESULTS_CSV))
+
+
+def load_ml_results():
+    """layer2_ml_results.csv: one 5-day volatility forecast per ticker."""
+    return _read_ml_results(file_hash(ML_RESULTS_CSV))
+
+
+@_cached
+def _read_garch_results(content_hash):
+    return _frozen(pd.read_csv(GARCH_RESULTS_CSV))
+
+
+def load_garch_results(model=None):
+    """
+    layer2_garch_results.csv (core.garch): the Layer-2 columns plus
+    horizons and parameters, for one model or both.
+    """
+    table = _read_garch_results(_built_hash(GARCH_RESULTS_CSV))
+    if model is None:
+        return table
+    return table[table["Model"] == model].reset_index(drop=True)
+
+
+@_cached
+def _build_forecast_service(registry_hash, panel_hash):
+    cube = _open_panel(panel_hash)
+    registry = None
+    if registry_hash is not None:
+        try:
+            registry = ModelRegistry.load(VOL_MODEL_REGISTRY)
+        except (ValueError, KeyError):
+            registry = None
+        if registry is not None and not set(registry.tickers) <= set(cube.tickers):
+            registry = None
+    if registry is None:
+        # nothing usable saved: fit once in memory as version 0
+        registry = ModelRegistry.from_fit(train_universe(cube), version=0, source_hash=panel_hash)
+
+    service = ForecastService(registry, cube)
+    service.predicted.flags.writeable = False
+    service.close.flags.writeable = False
+    return service
+
+
+def load_forecast_service():
+    """
+    ForecastService over the persisted model registry and the current
+    panel; new trading days are scorable as soon as they land,
+    without retraining. Without a usable registry file the models
+    are fitted in memory (version 0) and nothing is written.
+    """
+    registry_hash = file_hash(VOL_MODEL_REGISTRY) if os.path.exists(VOL_MODEL_REGISTRY) else None
+    return _build_forecast_service(registry_hash, file_hash(CLEAN_PANEL_CSV))
+
+
+@_cached
+def _run_walk_forward(panel_hash):
+    result = walk_forward(_open_panel(panel_hash))
+    for key in ("forecast", "realized"):
+        result[key].flags.writeable = False
+    return result, _frozen(backtest_summary(result))
+
+
+def load_walk_forward():
+    """
+    (result, summary): every ticker's out-of-sample forecast history
+    from core.walk_forward, and per-ticker walk-forward error metrics.
+    """
+    return _run_walk_forward(file_hash(CLEAN_PANEL_CSV))
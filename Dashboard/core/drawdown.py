@@ -0,0 +1,122 @@
+# =========================================================
+# DRAWDOWN ANALYTICS
+# Underwater curves, maximum drawdown, duration and time to
+# recovery for every column of a return matrix at once. One
+# np.maximum.accumulate over the whole (T, M) wealth matrix gives
+# the running peaks; all statistics follow from index arithmetic.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from .tail_risk import portfolio_returns
+
+
+def wealth_curves(returns):
+    """
+    (T + 1, M) growth of 1 for a (T, M) return matrix, starting from a
+    row of ones; a missing return counts as flat.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    if r.ndim == 1:
+        r = r[:, None]
+    growth = np.cumprod(1.0 + np.nan_to_num(r), axis=0)
+    return np.vstack([np.ones(r.shape[1]), growth])
+
+
+def underwater(returns):
+    """(T + 1, M) drawdown from the running peak: 0 at highs, −0.2 = 20% below."""
+    wealth = wealth_curves(returns)
+    return wealth / np.maximum.accumulate(wealth, axis=0) - 1.0
+
+
+def drawdown_stats(returns):
+    """
+    Per-column drawdown statistics as a dict of (M,) arrays. Indices
+    are rows of the (T + 1)-row underwater curve (row 0 = start):
+
+    max_drawdown       deepest loss from a peak (positive fraction)
+    current_drawdown   loss from the peak at the last row
+    peak, trough       rows of the max drawdown's peak and trough
+    recovery           first row back at the peak, −1 if never
+    longest            longest spell below a prior high, in rows
+
+    plus the `underwater` curve itself.
+    """
+    uw = underwater(returns)
+    T, M = uw.shape
+    rows = np.arange(T)[:, None]
+    cols = np.arange(M)
+    at_high = uw >= 0.0
+
+    # last high at or before each row, first high at or after each row
+    last_high = np.maximum.accumulate(np.where(at_high, rows, 0), axis=0)
+    next_high = np.minimum.accumulate(np.where(at_high, rows, T)[::-1], axis=0)[::-1]
+
+    trough = uw.argmin(axis=0)
+    peak = last_high[trough, cols]
+    recovery = next_high[trough, cols]
+    recovery = np.where(recovery < T, recovery, -1)
+
+    # spells still open at the last row count to the end
+    longest = (rows - last_high).max(axis=0)
+
+    return {
+        "max_drawdown": np.abs(uw[trough, cols]),
+        "current_drawdown": np.abs(uw[-1]),
+        "peak": peak,
+        "trough": trough,
+        "recovery": recovery,
+        "longest": longest,
+        "underwater": uw,
+    }
+
+
+def drawdown_table(returns, names, dates=None, name_col="Stock"):
+    """
+    One row per column of a (T, M) return matrix: `Max_Drawdown`,
+    `Current_Drawdown` (positive fractions), `Drawdown_Days` (peak →
+    trough), `Recovery_Days` (trough → recovery, NaN if not yet
+    recovered), `Longest_Underwater_Days` and, with `dates`, the
+    peak / trough / recovery dates.
+    """
+    s = drawdown_stats(returns)
+    recovered = s["recovery"] >= 0
+
+    table = pd.DataFrame({
+        name_col: list(names),
+        "Max_Drawdown": s["max_drawdown"],
+        "Current_Drawdown": s["current_drawdown"],
+        "Drawdown_Days": s["trough"] - s["peak"],
+        "Recovery_Days": np.where(recovered, s["recovery"] - s["trough"], np.nan),
+        "Longest_Underwater_Days": s["longest"],
+    })
+
+    if dates is not None:
+        # row i of the underwater curve is the close of dates[i − 1]; row 0
+        # (the starting value) is stamped with the first date
+        stamps = pd.DatetimeIndex(dates)
+        stamps = stamps[np.maximum(np.arange(len(stamps) + 1) - 1, 0)]
+        table["Peak_Date"] = stamps[s["peak"]]
+        table["Trough_Date"] = stamps[s["trough"]]
+        table["Recovery_Date"] = pd.Series(stamps[np.maximum(s["recovery"], 0)]).where(recovered).to_numpy()
+    return table
+
+
+def portfolio_drawdowns(returns, weights, names=None, dates=None):
+    """drawdown_table() for one or more daily-rebalanced weight vectors."""
+    port = portfolio_returns(returns, weights)
+    names = names if names is not None else [f"Portfolio {i + 1}" for i in range(port.shape[1])]
+    return drawdown_table(port, names, dates, name_col="Portfolio")
+
+
+if __name__ == "__main__":
+    from .cube import ensure_cube, open_cube
+
+    cube = open_cube(ensure_cube())
+    returns = cube.field_frame("Daily Return")
+    table = drawdown_table(returns.to_numpy(), returns.columns, returns.index)
+    print(table.sort_values("Max_Drawdown", ascending=False).head(15).to_string(index=False))
+
+    equal = np.full(returns.shape[1], 1.0 / returns.shape[1])
+    print(portfolio_drawdowns(returns.to_numpy(), equal, ["Equal Weight"], returns.index).T)
@@ -0,0 +1,125 @@
+# =========================================================
+# STATISTICAL (PCA) FACTOR RISK MODEL
+# K principal factors of the standardized daily-return panel:
+# correlation ≈ B·Bᵀ + diag(ψ), stored as N × K loadings plus
+# idiosyncratic variances. Risk products run in O(N·K) and the
+# dense N × N matrix is never formed.
+# =========================================================
+
+import numpy as np
+
+from .paths import FACTOR_MODEL
+from .risk import RiskEngine
+
+N_FACTORS = 5
+
+# floor on idiosyncratic correlation-scale variance
+MIN_IDIO = 1e-4
+
+
+class FactorModel:
+    """
+    Correlation-scale factor model: `loadings` (N, K), `idio` (N,) and
+    the share of total variance each factor explains.
+    """
+
+    def __init__(self, tickers, loadings, idio, explained):
+        self.tickers = list(tickers)
+        self.loadings = np.asarray(loadings, dtype=np.float64)
+        self.idio = np.asarray(idio, dtype=np.float64)
+        self.explained = np.asarray(explained, dtype=np.float64)
+
+    @property
+    def n_factors(self):
+        return self.loadings.shape[1]
+
+    @classmethod
+    def fit(cls, returns, tickers, n_factors=N_FACTORS):
+        """
+        PCA of a (T, N) return matrix. Columns are standardized over
+        their own observations; missing returns count as the mean.
+        """
+        x = np.asarray(returns, dtype=np.float64)
+        valid = ~np.isnan(x)
+        n = valid.sum(axis=0)
+        mean = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(n, 1)
+        dev = np.where(valid, x - mean, 0.0)
+        std = np.sqrt((dev * dev).sum(axis=0) / np.maximum(n - 1, 1))
+        z = dev / np.where(std > 0, std, 1.0) / np.sqrt(max(len(x) - 1, 1))
+
+        _, s, vt = np.linalg.svd(z, full_matrices=False)
+        k = min(n_factors, len(s))
+        loadings = vt[:k].T * s[:k]
+        idio = np.maximum(1.0 - (loadings * loadings).sum(axis=1), MIN_IDIO)
+        explained = s[:k] ** 2 / (s ** 2).sum()
+        return cls(tickers, loadings, idio, explained)
+
+    def subset(self, tickers):
+        """Model rows reordered / restricted to `tickers`."""
+        pos = {t: i for i, t in enumerate(self.tickers)}
+        idx = [pos[t] for t in tickers]
+        return FactorModel(tickers, self.loadings[idx], self.idio[idx], self.explained)
+
+    def correlation(self):
+        """Dense implied correlation (diagnostics only; O(N²))."""
+        c = self.loadings @ self.loadings.T
+        c[np.diag_indices_from(c)] += self.idio
+        return c
+
+    # -----------------------------------------------------
+    def save(self, path=FACTOR_MODEL):
+        np.savez(
+            path,
+            tickers=np.array(self.tickers, dtype=str),
+            loadings=self.loadings,
+            idio=self.idio,
+            explained=self.explained,
+        )
+        return path
+
+    @classmethod
+    def load(cls, path=FACTOR_MODEL):
+        with np.load(path) as z:
+            return cls(
+                [str(t) for t in z["tickers"]], z["loadings"], z["idio"], z["explained"]
+            )
+
+
+class FactorRiskEngine(RiskEngine):
+    """
+    RiskEngine on Σ = D(BBᵀ + Ψ)D with D = diag(vols): the same vols
+    as the full engine, correlation from the factor model.
+    """
+
+    def __init__(self, tickers, vols, model, returns=None):
+        super().__init__(tickers, vols, None, returns)
+        model = model.subset(self.tickers)
+        self.model = model
+        self.exposures = self.vols[:, None] * model.loadings
+        self.specific = self.vols ** 2 * model.idio
+        self.exposures.flags.writeable = False
+        self.specific.flags.writeable = False
+
+    def cov_dot(self, weights):
+        return (weights @ self.exposures) @ self.exposures.T + weights * self.specific
+
+    def cov_column(self, i):
+        column = self.exposures @ self.exposures[i]
+        column[i] += self.specific[i]
+        return column
+
+
+def fit_from_cube(cube, n_factors=N_FACTORS):
+    """Fit on the cube's full `Daily Return` history."""
+    return FactorModel.fit(cube.field("Daily Return"), cube.tickers, n_factors)
+
+
+if __name__ == "__main__":
+    from .cube import ensure_cube, open_cube
+
+    model = fit_from_cube(open_cube(ensure_cube()))
+    model.save()
+    print(
+        f"{model.n_factors} factors for {len(model.tickers)} tickers, "
+        f"{model.explained.sum():.1%} of variance → {FACTOR_MODEL}"
+    )
@@ -0,0 +1,358 @@
+# =========================================================
+# GAUSSIAN HIDDEN MARKOV REGIME MODEL
+# K-state Gaussian HMMs fitted by Baum–Welch to M return series
+# at once: log-domain emissions, scaled forward / backward
+# recursions batched as (M, K, K) matmuls, so the portfolio and all
+# stocks share one loop over time. Live use needs a single
+# forward-filter step per new day.
+# =========================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .beta import equal_weight_returns
+from .paths import HMM_MODEL
+
+N_STATES = 3
+MAX_ITER = 100
+TOL = 1e-6
+
+# floor on state variances, relative to each series' variance
+MIN_VAR_RATIO = 1e-3
+
+_LOG_2PI = np.log(2 * np.pi)
+
+_STATE_LABELS = {
+    2: ("Calm", "Turbulent"),
+    3: ("Calm", "Normal", "Turbulent"),
+    4: ("Calm", "Normal", "Elevated", "Turbulent"),
+}
+
+
+def state_labels(n_states):
+    """Display names for variance-ordered states."""
+    return _STATE_LABELS.get(n_states, tuple(f"State {k + 1}" for k in range(n_states)))
+
+
+def _logsumexp(x, axis):
+    m = np.max(x, axis=axis, keepdims=True)
+    m = np.where(np.isfinite(m), m, 0.0)
+    return np.squeeze(m, axis) + np.log(np.sum(np.exp(x - m), axis=axis))
+
+
+def _log(p):
+    with np.errstate(divide="ignore"):
+        return np.log(p)
+
+
+def _log_emissions(x, mu, var):
+    """(M, T, K) Gaussian log densities; a missing value is 0 (uninformative)."""
+    x = x[:, :, None]
+    log_b = -0.5 * (_LOG_2PI + np.log(var[:, None, :]) + (x - mu[:, None, :]) ** 2 / var[:, None, :])
+    return np.where(np.isnan(x), 0.0, log_b)
+
+
+def _scaled_emissions(log_b):
+    """Per-step max-shifted emission densities and the (M, T) log shifts."""
+    shift = log_b.max(axis=2)
+    return np.exp(log_b - shift[:, :, None]), shift
+
+
+def _forward(pi, A, log_b):
+    """
+    Filter probabilities (M, T, K) and log-likelihoods (M,). Emissions
+    enter as exp(log b − max log b), and each step is renormalized, so
+    the recursion neither underflows nor leaves the batched matmul; the
+    scale factors are accumulated in log space.
+    """
+    B, shift = _scaled_emissions(log_b)
+    M, T, K = B.shape
+    alpha = np.empty((M, T, K))
+    scale = np.empty((M, T))
+    ones = np.ones(K)
+    a = pi * B[:, 0]
+    for t in range(T):
+        if t:
+            a = np.matmul(alpha[:, t - 1, None, :], A)[:, 0] * B[:, t]
+        scale[:, t] = np.maximum(a @ ones, 1e-300)
+        alpha[:, t] = a / scale[:, t, None]
+    return alpha, np.log(scale).sum(axis=1) + shift.sum(axis=1)
+
+
+def _backward(A, log_b):
+    """Backward messages (M, T, K), each step scaled to sum to one."""
+    B, _ = _scaled_emissions(log_b)
+    M, T, K = B.shape
+    beta = np.empty((M, T, K))
+    beta[:, -1] = 1.0 / K
+    ones = np.ones(K)
+    for t in range(T - 2, -1, -1):
+        b = np.matmul(A, (B[:, t + 1] * beta[:, t + 1])[:, :, None])[:, :, 0]
+        beta[:, t] = b / np.maximum(b @ ones, 1e-300)[:, None]
+    return beta, B
+
+
+def _posteriors(alpha, beta):
+    gamma = alpha * beta
+    return gamma / np.maximum(gamma.sum(axis=2, keepdims=True), 1e-300)
+
+
+class GaussianHMM:
+    """
+    M independent K-state Gaussian HMMs: `pi` (M, K), `A` (M, K, K),
+    `mu` / `var` (M, K). States are ordered by variance, so state 0
+    is the calmest and state K − 1 the most turbulent.
+    """
+
+    def __init__(self, names, pi, A, mu, var, loglik=None):
+        self.names = list(names)
+        self.pi = np.asarray(pi, dtype=np.float64)
+        self.A = np.asarray(A, dtype=np.float64)
+        self.mu = np.asarray(mu, dtype=np.float64)
+        self.var = np.asarray(var, dtype=np.float64)
+        self.loglik = None if loglik is None else np.asarray(loglik, dtype=np.float64)
+
+    @property
+    def n_states(self):
+        return self.mu.shape[1]
+
+    # -----------------------------------------------------
+    @classmethod
+    def fit(cls, returns, names, n_states=N_STATES, max_iter=MAX_ITER, tol=TOL):
+        """
+        Baum–Welch on the columns of a (T, M) return matrix, all series
+        in lockstep. Missing returns carry no evidence.
+        """
+        x = np.asarray(returns, dtype=np.float64)
+        if x.ndim == 1:
+            x = x[:, None]
+        x = x.T                                             # (M, T)
+        M, T = x.shape
+        K = n_states
+        valid = ~np.isnan(x)
+        xz = np.where(valid, x, 0.0)
+
+        # start from spread-out volatility levels around each series' moments
+        mean = np.nanmean(x, axis=1)
+        total_var = np.nanvar(x, axis=1)
+        scale = np.geomspace(0.4, 2.5, K) if K > 1 else np.ones(1)
+        mu = np.repeat(mean[:, None], K, axis=1)
+        var = total_var[:, None] * scale[None, :]
+        A = np.full((K, K), 0.05 / max(K - 1, 1))
+        np.fill_diagonal(A, 0.95)
+        A = np.broadcast_to(A, (M, K, K)).copy()
+        pi = np.full((M, K), 1.0 / K)
+        floor = (total_var * MIN_VAR_RATIO)[:, None]
+
+        prev = np.full(M, -np.inf)
+        for _ in range(max_iter):
+            log_b = _log_emissions(x, mu, var)
+            alpha, loglik = _forward(pi, A, log_b)
+            beta, B = _backward(A, log_b)
+
+            # --- E-step: state and transition posteriors ---
+            gamma = _posteriors(alpha, beta)
+            xi = alpha[:, :-1, :, None] * A[:, None] * (B[:, 1:] * beta[:, 1:])[:, :, None, :]
+            xi /= np.maximum(xi.sum(axis=(2, 3), keepdims=True), 1e-300)
+            xi = xi.sum(axis=1)
+
+            # --- M-step ---
+            pi = gamma[:, 0]
+            A = xi / xi.sum(axis=2, keepdims=True)
+            w = gamma * valid[:, :, None]
+            w_sum = np.maximum(w.sum(axis=1), 1e-12)
+            mu = (w * xz[:, :, None]).sum(axis=1) / w_sum
+            dev = np.where(valid[:, :, None], xz[:, :, None] - mu[:, None, :], 0.0)
+            var = np.maximum((w * dev * dev).sum(axis=1) / w_sum, floor)
+
+            if np.all(np.abs(loglik - prev) <= tol * np.maximum(np.abs(loglik), 1.0)):
+                break
+            prev = loglik
+
+        return cls(names, pi, A, mu, var, loglik)._ordered()
+
+    def _ordered(self):
+        """Relabel states by ascending variance in every series."""
+        order = np.argsort(self.var, axis=1)
+        rows = np.arange(len(order))[:, None]
+        self.pi = self.pi[rows, order]
+        self.mu = self.mu[rows, order]
+        self.var = self.var[rows, order]
+        self.A = self.A[rows[:, :, None], order[:, :, None], order[:, None, :]]
+        return self
+
+    # -----------------------------------------------------
+    def _log_b(self, returns):
+        x = np.asarray(returns, dtype=np.float64)
+        if x.ndim == 1:
+            x = x[:, None]
+        return _log_emissions(x.T, self.mu, self.var)
+
+    def filtered(self, returns):
+        """P(state_t | returns up to t): (M, T, K), no lookahead."""
+        return _forward(self.pi, self.A, self._log_b(returns))[0]
+
+    def smoothed(self, returns):
+        """P(state_t | all returns): (M, T, K) from forward–backward."""
+        log_b = self._log_b(returns)
+        return _posteriors(_forward(self.pi, self.A, log_b)[0], _backward(self.A, log_b)[0])
+
+    def expected_durations(self):
+        """Mean days spent in each state per visit: 1 / (1 − A_kk), (M, K)."""
+        stay = np.diagonal(self.A, axis1=1, axis2=2)
+        with np.errstate(divide="ignore"):
+            return 1.0 / (1.0 - stay)
+
+    def stationary(self):
+        """Long-run share of time in each state, (M, K)."""
+        M, K = self.mu.shape
+        # π(A − I) = 0 with the last equation replaced by Σπ = 1
+        lhs = np.swapaxes(self.A, 1, 2) - np.eye(K)
+        lhs[:, -1] = 1.0
+        rhs = np.zeros((M, K, 1))
+        rhs[:, -1] = 1.0
+        return np.linalg.solve(lhs, rhs)[:, :, 0]
+
+    def filter(self, returns=None):
+        """A RegimeFilter positioned after `returns` (or at the prior)."""
+        f = RegimeFilter(self)
+        if returns is not None:
+            f.log_p = _log(self.filtered(returns)[:, -1])
+        return f
+
+    # -----------------------------------------------------
+    def _arrays(self):
+        return dict(
+            names=np.array(self.names, dtype=str),
+            pi=self.pi, A=self.A, mu=self.mu, var=self.var,
+            loglik=self.loglik if self.loglik is not None else np.full(len(self.names), np.nan),
+        )
+
+    def save(self, path=HMM_MODEL):
+        np.savez(path, **self._arrays())
+        return path
+
+    @classmethod
+    def load(cls, path=HMM_MODEL):
+        with np.load(path) as z:
+            return cls(
+                [str(n) for n in z["names"]], z["pi"], z["A"], z["mu"], z["var"], z["loglik"]
+            )
+
+
+class RegimeFilter:
+    """
+    Incremental forward filter: step() folds one new observation per
+    series into the regime probabilities in O(M·K²). `as_of` is the
+    date of the last observation folded in.
+    """
+
+    __slots__ = ("model", "log_p", "as_of")
+
+    def __init__(self, model, as_of=None):
+        self.model = model
+        self.log_p = _log(model.pi)
+        self.as_of = as_of
+
+    @property
+    def probabilities(self):
+        return np.exp(self.log_p)
+
+    def step(self, x):
+        """Advance by one (M,) observation vector; returns (M, K) probabilities."""
+        m = self.model
+        x = np.asarray(x, dtype=np.float64).reshape(-1)
+        log_b = _log_emissions(x[:, None], m.mu, m.var)[:, 0]
+        a = _log(np.matmul(self.probabilities[:, None, :], m.A)[:, 0]) + log_b
+        self.log_p = a - _logsumexp(a, axis=1)[:, None]
+        return self.probabilities
+
+    # -----------------------------------------------------
+    def save(self, path=HMM_MODEL):
+        """The model plus the filter position, swapped in atomically."""
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            log_p=self.log_p,
+            as_of=np.array([self.as_of.value if self.as_of is not None else -1], dtype=np.int64),
+            **self.model._arrays()
+        )
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path=HMM_MODEL):
+        f = cls(GaussianHMM.load(path))
+        with np.load(path) as z:
+            if "log_p" in z.files:
+                f.log_p = z["log_p"]
+                as_of = int(z["as_of"][0])
+                f.as_of = pd.Timestamp(as_of) if as_of >= 0 else None
+        return f
+
+
+def regime_panel(cube):
+    """
+    (T, 1 + N) returns — the equal-weight portfolio, then every
+    ticker — with matching names, for one batched fit.
+    """
+    returns = cube.field("Daily Return")
+    return np.column_stack([equal_weight_returns(returns), returns]), ["Portfolio", *cube.tickers]
+
+
+def fit_from_cube(cube, n_states=N_STATES):
+    """Fit the portfolio and every ticker on the cube's full history."""
+    panel, names = regime_panel(cube)
+    return GaussianHMM.fit(panel, names, n_states)
+
+
+def filter_from_cube(cube, n_states=N_STATES):
+    """A freshly fitted model with its filter run to the cube's last date."""
+    panel, _ = regime_panel(cube)
+    f = fit_from_cube(cube, n_states).filter(panel)
+    f.as_of = pd.Timestamp(cube.dates[-1]) if len(cube.dates) else None
+    return f
+
+
+def advance_regime_filter(cube, new_returns, dates, path=HMM_MODEL):
+    """
+    Step the saved filter through the new (k, N) returns with its
+    fitted parameters unchanged, or fit and filter from `cube`
+    (already holding the new rows) if the file is missing or stale.
+    Returns the filter after saving it.
+    """
+    prior = pd.Timestamp(cube.dates[-len(dates) - 1]) if len(cube.dates) > len(dates) else None
+    f = None
+    if os.path.exists(path):
+        f = RegimeFilter.load(path)
+        if f.as_of != prior or f.model.names != ["Portfolio", *cube.tickers]:
+            f = None
+
+    if f is None:
+        f = filter_from_cube(cube)
+    else:
+        port = equal_weight_returns(new_returns)
+        for date, x, p in zip(dates, new_returns, port):
+            f.step(np.concatenate([[p], x]))
+            f.as_of = pd.Timestamp(date)
+
+    f.save(path)
+    return f
+
+
+if __name__ == "__main__":
+    from .cube import ensure_cube, open_cube
+
+    cube = open_cube(ensure_cube())
+    f = filter_from_cube(cube)
+    f.save()
+    model = f.model
+    print(pd.DataFrame({
+        "Ann. Vol": np.sqrt(model.var[0] * 252),
+        "Expected Days": model.expected_durations()[0],
+        "Long-Run Share": model.stationary()[0],
+        "Now": f.probabilities[0],
+    }, index=state_labels(model.n_states)).round(3))
+    print(f"Model and filter as of {f.as_of.date()} → {HMM_MODEL}")
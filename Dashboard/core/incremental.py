@@ -0,0 +1,412 @@
+# =========================================================
+# INCREMENTAL DAILY UPDATE
+# Appends new bars to the cleaned panel and rolls every
+# Layer-1 artifact forward from running aggregates (and
+# retrains the Layer-2 forecasts), instead of re-running the
+# notebooks end to end
+# =========================================================
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .beta import cube_beta_table
+from .corr_store import write_corr_store
+from .cube import append_cube, ensure_cube, open_cube
+from .garch import fit_universe, garch_table
+from .hmm import advance_regime_filter
+from .manifest import file_hash, record, stamp_derived
+from .model_registry import build_registry
+from .online import advance_online_book
+from .panel_store import ensure_panel_store, store_parts, write_panel_store
+from .paths import (
+    CLEAN_PANEL_CSV,
+    CORR_CSV,
+    CORR_STORE_DIR,
+    GARCH_RESULTS_CSV,
+    DATA_DIR,
+    HMM_MODEL,
+    INCREMENTAL_STATE,
+    ML_RESULTS_CSV,
+    ONLINE_STATE,
+    PANEL_CUBE_DIR,
+    PANEL_STORE_DIR,
+    PORTFOLIO_VOL_CSV,
+    ROLLING_BETA_CSV,
+    STOCK_RISK_CSV,
+    VOL_MODEL_REGISTRY,
+    WEIGHTS_CSV,
+)
+from .rolling import rolling_stat
+from .schema import DATE_COL, FIELDS, column_name
+from .vol_forecast import results_table, train_universe
+
+WINDOW = 20
+
+# Panel rows re-read to roll the windows forward; the extra rows
+# cover tickers with missing bars (windows skip missing days)
+TAIL_ROWS = 3 * WINDOW
+
+
+# =========================================================
+# DERIVED FIELDS FOR NEW ROWS
+# =========================================================
+def derive_new_rows(tail, new, fields=FIELDS):
+    """
+    Fill Daily Return, Cumulative Return, 20d Volatility and 20d MA
+    for `new` (k, N, F) bars given the last panel rows `tail`.
+
+    Matches the download's per-ticker definitions, which skip missing
+    days: return vs the last available close, cumprod of (1 + r), and
+    20-observation std (ddof=1) / mean with full windows only.
+    """
+    f = {name: j for j, name in enumerate(fields)}
+    n_tail = tail.shape[0]
+    rows = np.concatenate([tail, new], axis=0)
+
+    close = rows[:, :, f["Close"]]
+    prev_close = pd.DataFrame(close).ffill().shift(1).to_numpy()
+    ret = rows[:, :, f["Daily Return"]].copy()
+    ret[n_tail:] = close[n_tail:] / prev_close[n_tail:] - 1
+
+    level = pd.DataFrame(rows[:n_tail, :, f["Cumulative Return"]]).ffill()
+    level = level.to_numpy()[-1]
+    level = np.where(np.isnan(level), 1.0, level)
+    growth = np.nancumprod(1 + ret[n_tail:], axis=0)
+    cum = np.where(np.isnan(ret[n_tail:]), np.nan, level * growth)
+
+    vol = rolling_stat(ret, WINDOW, "std", skip_missing=True)
+    ma = rolling_stat(close, WINDOW, "mean", skip_missing=True)
+
+    out = new.copy()
+    out[:, :, f["Daily Return"]] = ret[n_tail:]
+    out[:, :, f["Cumulative Return"]] = cum
+    out[:, :, f["20d Volatility"]] = vol[n_tail:]
+    out[:, :, f["20d MA"]] = ma[n_tail:]
+    return out
+
+
+# =========================================================
+# RUNNING AGGREGATES
+# =========================================================
+def _pair_sums(returns):
+    """Pairwise-complete moment sums for the correlation matrix."""
+    mask = (~np.isnan(returns)).astype(np.float64)
+    x = np.nan_to_num(returns)
+    return {
+        "pair_n": mask.T @ mask,
+        "pair_sx": x.T @ mask,
+        "pair_sxx": (x * x).T @ mask,
+        "pair_sxy": x.T @ x,
+    }
+
+
+def _column_sums(values):
+    valid = ~np.isnan(values)
+    return np.nansum(values, axis=0), valid.sum(axis=0).astype(np.float64)
+
+
+def build_state(values, fields):
+    """Aggregates over the full history; used once, then rolled forward."""
+    f = {name: j for j, name in enumerate(fields)}
+    ret = values[:, :, f["Daily Return"]]
+    vol = values[:, :, f["20d Volatility"]]
+
+    state = {"rows": np.array(values.shape[0])}
+    state["ret_sum"], state["ret_n"] = _column_sums(ret)
+    state["vol_sum"], state["vol_n"] = _column_sums(vol)
+    state.update(_pair_sums(ret))
+    return state
+
+
+def update_state(state, new, fields):
+    """Fold k new rows into the aggregates: O(k·N²) for the pair sums."""
+    f = {name: j for j, name in enumerate(fields)}
+    ret = new[:, :, f["Daily Return"]]
+    vol = new[:, :, f["20d Volatility"]]
+
+    out = dict(state)
+    out["rows"] = np.array(int(state["rows"]) + new.shape[0])
+    for key, (s, n) in (
+        ("ret", _column_sums(ret)),
+        ("vol", _column_sums(vol)),
+    ):
+        out[f"{key}_sum"] = state[f"{key}_sum"] + s
+        out[f"{key}_n"] = state[f"{key}_n"] + n
+    for key, val in _pair_sums(ret).items():
+        out[key] = state[key] + val
+    return out
+
+
+def load_state(cube, path=INCREMENTAL_STATE, source=CLEAN_PANEL_CSV):
+    """
+    Saved aggregates if they were built from the current content of
+    `source` over the cube's tickers, else rebuilt from the cube.
+    """
+    if os.path.exists(path):
+        with np.load(path) as saved:
+            state = dict(saved)
+        if (
+            str(state.pop("source_hash", "")) == file_hash(source)
+            and list(state.pop("tickers", [])) == list(cube.tickers)
+            and int(state["rows"]) == cube.shape[0]
+        ):
+            return state
+
+    return build_state(np.asarray(cube.values), cube.fields)
+
+
+def save_state(state, tickers, path=INCREMENTAL_STATE, source=CLEAN_PANEL_CSV):
+    """
+    Written last, beside the target and swapped in: a run that dies
+    earlier leaves a stale hash, so the next one rebuilds.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            source_hash=file_hash(source),
+            tickers=np.array(tickers, dtype=str),
+            **state
+        )
+    os.replace(tmp, path)
+
+
+def correlation_from_state(state):
+    """Pearson correlation on pairwise-complete rows, as DataFrame.corr()."""
+    n = state["pair_n"]
+    sx = state["pair_sx"]
+    sxx = state["pair_sxx"]
+    sxy = state["pair_sxy"]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sx.T
+        var_i = n * sxx - sx ** 2
+        var_j = var_i.T
+        corr = cov / np.sqrt(var_i * var_j)
+
+    corr[n < 2] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= 2, 1.0, np.nan))
+    return np.clip(corr, -1.0, 1.0)
+
+
+# =========================================================
+# ARTIFACT WRITERS
+# =========================================================
+def _line_terminator(path):
+    """Keep the CRLF/LF convention of an existing artifact."""
+    if not os.path.exists(path):
+        return "\n"
+    with open(path, "rb") as f:
+        return "\r\n" if f.readline().endswith(b"\r\n") else "\n"
+
+
+def _write_csv(df, path, append=False, **kwargs):
+    df.to_csv(
+        path,
+        mode="a" if append else "w",
+        header=not append,
+        lineterminator=_line_terminator(path),
+        **kwargs
+    )
+    record(os.path.basename(path), data_dir=os.path.dirname(path))
+
+
+def stock_risk_summary(state, tickers):
+    """stock_risk_summary.csv rows, in the layer-1 notebook's sorted order."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        summary = pd.DataFrame({
+            "Stock": tickers,
+            "Avg_Daily_Return": state["ret_sum"] / state["ret_n"],
+            "Avg_20D_Volatility": state["vol_sum"] / state["vol_n"],
+        })
+    return summary.sort_values("Stock").reset_index(drop=True)
+
+
+def portfolio_weights(risk_df):
+    """Risk-adjusted weights, exactly as the Portfolio Weighatge notebook."""
+    risk_df = risk_df.replace([np.inf, -np.inf], np.nan).dropna().copy()
+
+    risk_df["Risk_Adjusted_Score"] = (
+        risk_df["Avg_Daily_Return"] / risk_df["Avg_20D_Volatility"]
+    ).clip(lower=0)
+    risk_df["Portfolio_Weight"] = (
+        risk_df["Risk_Adjusted_Score"] / risk_df["Risk_Adjusted_Score"].sum()
+    )
+
+    weights_df = risk_df.sort_values(
+        "Portfolio_Weight", ascending=False, kind="stable"
+    )
+    weights_df["Portfolio_Weight_Percent"] = weights_df["Portfolio_Weight"] * 100
+
+    return weights_df[[
+        "Stock",
+        "Avg_Daily_Return",
+        "Avg_20D_Volatility",
+        "Risk_Adjusted_Score",
+        "Portfolio_Weight_Percent"
+    ]].round({
+        "Avg_Daily_Return": 6,
+        "Avg_20D_Volatility": 6,
+        "Risk_Adjusted_Score": 6,
+        "Portfolio_Weight_Percent": 2
+    })
+
+
+def portfolio_volatility_rows(tail_ret, new_ret, dates):
+    """Equal-weight portfolio 20d vol for the new dates only."""
+    with np.errstate(invalid="ignore"):
+        port = np.nanmean(np.concatenate([tail_ret, new_ret]), axis=1)
+    vol = rolling_stat(port[-(len(new_ret) + WINDOW - 1):], WINDOW, "std")
+    vol = vol[WINDOW - 1:, 0]
+    out = pd.DataFrame({
+        "Date": pd.DatetimeIndex(dates).strftime("%Y-%m-%d"),
+        "Portfolio_All_20d_Volatility": vol,
+    })
+    return out.dropna()
+
+
+# =========================================================
+# ENTRY POINT
+# =========================================================
+def bars_to_cube(bars, tickers, fields=FIELDS):
+    """Wide new-bar frame → (k, N, F) array aligned to the panel."""
+    extra = [
+        c for c in bars.columns
+        if c != DATE_COL and c.split("_", 1)[0] not in set(tickers)
+    ]
+    if extra:
+        raise KeyError(f"Tickers not in the panel universe: {extra[:5]}")
+
+    k = len(bars)
+    out = np.full((k, len(tickers), len(fields)), np.nan)
+    for i, t in enumerate(tickers):
+        for j, f in enumerate(fields):
+            col = column_name(t, f)
+            if col in bars.columns:
+                out[:, i, j] = bars[col].to_numpy(dtype=np.float64)
+    return out
+
+
+def _artifacts(data_dir):
+    """Artifact paths relocated under `data_dir` (default: Data/)."""
+    paths = {
+        "clean": CLEAN_PANEL_CSV,
+        "store": PANEL_STORE_DIR,
+        "cube": PANEL_CUBE_DIR,
+        "state": INCREMENTAL_STATE,
+        "online": ONLINE_STATE,
+        "hmm": HMM_MODEL,
+        "risk": STOCK_RISK_CSV,
+        "weights": WEIGHTS_CSV,
+        "corr": CORR_CSV,
+        "corr_store": CORR_STORE_DIR,
+        "port_vol": PORTFOLIO_VOL_CSV,
+        "beta": ROLLING_BETA_CSV,
+        "ml": ML_RESULTS_CSV,
+        "garch": GARCH_RESULTS_CSV,
+        "registry": VOL_MODEL_REGISTRY,
+    }
+    return {
+        k: os.path.join(data_dir, os.path.basename(v))
+        for k, v in paths.items()
+    }
+
+
+def append_bars(bars, data_dir=DATA_DIR):
+    """
+    Nightly job: append new OHLCV bars and roll every derived artifact.
+
+    `bars` is a wide frame with `Date` and `{TICKER}_{Close,High,Low,
+    Open,Volume}` columns for dates after the last panel date. Derived
+    fields are recomputed from the panel tail; summaries, weights,
+    correlations and portfolio vol come from running aggregates, the
+    regime filter steps forward one day at a time, and the Layer-2
+    volatility forecasts, model registry and GARCH models are refit
+    for every ticker.
+    """
+    p = _artifacts(data_dir)
+    ensure_cube(p["clean"], p["cube"])
+    ensure_panel_store(p["clean"], p["store"])
+    cube = open_cube(p["cube"])
+    tickers, fields = cube.tickers, cube.fields
+
+    bars = bars.copy()
+    bars[DATE_COL] = pd.to_datetime(bars[DATE_COL])
+    bars = bars.sort_values(DATE_COL).reset_index(drop=True)
+    dates = bars[DATE_COL].to_numpy(dtype="datetime64[ns]")
+    if len(dates) == 0:
+        return 0
+    if dates[0] <= cube.dates[-1]:
+        raise ValueError(
+            f"New bars must start after {pd.Timestamp(cube.dates[-1]).date()}"
+        )
+
+    state = load_state(cube, p["state"], p["clean"])
+
+    tail = np.array(cube.values[-TAIL_ROWS:])
+    new = derive_new_rows(tail, bars_to_cube(bars, tickers, fields), fields)
+    ret_j = fields.index("Daily Return")
+
+    # --- clean panel: CSV text append, new Parquet part, cube rows ---
+    new_panel = pd.DataFrame(
+        new.reshape(len(new), -1),
+        columns=[column_name(t, f) for t in tickers for f in fields]
+    )
+    new_panel.insert(0, DATE_COL, pd.DatetimeIndex(dates))
+    header = pd.read_csv(p["clean"], nrows=0).columns
+    _write_csv(
+        new_panel[header], p["clean"], append=True,
+        index=False, date_format="%Y-%m-%d"
+    )
+    write_panel_store(new_panel, p["store"], part=len(store_parts(p["store"])))
+    append_cube(new, dates, p["cube"])
+    stamp_derived(p["store"], p["clean"])
+    stamp_derived(p["cube"], p["clean"])
+
+    # --- layer-1 aggregates ---
+    state = update_state(state, new, fields)
+    cube = open_cube(p["cube"])
+    advance_online_book(cube, new[:, :, fields.index("Close")], dates, p["online"])
+    advance_regime_filter(cube, new[:, :, ret_j], dates, p["hmm"])
+    _write_csv(cube_beta_table(cube), p["beta"], index=False)
+
+    risk_df = stock_risk_summary(state, tickers)
+    _write_csv(risk_df, p["risk"], index=False)
+    _write_csv(portfolio_weights(risk_df), p["weights"], index=False)
+
+    corr = pd.DataFrame(
+        correlation_from_state(state), index=tickers, columns=tickers
+    )
+    _write_csv(corr, p["corr"])
+    write_corr_store(corr, p["corr_store"])
+    stamp_derived(p["corr_store"], p["corr"])
+
+    _write_csv(
+        portfolio_volatility_rows(tail[:, :, ret_j], new[:, :, ret_j], dates),
+        p["port_vol"],
+        append=True,
+        index=False
+    )
+
+    # --- layer-2 forecasts: every ticker retrained in one batched solve ---
+    fit = train_universe(cube)
+    _write_csv(results_table(fit), p["ml"], index=False)
+    build_registry(cube, p["registry"], p["clean"], fit)
+    _write_csv(garch_table(fit_universe(cube)), p["garch"], index=False)
+
+    # the aggregates describe everything above, so they land last
+    save_state(state, tickers, p["state"], p["clean"])
+    return len(new)
+
+
+if __name__ == "__main__":
+    from .ingest import read_raw_panel
+
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m core.incremental <new_bars.csv>")
+
+    n = append_bars(read_raw_panel(sys.argv[1]))
+    print(f"Appended {n} new trading day(s)")
@@ -0,0 +1,132 @@
+# =========================================================
+# RAW PANEL INGEST
+# Parses the yfinance-style multi-row header of
+# sp100_stocks_data.csv straight into typed columns
+# =========================================================
+
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+from .manifest import record, stamp_derived
+from .paths import CLEAN_PANEL_CSV, PANEL_CUBE_DIR, PANEL_STORE_DIR, RAW_PANEL_CSV
+from .schema import DATE_COL, column_name, split_column
+
+# Row 0: tickers, row 1: fields, row 2: "Ticker" row, row 3: "Date" row
+HEADER_ROWS = 4
+
+
+# =========================================================
+# HEADER
+# =========================================================
+def read_raw_header(path=RAW_PANEL_CSV):
+    """
+    Build `{TICKER}_{Field}` names from the first two header rows.
+
+    Returns (usecols, names): positions of the kept columns and their
+    clean names, with `Date` first. Columns lacking a ticker or field
+    are dropped, exactly as the PreProcessing notebook did.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        tickers = next(reader)
+        fields = next(reader)
+
+    usecols, names = [0], [DATE_COL]
+    last_field = None
+
+    for pos, (t, fld) in enumerate(zip(tickers[1:], fields[1:]), start=1):
+        if fld:
+            last_field = fld
+        if t and last_field:
+            usecols.append(pos)
+            names.append(column_name(t, last_field))
+
+    return usecols, names
+
+
+def _read_kwargs(path):
+    usecols, names = read_raw_header(path)
+    dtype = {n: np.float64 for n in names if n != DATE_COL}
+    return dict(
+        skiprows=HEADER_ROWS,
+        header=None,
+        usecols=usecols,
+        names=names,
+        dtype=dtype,
+        parse_dates=[DATE_COL],
+        float_precision="round_trip",
+    )
+
+
+# =========================================================
+# BODY
+# =========================================================
+def _finalize(panel):
+    """Volume → int64 when complete; sort by date."""
+    for col in panel.columns:
+        if col == DATE_COL or split_column(col)[1] != "Volume":
+            continue
+        vol = panel[col].to_numpy()
+        if not np.isnan(vol).any():
+            panel[col] = vol.astype(np.int64)
+
+    return panel.sort_values(DATE_COL).reset_index(drop=True)
+
+
+def read_raw_panel(path=RAW_PANEL_CSV):
+    """Parse the raw download in one typed pass (no object intermediate)."""
+    return _finalize(pd.read_csv(path, **_read_kwargs(path)))
+
+
+def iter_raw_panel(path=RAW_PANEL_CSV, chunksize=250):
+    """
+    Stream the raw download in typed row chunks, for files too large
+    to hold twice. Chunks come back in file order, unsorted.
+    """
+    reader = pd.read_csv(path, chunksize=chunksize, **_read_kwargs(path))
+    for chunk in reader:
+        yield chunk
+
+
+def ingest_raw_panel(
+    raw_path=RAW_PANEL_CSV,
+    clean_path=CLEAN_PANEL_CSV,
+    build_stores=True,
+    store_dir=None,
+    cube_dir=None
+):
+    """
+    PreProcessing stage: raw download → clean_sp100_data.csv, then
+    rebuild the columnar store and cube from the typed frame.
+
+    The store and cube default to siblings of `clean_path`, so a
+    custom output never overwrites (or mis-stamps) the Data/ copies.
+    """
+    data_dir = os.path.dirname(os.path.abspath(clean_path))
+    if store_dir is None:
+        store_dir = os.path.join(data_dir, os.path.basename(PANEL_STORE_DIR))
+    if cube_dir is None:
+        cube_dir = os.path.join(data_dir, os.path.basename(PANEL_CUBE_DIR))
+
+    panel = read_raw_panel(raw_path)
+    panel.to_csv(clean_path, index=False, date_format="%Y-%m-%d")
+    record(os.path.basename(clean_path), data_dir=data_dir)
+
+    if build_stores:
+        from .cube import write_cube
+        from .panel_store import write_panel_store
+
+        write_panel_store(panel, store_dir)
+        write_cube(panel, cube_dir)
+        stamp_derived(store_dir, clean_path)
+        stamp_derived(cube_dir, clean_path)
+
+    return panel
+
+
+if __name__ == "__main__":
+    out = ingest_raw_panel()
+    print(f"Clean panel: {out.shape[0]} rows × {out.shape[1]} columns")
@@ -0,0 +1,215 @@
+# =========================================================
+# ARTIFACT MANIFEST
+# Content hash, shape, producing stage and schema version for
+# every Data/ artifact. Loaders key their caches on the hash,
+# so a refreshed file is reloaded and everything else stays hot.
+# =========================================================
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:             # Windows: writers are not serialized
+    fcntl = None
+
+from .paths import DATA_DIR
+
+MANIFEST_NAME = "manifest.json"
+
+# held exclusively around every read-modify-write of the manifest
+LOCK_NAME = "manifest.lock"
+
+# written into derived directories (cube, Parquet store)
+SOURCE_STAMP = "source.json"
+
+# artifact → (producing stage, schema version)
+ARTIFACTS = {
+    "sp100_stocks_data.csv": ("download", 1),
+    "clean_sp100_data.csv": ("preprocessing", 1),
+    "stock_risk_summary.csv": ("risk_layer1", 1),
+    "portfolio_volatility_all_stocks.csv": ("risk_layer1", 1),
+    "portfolio_weights_percentage.csv": ("portfolio_weighting", 1),
+    "stock_return_correlation_matrix.csv": ("portfolio_weighting", 1),
+    "rolling_beta.csv": ("risk_layer1", 1),
+    "layer2_ml_results.csv": ("ml_layer2", 1),
+    "layer2_garch_results.csv": ("ml_layer2", 1),
+    "vol_model_registry.npz": ("ml_layer2", 1),
+}
+
+_CHUNK = 1 << 20
+
+# manifest path → (mtime_ns, parsed entries), reused until it changes
+_cache = {}
+
+
+# =========================================================
+# HASHING
+# =========================================================
+def _describe(path):
+    """sha256 of the bytes plus data row / column counts for CSVs."""
+    digest = hashlib.sha256()
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+
+    info = {"sha256": digest.hexdigest()}
+    if path.endswith(".csv"):
+        if last != b"\n":
+            lines += 1
+        with open(path, newline="") as f:
+            header = next(csv.reader(f), [])
+        info["rows"] = max(lines - 1, 0)
+        info["columns"] = len(header)
+    return info
+
+
+# =========================================================
+# MANIFEST FILE
+# =========================================================
+def read_manifest(data_dir=DATA_DIR):
+    """Artifact entries keyed by file name ({} when no manifest yet)."""
+    path = os.path.join(data_dir, MANIFEST_NAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return _cache.get(path, (None, {}))[1]
+
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as f:
+            cached = (mtime, json.load(f)["artifacts"])
+        _cache[path] = cached
+    return cached[1]
+
+
+@contextmanager
+def _locked(data_dir):
+    """Exclusive lock shared by every process recording into `data_dir`."""
+    with open(os.path.join(data_dir, LOCK_NAME), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_manifest(entries, data_dir):
+    # a private temp file per writer, swapped in whole
+    fd, tmp = tempfile.mkstemp(prefix=f"{MANIFEST_NAME}.", suffix=".tmp", dir=data_dir)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"artifacts": entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp, os.path.join(data_dir, MANIFEST_NAME))
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def record(name, stage=None, data_dir=DATA_DIR):
+    """
+    Hash `name` and store its entry; called by every producing stage
+    right after it writes the artifact. Returns the new entry.
+    """
+    path = os.path.join(data_dir, name)
+    st = os.stat(path)
+    default_stage, version = ARTIFACTS.get(name, (None, 1))
+
+    entry = _describe(path)
+    entry.update({
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "stage": stage or default_stage,
+        "schema_version": version,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+
+    try:
+        # re-read under the lock so concurrent recorders never drop
+        # each other's entries
+        with _locked(data_dir):
+            _cache.pop(os.path.join(data_dir, MANIFEST_NAME), None)
+            entries = dict(read_manifest(data_dir))
+            entries[name] = entry
+            _write_manifest(entries, data_dir)
+    except OSError:
+        # read-only deploys still get a correct in-process hash
+        entries = dict(read_manifest(data_dir))
+        entries[name] = entry
+        _cache[os.path.join(data_dir, MANIFEST_NAME)] = (None, entries)
+    return entry
+
+
+def artifact_hash(name, data_dir=DATA_DIR):
+    """
+    Current content hash of an artifact.
+
+    Costs one stat() when the file still matches its manifest entry;
+    a file changed outside the pipeline is rehashed and re-recorded.
+    """
+    st = os.stat(os.path.join(data_dir, name))
+    entry = read_manifest(data_dir).get(name)
+
+    if (
+        entry is not None
+        and entry["size"] == st.st_size
+        and entry["mtime_ns"] == st.st_mtime_ns
+    ):
+        return entry["sha256"]
+
+    return record(name, data_dir=data_dir)["sha256"]
+
+
+def file_hash(path):
+    """artifact_hash() addressed by full path."""
+    return artifact_hash(os.path.basename(path), os.path.dirname(path))
+
+
+# =========================================================
+# DERIVED ARTIFACTS
+# =========================================================
+def stamp_derived(out_dir, source_path):
+    """Remember which source content `out_dir` was built from."""
+    stamp = {
+        "source": os.path.basename(source_path),
+        "sha256": file_hash(source_path),
+    }
+    with open(os.path.join(out_dir, SOURCE_STAMP), "w") as f:
+        json.dump(stamp, f)
+
+
+def is_current(out_dir, source_path):
+    """True when `out_dir` was built from the source's current content."""
+    try:
+        with open(os.path.join(out_dir, SOURCE_STAMP)) as f:
+            stamp = json.load(f)
+    except FileNotFoundError:
+        return False
+    return stamp["sha256"] == file_hash(source_path)
+
+
+def build_manifest(data_dir=DATA_DIR):
+    """Record every known artifact present in `data_dir`."""
+    for name in ARTIFACTS:
+        if os.path.exists(os.path.join(data_dir, name)):
+            record(name, data_dir=data_dir)
+    return read_manifest(data_dir)
+
+
+if __name__ == "__main__":
+    for name, entry in build_manifest().items():
+        print(f"{name:40s} {entry['sha256'][:12]}  {entry.get('rows', '-')} rows")
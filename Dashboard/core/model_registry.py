@@ -0,0 +1,241 @@
+# =========================================================
+# VOLATILITY MODEL REGISTRY & FORECAST SERVICE
+# The fitted Layer-2 linear models — coefficients, feature schema,
+# training window and a version number — persisted in one small
+# .npz. The forecast service scores every ticker on every date of
+# the current panel once, so any (ticker, as-of date) is a lookup.
+# =========================================================
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .manifest import file_hash, record
+from .paths import CLEAN_PANEL_CSV, VOL_MODEL_REGISTRY
+from .vol_forecast import FEATURES, HORIZON, ML_COLUMNS, feature_tensor, train_universe
+
+# bumped when the stored arrays change meaning
+SCHEMA_VERSION = 1
+
+
+class ModelRegistry:
+    """
+    One linear volatility model per ticker: `coef` (N, F) in raw
+    feature units, `intercept` (N,), hold-out `rmse`, and the
+    training window (`train_start`, `train_end`, `n_train`). `version`
+    counts registry builds; `source_hash` is the panel it was fitted on.
+    """
+
+    def __init__(
+        self, tickers, features, coef, intercept, rmse, train_start, train_end, n_train,
+        horizon=HORIZON, version=1, trained_at="", source_hash=""
+    ):
+        self.tickers = list(tickers)
+        self.features = tuple(features)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.rmse = np.asarray(rmse, dtype=np.float64)
+        self.train_start = np.asarray(train_start, dtype="datetime64[D]")
+        self.train_end = np.asarray(train_end, dtype="datetime64[D]")
+        self.n_train = np.asarray(n_train, dtype=np.int64)
+        self.horizon = int(horizon)
+        self.version = int(version)
+        self.trained_at = str(trained_at)
+        self.source_hash = str(source_hash)
+
+    @classmethod
+    def from_fit(cls, fit, features=FEATURES, version=1, source_hash=""):
+        """Wrap a vol_forecast.train_universe() result."""
+        model = fit["model"]
+        return cls(
+            fit["tickers"], features, model.coef, model.intercept, fit["rmse"],
+            fit["train_start"], fit["train_end"], fit["n_train"],
+            version=version,
+            trained_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+            source_hash=source_hash,
+        )
+
+    def table(self):
+        """Per-ticker model card: window, size, error and coefficients."""
+        table = pd.DataFrame(self.coef, columns=list(self.features))
+        table.insert(0, "Intercept", self.intercept)
+        table.insert(0, "RMSE", self.rmse)
+        table.insert(0, "Train_Rows", self.n_train)
+        table.insert(0, "Train_End", pd.DatetimeIndex(self.train_end))
+        table.insert(0, "Train_Start", pd.DatetimeIndex(self.train_start))
+        table.insert(0, "Ticker", self.tickers)
+        return table
+
+    # -----------------------------------------------------
+    def save(self, path=VOL_MODEL_REGISTRY):
+        # written beside the target and swapped in, so readers never see half a file
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                schema_version=SCHEMA_VERSION,
+                tickers=np.array(self.tickers, dtype=str),
+                features=np.array(self.features, dtype=str),
+                coef=self.coef,
+                intercept=self.intercept,
+                rmse=self.rmse,
+                train_start=self.train_start,
+                train_end=self.train_end,
+                n_train=self.n_train,
+                horizon=self.horizon,
+                version=self.version,
+                trained_at=self.trained_at,
+                source_hash=self.source_hash,
+            )
+        os.replace(tmp, path)
+        record(os.path.basename(path), data_dir=os.path.dirname(path))
+        return path
+
+    @classmethod
+    def load(cls, path=VOL_MODEL_REGISTRY):
+        with np.load(path) as z:
+            if int(z["schema_version"]) != SCHEMA_VERSION:
+                raise ValueError(f"{path}: unsupported registry schema {int(z['schema_version'])}")
+            return cls(
+                [str(t) for t in z["tickers"]], [str(f) for f in z["features"]],
+                z["coef"], z["intercept"], z["rmse"],
+                z["train_start"], z["train_end"], z["n_train"],
+                int(z["horizon"]), int(z["version"]), str(z["trained_at"]), str(z["source_hash"]),
+            )
+
+
+def build_registry(cube, path=VOL_MODEL_REGISTRY, source=CLEAN_PANEL_CSV, fit=None):
+    """
+    Save every ticker's model (`fit`, or a fresh train_universe) as
+    the next registry version.
+    """
+    version = 1
+    if os.path.exists(path):
+        try:
+            version = ModelRegistry.load(path).version + 1
+        except (ValueError, KeyError):
+            pass
+    registry = ModelRegistry.from_fit(
+        fit or train_universe(cube), version=version, source_hash=file_hash(source)
+    )
+    registry.save(path)
+    return registry
+
+
+# =========================================================
+# FORECAST SERVICE
+# =========================================================
+class ForecastService:
+    """
+    Scores a registry against a cube. Predictions for all (ticker,
+    date) pairs are one einsum at construction; a forecast "as of" a
+    date uses the latest row on or before it with complete features.
+    """
+
+    def __init__(self, registry, cube):
+        missing = [t for t in registry.tickers if t not in cube.tickers]
+        if missing:
+            raise KeyError(f"Tickers not in the panel: {missing[:5]}")
+
+        self.registry = registry
+        self.dates = pd.DatetimeIndex(cube.dates)
+        pos = {t: i for i, t in enumerate(cube.tickers)}
+        idx = [pos[t] for t in registry.tickers]
+
+        X, close, usable = feature_tensor(cube, registry.features)
+        X, close, usable = X[idx], close[idx], usable[idx]
+        pred = np.einsum("ntf,nf->nt", X, registry.coef) + registry.intercept[:, None]
+
+        T = len(self.dates)
+        # index of the latest usable row at or before each date (−1: none yet)
+        self._last = np.maximum.accumulate(np.where(usable, np.arange(T), -1), axis=1)
+        self.predicted = np.where(usable, pred, np.nan)
+        self.close = np.where(usable, close, np.nan)
+        self._pos = {t: i for i, t in enumerate(registry.tickers)}
+
+    @property
+    def tickers(self):
+        return self.registry.tickers
+
+    @property
+    def first_complete_date(self):
+        """Earliest date on which every ticker can be scored."""
+        complete = (self._last >= 0).all(axis=0)
+        return self.dates[complete.argmax()] if complete.any() else None
+
+    def _rows(self, as_of):
+        """Per-ticker row indices (−1 when nothing is usable yet)."""
+        t = len(self.dates) - 1 if as_of is None else self.dates.searchsorted(pd.Timestamp(as_of), "right") - 1
+        if t < 0:
+            return np.full(len(self.tickers), -1)
+        return self._last[:, t]
+
+    def forecast_table(self, as_of=None):
+        """
+        Every ticker's forecast as of a date (default: latest), in the
+        layer2_ml_results.csv layout plus `As_Of` and `Model_Version`.
+        """
+        rows = self._rows(as_of)
+        ok = rows >= 0
+        idx = np.arange(len(rows))
+        r = np.where(ok, rows, 0)
+        vol = np.where(ok, self.predicted[idx, r], np.nan)
+        price = np.where(ok, self.close[idx, r], np.nan)
+
+        table = pd.DataFrame({
+            "Ticker": self.tickers,
+            "RMSE": self.registry.rmse,
+            "Latest_Price": price,
+            "Predicted_5D_Vol": vol,
+            "Price_Lower_68": price * (1 - vol),
+            "Price_Upper_68": price * (1 + vol),
+        })[ML_COLUMNS]
+        table["As_Of"] = self.dates[r]
+        table["Model_Version"] = self.registry.version
+        return table[ok].sort_values("Ticker").reset_index(drop=True)
+
+    def forecast(self, ticker, as_of=None):
+        """One ticker's forecast row (a dict), or None before its first usable date."""
+        i = self._pos[ticker]
+        t = self._rows(as_of)[i]
+        if t < 0:
+            return None
+        price, vol = self.close[i, t], self.predicted[i, t]
+        return {
+            "Ticker": ticker,
+            "As_Of": self.dates[t],
+            "Latest_Price": price,
+            "Predicted_5D_Vol": vol,
+            "Price_Lower_68": price * (1 - vol),
+            "Price_Upper_68": price * (1 + vol),
+            "Model_Version": self.registry.version,
+        }
+
+    def history(self, ticker):
+        """Date / Predicted_5D_Vol / Close over every scorable date."""
+        i = self._pos[ticker]
+        return pd.DataFrame({
+            "Date": self.dates,
+            "Predicted_5D_Vol": self.predicted[i],
+            "Close": self.close[i],
+        }).dropna()
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .cube import ensure_cube, open_cube
+
+    cube = open_cube(ensure_cube())
+    registry = build_registry(cube)
+    service = ForecastService(registry, cube)
+
+    as_of = sys.argv[1] if len(sys.argv) > 1 else None
+    t0 = time.perf_counter()
+    table = service.forecast_table(as_of)
+    ms = (time.perf_counter() - t0) * 1000
+    print(f"Registry v{registry.version}: {len(registry.tickers)} models → {VOL_MODEL_REGISTRY}")
+    print(table.head(10).to_string(index=False))
+    print(f"{len(table)} forecasts as of {table['As_Of'].max().date()} in {ms:.1f} ms")
@@ -0,0 +1,264 @@
+# =========================================================
+# ONLINE ROLLING VOLATILITY STATE
+# Per-ticker ring buffers with running sums: each new bar updates
+# 20d volatility, 20d MA and cumulative return in O(1), and the
+# whole book snapshots to one .npz so a restart needs no replay.
+# =========================================================
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from .paths import ONLINE_STATE
+
+WINDOW = 20
+
+
+# =========================================================
+# PER-TICKER STATE
+# =========================================================
+class RollingVolState:
+    """
+    Streaming state for one ticker.
+
+    Same definitions as the download: return vs the previous close,
+    cumulative return as the running product of (1 + r), 20-bar
+    std (ddof=1) of returns and 20-bar mean of closes. Missing bars
+    (NaN close) are skipped, as the download skips missing days.
+    """
+
+    __slots__ = (
+        "window",
+        "rets", "ret_pos", "ret_n", "ret_sum", "ret_sq",
+        "closes", "close_pos", "close_n", "close_sum",
+        "last_close", "cum_level",
+    )
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.rets = [0.0] * window
+        self.ret_pos = 0
+        self.ret_n = 0
+        self.ret_sum = 0.0
+        self.ret_sq = 0.0
+        self.closes = [0.0] * window
+        self.close_pos = 0
+        self.close_n = 0
+        self.close_sum = 0.0
+        self.last_close = math.nan
+        self.cum_level = math.nan
+
+    # -----------------------------------------------------
+    def _push_ret(self, r):
+        old = self.rets[self.ret_pos]
+        self.rets[self.ret_pos] = r
+        self.ret_pos = (self.ret_pos + 1) % self.window
+        if self.ret_n < self.window:
+            self.ret_n += 1
+            self.ret_sum += r
+            self.ret_sq += r * r
+        elif self.ret_pos == 0:
+            # once per lap: resync the running sums from the buffer
+            # so subtraction error never accumulates
+            self.ret_sum = math.fsum(self.rets)
+            self.ret_sq = math.fsum(v * v for v in self.rets)
+        else:
+            self.ret_sum += r - old
+            self.ret_sq += r * r - old * old
+
+    def _push_close(self, c):
+        old = self.closes[self.close_pos]
+        self.closes[self.close_pos] = c
+        self.close_pos = (self.close_pos + 1) % self.window
+        if self.close_n < self.window:
+            self.close_n += 1
+            self.close_sum += c
+        elif self.close_pos == 0:
+            self.close_sum = math.fsum(self.closes)
+        else:
+            self.close_sum += c - old
+
+    def update(self, close):
+        """Consume one bar's close; NaN closes are ignored."""
+        if math.isnan(close):
+            return self
+
+        if not math.isnan(self.last_close):
+            r = close / self.last_close - 1
+            self._push_ret(r)
+            level = 1.0 if math.isnan(self.cum_level) else self.cum_level
+            self.cum_level = level * (1 + r)
+
+        self._push_close(close)
+        self.last_close = close
+        return self
+
+    # -----------------------------------------------------
+    @property
+    def vol(self):
+        w = self.window
+        if self.ret_n < w:
+            return math.nan
+        var = (self.ret_sq - self.ret_sum * self.ret_sum / w) / (w - 1)
+        return math.sqrt(max(var, 0.0))
+
+    @property
+    def ma(self):
+        if self.close_n < self.window:
+            return math.nan
+        return self.close_sum / self.window
+
+    @property
+    def cum_return(self):
+        return self.cum_level
+
+    @classmethod
+    def from_history(cls, closes, returns, cum_level, window=WINDOW):
+        """
+        Seed from already-derived history: the ticker's valid closes
+        and returns (oldest first) and its latest cumulative return.
+        """
+        state = cls(window)
+        for c in np.asarray(closes, dtype=np.float64)[-window:]:
+            state._push_close(float(c))
+        for r in np.asarray(returns, dtype=np.float64)[-window:]:
+            state._push_ret(float(r))
+        if len(closes):
+            state.last_close = float(closes[-1])
+        state.cum_level = float(cum_level)
+        return state
+
+
+# =========================================================
+# BOOK OF TICKERS
+# =========================================================
+class OnlineRiskBook:
+    """RollingVolState per ticker plus the date of the last bar seen."""
+
+    def __init__(self, states, as_of=None):
+        self.states = states
+        self.as_of = as_of
+
+    @property
+    def tickers(self):
+        return list(self.states)
+
+    def update(self, date, closes):
+        """One bar for every ticker; `closes` maps ticker → close."""
+        for ticker, close in closes.items():
+            state = self.states.get(ticker)
+            if state is None:
+                state = self.states[ticker] = RollingVolState()
+            state.update(float(close))
+        self.as_of = pd.Timestamp(date)
+        return self
+
+    def frame(self):
+        """Latest 20d Volatility / 20d MA / Cumulative Return per ticker."""
+        return pd.DataFrame({
+            "Stock": self.tickers,
+            "20d Volatility": [s.vol for s in self.states.values()],
+            "20d MA": [s.ma for s in self.states.values()],
+            "Cumulative Return": [s.cum_return for s in self.states.values()],
+        })
+
+    @classmethod
+    def from_cube(cls, cube, window=WINDOW):
+        """Seed from the panel cube's last `window` valid bars per ticker."""
+        close = cube.field("Close")
+        ret = cube.field("Daily Return")
+        cum = cube.field("Cumulative Return")
+        tail = slice(max(len(cube.dates) - 4 * window, 0), None)
+
+        states = {}
+        for i, t in enumerate(cube.tickers):
+            c, r, g = (np.asarray(a[tail, i]) for a in (close, ret, cum))
+            g = g[~np.isnan(g)]
+            states[t] = RollingVolState.from_history(
+                c[~np.isnan(c)],
+                r[~np.isnan(r)],
+                g[-1] if len(g) else math.nan,
+                window
+            )
+        as_of = pd.Timestamp(cube.dates[-1]) if len(cube.dates) else None
+        return cls(states, as_of)
+
+    # -----------------------------------------------------
+    def snapshot(self, path=ONLINE_STATE):
+        """Write every ticker's buffers and running sums to one .npz."""
+        s = list(self.states.values())
+        arrays = {
+            "tickers": np.array(self.tickers, dtype=str),
+            "as_of": np.array(
+                [self.as_of.value if self.as_of is not None else -1], dtype=np.int64
+            ),
+            "window": np.array([x.window for x in s], dtype=np.int64),
+        }
+        for name in RollingVolState.__slots__:
+            if name == "window":
+                continue
+            arrays[name] = np.array([getattr(x, name) for x in s], dtype=np.float64)
+
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def restore(cls, path=ONLINE_STATE):
+        with np.load(path) as z:
+            data = {k: z[k] for k in z.files}
+
+        states = {}
+        for i, t in enumerate(data["tickers"]):
+            state = RollingVolState(int(data["window"][i]))
+            for name in RollingVolState.__slots__:
+                if name == "window":
+                    continue
+                value = data[name][i]
+                if name in ("rets", "closes"):
+                    value = [float(v) for v in value]
+                elif name.endswith(("_pos", "_n")):
+                    value = int(value)
+                else:
+                    value = float(value)
+                setattr(state, name, value)
+            states[str(t)] = state
+
+        as_of = int(data["as_of"][0])
+        return cls(states, pd.Timestamp(as_of) if as_of >= 0 else None)
+
+
+def advance_online_book(cube, new_closes, dates, path=ONLINE_STATE):
+    """
+    Roll the saved book forward by the new (k, N) closes, or seed it
+    from `cube` (already holding the new rows) if the snapshot is
+    missing or stale. Returns the book after saving it.
+    """
+    prior = pd.Timestamp(cube.dates[-len(dates) - 1]) if len(cube.dates) > len(dates) else None
+    book = None
+    if os.path.exists(path):
+        book = OnlineRiskBook.restore(path)
+        if book.as_of != prior or book.tickers != list(cube.tickers):
+            book = None
+
+    if book is None:
+        book = OnlineRiskBook.from_cube(cube)
+    else:
+        for date, row in zip(dates, new_closes):
+            book.update(date, dict(zip(cube.tickers, row)))
+
+    book.snapshot(path)
+    return book
+
+
+if __name__ == "__main__":
+    from .cube import ensure_cube, open_cube
+
+    book = OnlineRiskBook.from_cube(open_cube(ensure_cube()))
+    book.snapshot()
+    print(f"Online state for {len(book.states)} tickers as of "
+          f"{book.as_of.date()} → {ONLINE_STATE}")
+    print(book.frame().set_index("Stock").head())
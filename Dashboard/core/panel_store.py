@@ -0,0 +1,167 @@
+# =========================================================
+# COLUMNAR PANEL STORE
+# Parquet copy of clean_sp100_data.csv with column projection
+# and date-range pruning, so callers only read what they use
+# =========================================================
+
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .manifest import is_current, stamp_derived
+from .paths import CLEAN_PANEL_CSV, PANEL_STORE_DIR
+from .schema import DATE_COL, column_name, panel_fields, panel_tickers
+
+# ~one quarter of trading days per row group: date filters skip
+# whole row groups using the Parquet min/max statistics
+ROW_GROUP_SIZE = 63
+
+METADATA_KEY = b"panel_layout"
+
+
+# =========================================================
+# WRITE
+# =========================================================
+def _layout(columns):
+    """Ticker → column group mapping stored in the Parquet footer."""
+    tickers = panel_tickers(columns)
+    fields = panel_fields(columns)
+    groups = {
+        t: [c for c in columns if c.startswith(f"{t}_")]
+        for t in tickers
+    }
+    return {"tickers": tickers, "fields": fields, "groups": groups}
+
+
+def _to_table(panel):
+    panel = panel.copy()
+    panel[DATE_COL] = pd.to_datetime(panel[DATE_COL])
+    table = pa.Table.from_pandas(panel, preserve_index=False)
+    layout = json.dumps(_layout(list(panel.columns))).encode()
+    meta = dict(table.schema.metadata or {})
+    meta[METADATA_KEY] = layout
+    return table.replace_schema_metadata(meta)
+
+
+def write_panel_store(panel, store_dir=PANEL_STORE_DIR, part=0):
+    """
+    Write a wide panel DataFrame as one Parquet part of the store.
+    Parts are append-only; `part=0` replaces the whole store.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+
+    if part == 0:
+        for name in os.listdir(store_dir):
+            if name.endswith(".parquet"):
+                os.remove(os.path.join(store_dir, name))
+
+    path = os.path.join(store_dir, f"part-{part:05d}.parquet")
+    pq.write_table(
+        _to_table(panel),
+        path,
+        row_group_size=ROW_GROUP_SIZE,
+        compression="zstd"
+    )
+    return path
+
+
+def build_panel_store(csv_path=CLEAN_PANEL_CSV, store_dir=PANEL_STORE_DIR):
+    """One-off conversion of the cleaned CSV into the columnar store."""
+    panel = pd.read_csv(csv_path, parse_dates=[DATE_COL])
+    path = write_panel_store(panel, store_dir)
+    stamp_derived(store_dir, csv_path)
+    return path
+
+
+def store_parts(store_dir=PANEL_STORE_DIR):
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(
+        os.path.join(store_dir, n)
+        for n in os.listdir(store_dir)
+        if n.endswith(".parquet")
+    )
+
+
+def ensure_panel_store(csv_path=CLEAN_PANEL_CSV, store_dir=PANEL_STORE_DIR):
+    """Build the store on first use, or when the CSV content has changed."""
+    if store_parts(store_dir) and is_current(store_dir, csv_path):
+        return store_dir
+
+    build_panel_store(csv_path, store_dir)
+    return store_dir
+
+
+# =========================================================
+# READ
+# =========================================================
+def _dataset(store_dir):
+    parts = store_parts(store_dir)
+    if not parts:
+        raise FileNotFoundError(
+            f"No panel store at {store_dir}; run build_panel_store() first"
+        )
+    return ds.dataset(parts, format="parquet")
+
+
+def panel_layout(store_dir=PANEL_STORE_DIR):
+    """Tickers, fields and per-ticker column groups, read from the footer."""
+    schema = pq.read_schema(store_parts(store_dir)[0])
+    return json.loads(schema.metadata[METADATA_KEY])
+
+
+def panel_columns(tickers=None, fields=None, store_dir=PANEL_STORE_DIR):
+    """Resolve a ticker/field selection into stored column names."""
+    layout = panel_layout(store_dir)
+    tickers = layout["tickers"] if tickers is None else list(tickers)
+    fields = layout["fields"] if fields is None else list(fields)
+
+    columns = []
+    for t in tickers:
+        if t not in layout["groups"]:
+            raise KeyError(t)
+        group = set(layout["groups"][t])
+        columns.extend(
+            column_name(t, f) for f in fields if column_name(t, f) in group
+        )
+    return columns
+
+
+def load_panel(
+    tickers=None,
+    fields=None,
+    start=None,
+    end=None,
+    columns=None,
+    store_dir=PANEL_STORE_DIR
+):
+    """
+    Read a slice of the panel: only the requested `{TICKER}_{Field}`
+    columns and only the row groups overlapping [start, end].
+
+    Pass explicit `columns` to bypass the ticker/field selection.
+    The result always carries `Date` as its first column.
+    """
+    if columns is None:
+        columns = panel_columns(tickers, fields, store_dir)
+    columns = [DATE_COL] + [c for c in columns if c != DATE_COL]
+
+    date = ds.field(DATE_COL)
+    flt = None
+    if start is not None:
+        flt = date >= pa.scalar(pd.Timestamp(start), pa.timestamp("ns"))
+    if end is not None:
+        cond = date <= pa.scalar(pd.Timestamp(end), pa.timestamp("ns"))
+        flt = cond if flt is None else flt & cond
+
+    table = _dataset(store_dir).to_table(columns=columns, filter=flt)
+    panel = table.to_pandas()
+    return panel.sort_values(DATE_COL).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print(f"Panel store written to {build_panel_store()}")
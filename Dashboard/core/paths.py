@@ -0,0 +1,34 @@
+# =========================================================
+# PROJECT PATHS
+# Cloud-safe locations of every Data/ artifact
+# =========================================================
+
+import os
+
+BASE_DIR = os.path.dirname(
+    os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))
+    )
+)
+
+DATA_DIR = os.path.join(BASE_DIR, "Data")
+
+RAW_PANEL_CSV = os.path.join(DATA_DIR, "sp100_stocks_data.csv")
+CLEAN_PANEL_CSV = os.path.join(DATA_DIR, "clean_sp100_data.csv")
+PANEL_STORE_DIR = os.path.join(DATA_DIR, "panel_store")
+PANEL_CUBE_DIR = os.path.join(DATA_DIR, "panel_cube")
+
+STOCK_RISK_CSV = os.path.join(DATA_DIR, "stock_risk_summary.csv")
+PORTFOLIO_VOL_CSV = os.path.join(DATA_DIR, "portfolio_volatility_all_stocks.csv")
+WEIGHTS_CSV = os.path.join(DATA_DIR, "portfolio_weights_percentage.csv")
+CORR_CSV = os.path.join(DATA_DIR, "stock_return_correlation_matrix.csv")
+CORR_STORE_DIR = os.path.join(DATA_DIR, "corr_store")
+ROLLING_BETA_CSV = os.path.join(DATA_DIR, "rolling_beta.csv")
+ML_RESULTS_CSV = os.path.join(DATA_DIR, "layer2_ml_results.csv")
+GARCH_RESULTS_CSV = os.path.join(DATA_DIR, "layer2_garch_results.csv")
+FACTOR_MODEL = os.path.join(DATA_DIR, "factor_model.npz")
+HMM_MODEL = os.path.join(DATA_DIR, "hmm_model.npz")
+VOL_MODEL_REGISTRY = os.path.join(DATA_DIR, "vol_model_registry.npz")
+
+INCREMENTAL_STATE = os.path.join(DATA_DIR, "incremental_state.npz")
+ONLINE_STATE = os.path.join(DATA_DIR, "online_state.npz")
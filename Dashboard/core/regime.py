@@ -0,0 +1,143 @@
+# =========================================================
+# VOLATILITY REGIME CLASSIFICATION
+# Low / Medium / High risk labels from volatility quantiles.
+# Batch mode bins the whole history with one np.digitize; the
+# online mode keeps past values in a sorted list so each new day
+# is classified in O(log T) against thresholds it could have known.
+# =========================================================
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from sortedcontainers import SortedList
+
+REGIME_LABELS = ("Low Risk", "Medium Risk", "High Risk")
+REGIME_QUANTILES = (0.33, 0.66)
+UNCLASSIFIED = "Warming Up"
+
+# observations required before the online classifier labels a day
+MIN_HISTORY = 20
+
+
+def regime_thresholds(values, quantiles=REGIME_QUANTILES):
+    """In-sample quantile thresholds over the non-missing values."""
+    return np.nanquantile(np.asarray(values, dtype=np.float64), quantiles)
+
+
+def classify(values, thresholds):
+    """
+    Regime codes 0..len(thresholds) for an array of values: a value at
+    or below the first threshold is 0 (Low), above the last is the top
+    regime. Missing values are −1. Thresholds may be (K,) or a (T, K)
+    row per value.
+    """
+    v = np.asarray(values, dtype=np.float64)
+    edges = np.asarray(thresholds, dtype=np.float64)
+    if edges.ndim == 1:
+        codes = np.digitize(v, edges, right=True)
+    else:
+        codes = (v[:, None] > edges).sum(axis=1)
+        codes = np.where(np.isnan(edges).any(axis=1), -1, codes)
+    return np.where(np.isnan(v), -1, codes)
+
+
+def regime_names(codes, labels=REGIME_LABELS):
+    """Codes → labels; −1 becomes UNCLASSIFIED."""
+    names = np.array((*labels, UNCLASSIFIED), dtype=object)
+    return names[np.asarray(codes)]
+
+
+class OnlineRegimeClassifier:
+    """
+    Streaming classifier: each value is labelled against quantiles of
+    the values seen strictly before it — all of them (expanding) or
+    the last `window` — then added to the history. The history is a
+    SortedList, so an update and a quantile lookup are O(log T).
+    """
+
+    __slots__ = ("quantiles", "window", "min_history", "_sorted", "_recent")
+
+    def __init__(self, quantiles=REGIME_QUANTILES, window=None, min_history=MIN_HISTORY):
+        self.quantiles = tuple(quantiles)
+        self.window = window
+        self.min_history = min_history
+        self._sorted = SortedList()
+        self._recent = deque()
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def _quantile(self, q):
+        # linear interpolation, as np.quantile's default
+        pos = q * (len(self._sorted) - 1)
+        lo = int(pos)
+        frac = pos - lo
+        value = self._sorted[lo]
+        if frac > 0:
+            value += frac * (self._sorted[lo + 1] - value)
+        return value
+
+    def thresholds(self):
+        """Current thresholds, NaN until `min_history` values are held."""
+        if len(self._sorted) < max(self.min_history, 1):
+            return np.full(len(self.quantiles), np.nan)
+        return np.array([self._quantile(q) for q in self.quantiles])
+
+    def push(self, value):
+        """Add a value to the history without classifying it."""
+        if np.isnan(value):
+            return
+        self._sorted.add(value)
+        if self.window is not None:
+            self._recent.append(value)
+            if len(self._recent) > self.window:
+                self._sorted.remove(self._recent.popleft())
+
+    def update(self, value):
+        """Classify `value` against the history so far, then record it."""
+        edges = self.thresholds()
+        code = -1 if np.isnan(value) or np.isnan(edges[0]) else int(np.searchsorted(edges, value, "left"))
+        self.push(value)
+        return code, edges
+
+    def run(self, values):
+        """update() over a series: (T,) codes and (T, K) thresholds."""
+        values = np.asarray(values, dtype=np.float64)
+        codes = np.empty(len(values), dtype=np.int64)
+        edges = np.empty((len(values), len(self.quantiles)))
+        for i, v in enumerate(values):
+            codes[i], edges[i] = self.update(v)
+        return codes, edges
+
+
+def regime_frame(dates, values, mode="full", window=None, quantiles=REGIME_QUANTILES):
+    """
+    Date / value / Risk_Regime / threshold columns for one volatility
+    series. `mode` is "full" (in-sample quantiles, one np.digitize),
+    "expanding" or "rolling" (online, no lookahead; `window` days).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if mode == "full":
+        edges = np.broadcast_to(regime_thresholds(values, quantiles), (len(values), len(quantiles)))
+        codes = classify(values, edges[0])
+    else:
+        online = OnlineRegimeClassifier(quantiles, window if mode == "rolling" else None)
+        codes, edges = online.run(values)
+
+    frame = pd.DataFrame({"Date": dates, "Value": values, "Regime_Code": codes})
+    frame["Risk_Regime"] = regime_names(codes)
+    frame["Low_Threshold"] = edges[:, 0]
+    frame["High_Threshold"] = edges[:, -1]
+    return frame
+
+
+if __name__ == "__main__":
+    from .paths import PORTFOLIO_VOL_CSV
+
+    port_vol = pd.read_csv(PORTFOLIO_VOL_CSV, parse_dates=["Date"])
+    vol = port_vol["Portfolio_All_20d_Volatility"]
+    for mode, window in [("full", None), ("expanding", None), ("rolling", 60)]:
+        frame = regime_frame(port_vol["Date"], vol, mode, window)
+        counts = frame["Risk_Regime"].value_counts().to_dict()
+        print(f"{mode:>9}: latest {frame['Risk_Regime'].iloc[-1]:<12} {counts}")
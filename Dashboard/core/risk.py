@@ -0,0 +1,235 @@
+# =========================================================
+# PORTFOLIO RISK ENGINE
+# Covariance built once per (tickers, vols, correlation); every
+# decomposition after that is a single matvec: portfolio vol,
+# MCTR, component / % contribution and diversification ratio.
+# Candidate sweeps score K weight vectors with one W @ Σ, and
+# single-weight edits are rank-one O(N) updates of Σw.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+
+def covariance_matrix(vols, corr):
+    """Σ = D·C·D for a vol vector and an aligned correlation matrix."""
+    vols = np.asarray(vols, dtype=np.float64)
+    return np.asarray(corr, dtype=np.float64) * np.outer(vols, vols)
+
+
+class RiskEngine:
+    """
+    Risk decomposition over a fixed universe.
+
+    Holds the covariance read-only; decompose() accepts any weight
+    vector over the same tickers (in engine order, or a Series keyed
+    by ticker — missing names get zero weight). `returns` (expected
+    per-stock returns) is optional and only used by evaluate().
+    """
+
+    def __init__(self, tickers, vols, cov, returns=None):
+        self.tickers = list(tickers)
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.vols = np.asarray(vols, dtype=np.float64)
+        self.vols.flags.writeable = False
+        self.returns = None
+        if returns is not None:
+            self.returns = np.asarray(returns, dtype=np.float64)
+            self.returns.flags.writeable = False
+        self.cov = None
+        if cov is not None:
+            self.cov = np.asarray(cov, dtype=np.float64)
+            self.cov.flags.writeable = False
+
+    @classmethod
+    def from_correlation(cls, tickers, vols, corr, returns=None):
+        """`corr` may be a ticker-indexed frame (realigned) or an aligned array."""
+        if isinstance(corr, pd.DataFrame):
+            corr = corr.loc[list(tickers), list(tickers)].to_numpy()
+        return cls(tickers, vols, covariance_matrix(vols, corr), returns)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    # --- covariance products; FactorRiskEngine overrides these ---
+    def cov_dot(self, weights):
+        """Σw for one vector, or WΣ for a (K, N) batch (Σ is symmetric)."""
+        return weights @ self.cov
+
+    def cov_column(self, i):
+        """Column i of Σ."""
+        return self.cov[:, i]
+
+    def align(self, weights):
+        """Weights as a float array in engine ticker order."""
+        if isinstance(weights, pd.Series):
+            weights = weights.reindex(self.tickers, fill_value=0.0)
+        w = np.asarray(weights, dtype=np.float64)
+        if w.shape != (len(self.tickers),):
+            raise ValueError(
+                f"Expected {len(self.tickers)} weights, got shape {w.shape}"
+            )
+        return w
+
+    def decompose(self, weights):
+        """
+        Portfolio risk breakdown for one weight vector.
+
+        Returns a dict with `portfolio_vol`, `diversification_ratio`
+        and `table`: a per-stock frame of Stock, Weight, Volatility,
+        MCTR, Component and Contribution_% (engine order).
+        """
+        w = self.align(weights)
+        cov_w = self.cov_dot(w)
+        port_vol = float(np.sqrt(w @ cov_w))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mctr = cov_w / port_vol
+            component = w * mctr
+            pct = component / component.sum() * 100
+            dr = float(w @ self.vols) / port_vol
+
+        table = pd.DataFrame({
+            "Stock": self.tickers,
+            "Weight": w,
+            "Volatility": self.vols,
+            "MCTR": mctr,
+            "Component": component,
+            "Contribution_%": pct,
+        })
+        return {
+            "portfolio_vol": port_vol,
+            "diversification_ratio": dr,
+            "table": table,
+        }
+
+    def align_batch(self, weights):
+        """(K, N) float array in engine ticker order."""
+        if isinstance(weights, pd.DataFrame):
+            weights = weights.reindex(columns=self.tickers, fill_value=0.0)
+        W = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        if W.ndim != 2 or W.shape[1] != len(self.tickers):
+            raise ValueError(
+                f"Expected (K, {len(self.tickers)}) weights, got shape {W.shape}"
+            )
+        return W
+
+    def evaluate(self, weights):
+        """
+        Score K candidate allocations at once.
+
+        `weights` is (K, N) in engine order, or a frame with ticker
+        columns. Returns a dict of `portfolio_vol`, `expected_return`
+        and `diversification_ratio` (K,) plus `mctr`, `component` and
+        `contribution_pct` (K, N) — decompose() for every row, from
+        one (K, N) @ (N, N) product.
+        """
+        W = self.align_batch(weights)
+        WS = self.cov_dot(W)
+        var = np.einsum("kn,kn->k", WS, W)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vol = np.sqrt(var)
+            mctr = WS / vol[:, None]
+            component = W * mctr
+            pct = component / component.sum(axis=1, keepdims=True) * 100
+            dr = (W @ self.vols) / vol
+
+        exp_ret = np.full(len(W), np.nan)
+        if self.returns is not None:
+            exp_ret = W @ self.returns
+
+        return {
+            "portfolio_vol": vol,
+            "expected_return": exp_ret,
+            "diversification_ratio": dr,
+            "mctr": mctr,
+            "component": component,
+            "contribution_pct": pct,
+        }
+
+
+class IncrementalRisk:
+    """
+    Decomposition state for one evolving weight vector.
+
+    Keeps w, Σw, wᵀΣw and wᵀσ; moving weight i by δ adds δ·Σ[:, i]
+    to Σw and 2δ(Σw)ᵢ + δ²Σᵢᵢ to the variance, so each edited name
+    costs O(N) instead of a full quadratic form.
+    """
+
+    def __init__(self, engine, weights):
+        self.engine = engine
+        self.base = engine.align(weights).copy()
+        self.reset()
+
+    def reset(self):
+        """Back to the base weights (one full Σw product)."""
+        self.w = self.base.copy()
+        self.cov_w = self.engine.cov_dot(self.w)
+        self.var = float(self.w @ self.cov_w)
+        self.w_vol = float(self.w @ self.engine.vols)
+        self.touched = set()
+        return self
+
+    def _set(self, i, value):
+        delta = value - self.w[i]
+        column = self.engine.cov_column(i)
+        self.var += 2 * delta * self.cov_w[i] + delta * delta * column[i]
+        self.cov_w += delta * column
+        self.w_vol += delta * self.engine.vols[i]
+        self.w[i] = value
+
+    def set_weights(self, weights):
+        """Apply {ticker: new weight}; unchanged names cost nothing."""
+        for ticker, value in weights.items():
+            i = self.engine.index[ticker]
+            if float(value) != self.w[i]:
+                self._set(i, float(value))
+            if self.w[i] == self.base[i]:
+                self.touched.discard(ticker)
+            else:
+                self.touched.add(ticker)
+        return self
+
+    def result(self):
+        """Same layout as RiskEngine.decompose(), from the running state."""
+        vol = float(np.sqrt(max(self.var, 0.0)))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mctr = self.cov_w / vol
+            component = self.w * mctr
+            pct = component / component.sum() * 100
+            dr = self.w_vol / vol
+
+        table = pd.DataFrame({
+            "Stock": self.engine.tickers,
+            "Weight": self.w.copy(),
+            "Volatility": self.engine.vols,
+            "MCTR": mctr,
+            "Component": component,
+            "Contribution_%": pct,
+        })
+        return {
+            "portfolio_vol": vol,
+            "diversification_ratio": dr,
+            "table": table,
+        }
+
+
+def random_tilts(base_weights, k, concentration=200.0, seed=0):
+    """
+    `k` long-only candidates scattered around `base_weights`
+    (Dirichlet draws; higher `concentration` = smaller tilts).
+    Rows sum to one.
+    """
+    base = np.asarray(base_weights, dtype=np.float64)
+    base = base / base.sum()
+    alpha = base * concentration + 1e-3
+    return np.random.default_rng(seed).dirichlet(alpha, size=k)
+
+
+def risk_contributions(weights, vols, corr, tickers=None):
+    """One-off decomposition without keeping an engine around."""
+    if tickers is None:
+        tickers = corr.index if isinstance(corr, pd.DataFrame) else range(len(vols))
+    return RiskEngine.from_correlation(tickers, vols, corr).decompose(weights)
@@ -0,0 +1,212 @@
+# =========================================================
+# VECTORIZED ROLLING STATISTICS
+# Every window × statistic for the whole (T, N) matrix at once:
+# sums / means / stds from one shared cumulative sum, min / max
+# from strided window views. No per-ticker pandas .rolling().
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from .schema import DATE_COL
+
+WINDOWS = (5, 10, 20, 60, 120)
+STATS = ("mean", "std", "min", "max", "sum")
+
+_MOMENT_STATS = {"mean", "std", "sum"}
+_ORDER_STATS = {"min": np.min, "max": np.max}
+
+
+# =========================================================
+# CORE KERNELS
+# =========================================================
+def _windows_view(x, window):
+    """(T, N) → (T - window + 1, N, window) view; no copy."""
+    return np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+
+
+def padded_cumsum(x):
+    """Cumulative sum with a leading zero row, so window sums are cs[w:] - cs[:-w]."""
+    cs = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=cs[1:])
+    return cs
+
+
+def _calendar_stats(x, windows, stats, ddof):
+    """
+    Row-window statistics with pandas' default rule: a window with any
+    missing value is NaN. Returns (T, N, W, S).
+    """
+    T, N = x.shape
+    out = np.full((T, N, len(windows), len(stats)), np.nan)
+
+    valid = ~np.isnan(x)
+    # centre each column before accumulating to keep the
+    # sum-of-squares variance free of cancellation
+    n_valid = valid.sum(axis=0)
+    shift = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(n_valid, 1)
+    xc = np.where(valid, x - shift, 0.0)
+
+    need_moments = _MOMENT_STATS.intersection(stats)
+    if need_moments:
+        cs1 = padded_cumsum(xc)
+        cs2 = padded_cumsum(xc * xc)
+    cnt = padded_cumsum(valid.astype(np.float64))
+
+    for wi, w in enumerate(windows):
+        if w > T:
+            continue
+        full = (cnt[w:] - cnt[:-w]) == w
+        rows = slice(w - 1, T)
+
+        if need_moments:
+            s1 = cs1[w:] - cs1[:-w]
+            s2 = cs2[w:] - cs2[:-w]
+            mean_c = s1 / w
+
+        for si, stat in enumerate(stats):
+            if stat == "sum":
+                res = s1 + w * shift
+            elif stat == "mean":
+                res = mean_c + shift
+            elif stat == "std":
+                if w - ddof <= 0:
+                    continue
+                var = np.maximum(s2 - s1 * mean_c, 0.0) / (w - ddof)
+                res = np.sqrt(var)
+            elif stat in _ORDER_STATS:
+                res = _ORDER_STATS[stat](_windows_view(x, w), axis=-1)
+            else:
+                raise ValueError(f"Unknown rolling statistic: {stat!r}")
+
+            out[rows, :, wi, si] = np.where(full, res, np.nan)
+
+    return out
+
+
+def _pack_valid(x):
+    """
+    Shift each column's non-missing values to the top. Returns the
+    packed array plus the (row, col) and packed row of every valid
+    cell, for scattering results back.
+    """
+    valid = ~np.isnan(x)
+    rank = np.cumsum(valid, axis=0) - 1
+    r, n = np.nonzero(valid)
+    k = rank[r, n]
+
+    packed = np.full(x.shape, np.nan)
+    packed[k, n] = x[r, n]
+    return packed, (r, n), k
+
+
+# =========================================================
+# PUBLIC API
+# =========================================================
+class RollingCube:
+    """
+    (T, N, W, S) results of rolling_stats(): date × ticker × window ×
+    statistic. Accessors return views.
+    """
+
+    def __init__(self, values, windows, stats, dates=None, tickers=None):
+        self.values = values
+        self.windows = tuple(windows)
+        self.stats = tuple(stats)
+        self.dates = dates
+        self.tickers = tickers
+        self._w = {w: i for i, w in enumerate(self.windows)}
+        self._s = {s: i for i, s in enumerate(self.stats)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def get(self, stat, window):
+        """(T, N) view of one statistic at one window."""
+        return self.values[:, :, self._w[window], self._s[stat]]
+
+    def frame(self, stat, window):
+        """Date × ticker DataFrame around get()."""
+        index = None
+        if self.dates is not None:
+            index = pd.DatetimeIndex(self.dates, name=DATE_COL)
+        return pd.DataFrame(
+            self.get(stat, window), index=index, columns=self.tickers, copy=False
+        )
+
+    def features(self, ticker):
+        """Every window × statistic for one ticker, as `{stat}_{w}d` columns."""
+        i = ticker if isinstance(ticker, (int, np.integer)) else self.tickers.index(ticker)
+        block = self.values[:, i].reshape(len(self.values), -1)
+        columns = [f"{s}_{w}d" for w in self.windows for s in self.stats]
+        index = None
+        if self.dates is not None:
+            index = pd.DatetimeIndex(self.dates, name=DATE_COL)
+        return pd.DataFrame(block, index=index, columns=columns)
+
+
+def rolling_stats(
+    x,
+    windows=WINDOWS,
+    stats=STATS,
+    skip_missing=False,
+    ddof=1,
+    dates=None,
+    tickers=None
+):
+    """
+    Rolling `stats` over every window in `windows` for a (T, N) matrix.
+
+    By default windows are calendar rows and any missing value blanks
+    the window (pandas `.rolling(w)`). With `skip_missing=True` each
+    window spans the column's last `w` non-missing observations and
+    results sit on the rows where the column is present — how the
+    download computes `20d Volatility` / `20d MA` per ticker.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    windows, stats = tuple(windows), tuple(stats)
+
+    if not skip_missing:
+        values = _calendar_stats(x, windows, stats, ddof)
+    else:
+        packed, (r, n), k = _pack_valid(x)
+        stat = _calendar_stats(packed, windows, stats, ddof)
+        values = np.full(x.shape + stat.shape[2:], np.nan)
+        values[r, n] = stat[k, n]
+
+    return RollingCube(values, windows, stats, dates, tickers)
+
+
+def rolling_stat(x, window, stat, skip_missing=False, ddof=1):
+    """Single (T, N) statistic; shorthand for rolling_stats()."""
+    cube = rolling_stats(x, (window,), (stat,), skip_missing, ddof)
+    return cube.values[:, :, 0, 0]
+
+
+def cube_rolling_stats(cube, field="Daily Return", windows=WINDOWS, stats=STATS, **kwargs):
+    """rolling_stats() over one field of a PanelCube."""
+    return rolling_stats(
+        cube.field(field),
+        windows,
+        stats,
+        dates=cube.dates,
+        tickers=list(cube.tickers),
+        **kwargs
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    from .cube import ensure_cube, open_cube
+
+    panel = open_cube(ensure_cube())
+    t0 = time.perf_counter()
+    result = cube_rolling_stats(panel, skip_missing=True)
+    print(
+        f"{result.shape[1]} tickers × {len(result.windows)} windows × "
+        f"{len(result.stats)} stats in {time.perf_counter() - t0:.3f}s"
+    )
@@ -0,0 +1,46 @@
+# =========================================================
+# PANEL SCHEMA
+# Wide `{TICKER}_{Field}` column layout of the cleaned panel
+# =========================================================
+
+DATE_COL = "Date"
+
+PRICE_FIELDS = ("Close", "High", "Low", "Open", "Volume")
+
+DERIVED_FIELDS = (
+    "Daily Return",
+    "Cumulative Return",
+    "20d Volatility",
+    "20d MA",
+)
+
+FIELDS = PRICE_FIELDS + DERIVED_FIELDS
+
+
+def column_name(ticker, field):
+    """`AAPL`, `Close` -> `AAPL_Close`."""
+    return f"{ticker}_{field}"
+
+
+def split_column(col):
+    """`AAPL_Daily Return` -> (`AAPL`, `Daily Return`)."""
+    ticker, field = col.split("_", 1)
+    return ticker, field
+
+
+def panel_tickers(columns):
+    """Tickers in first-seen column order (the download order)."""
+    seen = {}
+    for col in columns:
+        if col != DATE_COL:
+            seen.setdefault(split_column(col)[0], None)
+    return list(seen)
+
+
+def panel_fields(columns):
+    """Fields in first-seen column order."""
+    seen = {}
+    for col in columns:
+        if col != DATE_COL:
+            seen.setdefault(split_column(col)[1], None)
+    return list(seen)
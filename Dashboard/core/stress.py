@@ -0,0 +1,188 @@
+# =========================================================
+# HISTORICAL-REPLAY STRESS ENGINE
+# Scenarios are per-ticker compounded returns replayed from the
+# return panel — worst 1/5/20-day windows, named date ranges and
+# user-defined shocks — stacked into one K × N matrix, so every
+# scenario is priced against the holdings with a single matmul.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+STRESS_HORIZONS = (1, 5, 20)
+N_WORST = 5
+
+# inclusive trading-date ranges; ranges outside the panel are skipped
+NAMED_PERIODS = {
+    "Dec 2024 Fed Hawkish Turn": ("2024-12-17", "2024-12-18"),
+    "DeepSeek AI Selloff": ("2025-01-24", "2025-01-27"),
+    "Feb–Mar 2025 Correction": ("2025-02-19", "2025-03-13"),
+    "Liberation Day Tariff Shock": ("2025-04-02", "2025-04-08"),
+    "Tariff Pause Rally": ("2025-04-09", "2025-04-09"),
+}
+
+# uniform shocks kept as user-defined scenarios
+UNIFORM_SHOCKS = {
+    "Mild Correction (-10%)": -0.10,
+    "Market Selloff (-20%)": -0.20,
+    "Financial Crisis (-30%)": -0.30,
+    "Black Swan (-40%)": -0.40,
+}
+
+
+class ScenarioSet:
+    """
+    K scenarios over a fixed universe: `shocks` (K, N) compounded
+    returns plus one metadata row each (Scenario, Type, Start, End,
+    Days).
+    """
+
+    def __init__(self, tickers, shocks=None, meta=None):
+        self.tickers = list(tickers)
+        self.shocks = (
+            np.empty((0, len(self.tickers))) if shocks is None
+            else np.atleast_2d(np.asarray(shocks, dtype=np.float64))
+        )
+        self.meta = list(meta or [])
+
+    def __len__(self):
+        return len(self.shocks)
+
+    def __add__(self, other):
+        if other.tickers != self.tickers:
+            raise ValueError("Scenario sets cover different tickers")
+        return ScenarioSet(
+            self.tickers, np.vstack([self.shocks, other.shocks]), self.meta + other.meta
+        )
+
+    @property
+    def names(self):
+        return [m["Scenario"] for m in self.meta]
+
+    def apply(self, weights):
+        """
+        Portfolio returns for every scenario × weight vector: (K,) for
+        one (N,) vector, (K, M) for an (M, N) matrix.
+        """
+        W = np.asarray(weights, dtype=np.float64)
+        return self.shocks @ W.T
+
+    def contributions(self, k, weights):
+        """Per-ticker return contribution to scenario `k`."""
+        return self.shocks[k] * np.asarray(weights, dtype=np.float64)
+
+    def table(self, weights, notional=1.0):
+        """Scenario metadata with the portfolio return and P&L."""
+        pnl = self.apply(weights)
+        return pd.DataFrame(self.meta).assign(
+            Portfolio_Return=pnl,
+            PnL=pnl * notional,
+        )
+
+
+class StressEngine:
+    """
+    Replays windows of a Date × ticker daily-return panel. A missing
+    return counts as flat, so every scenario spans the same calendar
+    days for every ticker.
+    """
+
+    def __init__(self, returns):
+        self.tickers = list(returns.columns)
+        self.dates = pd.DatetimeIndex(returns.index)
+        log_r = np.log1p(np.nan_to_num(returns.to_numpy(dtype=np.float64)))
+        # cum[i] = log growth over the first i days; window [a, b] = cum[b+1] − cum[a]
+        self.cum = np.vstack([np.zeros(len(self.tickers)), np.cumsum(log_r, axis=0)])
+
+    def _window(self, a, b):
+        return np.expm1(self.cum[b + 1] - self.cum[a])
+
+    def _row(self, name, kind, a, b):
+        return {
+            "Scenario": name,
+            "Type": kind,
+            "Start": self.dates[a],
+            "End": self.dates[b],
+            "Days": b - a + 1,
+        }
+
+    def horizon_shocks(self, horizon):
+        """(T − h + 1, N) compounded returns of every h-day window."""
+        return np.expm1(self.cum[horizon:] - self.cum[:-horizon])
+
+    def worst_windows(self, weights, horizons=STRESS_HORIZONS, n=N_WORST):
+        """
+        The `n` worst non-overlapping h-day windows for `weights` at each
+        horizon. All windows are scored at once (window × holdings
+        matmul); a greedy pass over the sorted losses drops overlaps.
+        """
+        w = np.asarray(weights, dtype=np.float64)
+        shocks, meta = [], []
+        for h in horizons:
+            if h > len(self.dates) - 1:
+                continue
+            windows = self.horizon_shocks(h)[1:]          # day 0 has no return
+            order = np.argsort(windows @ w, kind="stable")
+            taken = np.zeros(len(windows) + h, dtype=bool)
+            picked = 0
+            for start in order:
+                if picked == n:
+                    break
+                if taken[start:start + h].any():
+                    continue
+                taken[start:start + h] = True
+                picked += 1
+                a = start + 1
+                shocks.append(windows[start])
+                meta.append(self._row(f"Worst {h}D #{picked}", f"Worst {h}D", a, a + h - 1))
+        return ScenarioSet(self.tickers, shocks or None, meta)
+
+    def date_ranges(self, periods=NAMED_PERIODS):
+        """Named inclusive date ranges clipped to the panel."""
+        shocks, meta = [], []
+        for name, (start, end) in periods.items():
+            a = self.dates.searchsorted(pd.Timestamp(start), "left")
+            b = self.dates.searchsorted(pd.Timestamp(end), "right") - 1
+            if a > b:
+                continue
+            shocks.append(self._window(a, b))
+            meta.append(self._row(name, "Historical", a, b))
+        return ScenarioSet(self.tickers, shocks or None, meta)
+
+    def custom(self, scenarios):
+        """
+        User-defined shocks: {name: shock}, where a shock is either one
+        return applied to every ticker or a {ticker: return} dict (other
+        tickers flat, or a `"*"` key as the default).
+        """
+        pos = {t: i for i, t in enumerate(self.tickers)}
+        shocks, meta = [], []
+        for name, shock in scenarios.items():
+            if isinstance(shock, dict):
+                row = np.full(len(self.tickers), float(shock.get("*", 0.0)))
+                for t, value in shock.items():
+                    if t != "*":
+                        row[pos[t]] = value
+            else:
+                row = np.full(len(self.tickers), float(shock))
+            shocks.append(row)
+            meta.append({"Scenario": name, "Type": "Custom", "Start": pd.NaT, "End": pd.NaT, "Days": 0})
+        return ScenarioSet(self.tickers, shocks or None, meta)
+
+    def scenarios(self, weights, horizons=STRESS_HORIZONS, n=N_WORST,
+                  periods=NAMED_PERIODS, custom=UNIFORM_SHOCKS):
+        """Worst windows, named ranges and custom shocks in one set."""
+        return self.worst_windows(weights, horizons, n) + self.date_ranges(periods) + self.custom(custom)
+
+
+if __name__ == "__main__":
+    from .cube import ensure_cube, open_cube
+    from .paths import WEIGHTS_CSV
+
+    weights_df = pd.read_csv(WEIGHTS_CSV)
+    returns = open_cube(ensure_cube()).field_frame("Daily Return")[list(weights_df["Stock"])]
+    weights = weights_df["Portfolio_Weight_Percent"].to_numpy() / 100
+
+    engine = StressEngine(returns)
+    table = engine.scenarios(weights).table(weights, notional=1_000_000)
+    print(table.sort_values("Portfolio_Return").to_string(index=False))
@@ -0,0 +1,111 @@
+# =========================================================
+# HISTORICAL VaR / EXPECTED SHORTFALL
+# Empirical tail losses for every column of a return matrix —
+# single stocks or any set of portfolios — at several confidence
+# levels and horizons in one pass. One np.partition per horizon
+# isolates the tail instead of fully sorting each series.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from .rolling import rolling_stat
+
+LEVELS = (0.95, 0.99)
+HORIZONS = (1, 10)
+
+
+def horizon_returns(returns, horizon):
+    """
+    Overlapping compounded `horizon`-day returns for a (T, M) matrix,
+    over each column's own observations (missing days skipped).
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    if horizon == 1:
+        return returns
+    log_sum = rolling_stat(np.log1p(returns), horizon, "sum", skip_missing=True)
+    return np.expm1(log_sum)
+
+
+def var_es(returns, levels=LEVELS):
+    """
+    Historical VaR and ES of a (T, M) return matrix as positive losses,
+    each (M, L).
+
+    With n observations and k = ceil(n·(1 − level)): VaR is the k-th
+    largest loss and ES the mean of the k largest losses. Only the
+    largest max(k) losses are ever sorted.
+    """
+    x = np.asarray(returns, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    T, M = x.shape
+    levels = np.asarray(levels, dtype=np.float64)
+
+    valid = ~np.isnan(x)
+    n = valid.sum(axis=0)
+    losses = np.where(valid, -x, -np.inf)
+
+    # tail size per (level, column); ceil guarded against float fuzz
+    k = np.ceil(n[None, :] * (1 - levels[:, None]) - 1e-9).astype(np.int64)
+    k = np.clip(k, 1, None)
+    k_max = int(min(k.max(initial=1), T))
+
+    tail = np.partition(losses, T - k_max, axis=0)[T - k_max:]
+    tail = -np.sort(-tail, axis=0)                     # (k_max, M), largest first
+    cum = np.cumsum(np.where(np.isfinite(tail), tail, 0.0), axis=0)
+
+    cols = np.arange(M)
+    row = np.minimum(k, k_max) - 1                     # (L, M)
+    var = tail[row, cols[None, :]]
+    es = cum[row, cols[None, :]] / (row + 1)
+
+    empty = (n == 0)[None, :]
+    var = np.where(empty, np.nan, var)
+    es = np.where(empty, np.nan, es)
+    return var.T, es.T
+
+
+def historical_var_es(returns, levels=LEVELS, horizons=HORIZONS):
+    """VaR and ES for every column, level and horizon: two (M, L, H) arrays."""
+    out = [var_es(horizon_returns(returns, h), levels) for h in horizons]
+    var = np.stack([v for v, _ in out], axis=-1)
+    es = np.stack([e for _, e in out], axis=-1)
+    return var, es
+
+
+def _label(level, horizon):
+    return f"{level * 100:g}_{horizon}D"
+
+
+def tail_risk_table(returns, names, levels=LEVELS, horizons=HORIZONS, name_col="Stock"):
+    """
+    One row per column: `VaR_{level}_{h}D` / `ES_{level}_{h}D` as
+    positive daily-return fractions (0.03 = 3% loss).
+    """
+    var, es = historical_var_es(returns, levels, horizons)
+    table = {name_col: list(names)}
+    for h_i, h in enumerate(horizons):
+        for l_i, level in enumerate(levels):
+            table[f"VaR_{_label(level, h)}"] = var[:, l_i, h_i]
+            table[f"ES_{_label(level, h)}"] = es[:, l_i, h_i]
+    return pd.DataFrame(table)
+
+
+def portfolio_returns(returns, weights):
+    """
+    (T, K) daily returns of K weight vectors over (T, N) stock returns;
+    a missing stock return counts as flat for that day. Days with no
+    stock return at all (the panel's first row) stay NaN, so the tail
+    statistics skip them instead of scoring a 0% day.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    W = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    port = np.nan_to_num(r) @ W.T
+    port[np.isnan(r).all(axis=1)] = np.nan
+    return port
+
+
+def portfolio_var_es(returns, weights, levels=LEVELS, horizons=HORIZONS):
+    """historical_var_es() for one or more portfolios: (K, L, H) arrays."""
+    return historical_var_es(portfolio_returns(returns, weights), levels, horizons)
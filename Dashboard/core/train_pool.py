@@ -0,0 +1,251 @@
+# =========================================================
+# PARALLEL TREE-MODEL TRAINING
+# Universe-wide random forest / gradient boosting fits for the
+# Layer-2 volatility target, one (ticker, model) task per job on a
+# process pool. The design tensor is published once in shared
+# memory; workers map it instead of receiving pickled frames.
+# =========================================================
+
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .vol_forecast import SPLIT_RATIO, design_tensor, results_table, split_rows
+
+# "rf" is the ML_layer2 notebook's forest, with n_jobs=1 instead of -1
+# because the pool is the parallelism. The notebook has no boosted
+# model: "gbm" uses shallow trees, shrinkage 0.05 and 80% row
+# subsampling (a standard starting point for a small, noisy target),
+# with the forest's tree count so their fit times compare.
+MODEL_SPECS = {
+    "rf": ("RandomForestRegressor", dict(n_estimators=300, max_depth=6, min_samples_leaf=20, n_jobs=1)),
+    "gbm": ("GradientBoostingRegressor", dict(n_estimators=300, max_depth=3, learning_rate=0.05, subsample=0.8)),
+}
+
+SEED = 42
+
+
+def make_model(kind, seed):
+    """A fresh scikit-learn regressor; sklearn is only needed here."""
+    try:
+        from sklearn import ensemble
+    except ImportError as exc:
+        raise ImportError("Tree-model training needs scikit-learn: pip install scikit-learn") from exc
+    name, params = MODEL_SPECS[kind]
+    return getattr(ensemble, name)(random_state=seed, **params)
+
+
+def task_seed(seed, ticker, kind):
+    """
+    Per-task random_state from a SeedSequence keyed on the ticker
+    symbol (CRC-32) and model, so results do not depend on worker
+    count, finish order or the ticker's position in the panel.
+    """
+    model_index = list(MODEL_SPECS).index(kind)
+    ss = np.random.SeedSequence(seed, spawn_key=(zlib.crc32(ticker.encode()), model_index))
+    return int(ss.generate_state(1)[0])
+
+
+# =========================================================
+# SHARED PANEL
+# =========================================================
+class SharedArrays:
+    """
+    Named ndarrays copied once into shared-memory blocks. `spec` is a
+    small picklable description workers pass to attach(); the owner
+    unlinks the blocks on close().
+    """
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self.spec = {}
+        for key, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[...] = arr
+            self._blocks.append(shm)
+            self.spec[key] = (shm.name, arr.shape, arr.dtype.str)
+
+    @staticmethod
+    def attach(spec):
+        """Read-only views onto the blocks; returns (arrays, handles)."""
+        arrays, handles = {}, []
+        for key, (name, shape, dtype) in spec.items():
+            shm = shared_memory.SharedMemory(name=name)
+            view = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+            view.flags.writeable = False
+            arrays[key] = view
+            handles.append(shm)
+        return arrays, handles
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =========================================================
+# WORKER SIDE
+# =========================================================
+_worker = {}
+
+
+def _init_worker(spec):
+    # the handles are kept so the mappings outlive this call
+    _worker["arrays"], _worker["handles"] = SharedArrays.attach(spec)
+
+
+def _fit_one(i, kind, seed):
+    """Train one (ticker, model) task; returns its scores and timing."""
+    t0 = time.perf_counter()
+    a = _worker["arrays"]
+    X, y, train, test = a["X"][i], a["y"][i], a["train"][i], a["test"][i]
+
+    out = {"index": i, "kind": kind, "train_rows": int(train.sum()), "test_rows": int(test.sum())}
+    if not train.any():
+        return {**out, "rmse": np.nan, "mae": np.nan, "latest_vol": np.nan,
+                "seconds": time.perf_counter() - t0}
+
+    model = make_model(kind, seed)
+    model.fit(X[train], y[train])
+
+    if test.any():
+        err = model.predict(X[test]) - y[test]
+        rmse, mae = float(np.sqrt(np.mean(err * err))), float(np.mean(np.abs(err)))
+    else:
+        rmse = mae = np.nan
+
+    last = np.flatnonzero(train | test)[-1]
+    return {
+        **out,
+        "rmse": rmse,
+        "mae": mae,
+        "latest_vol": float(model.predict(X[last:last + 1])[0]),
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+# =========================================================
+# DRIVER
+# =========================================================
+def train_tree_models(
+    cube,
+    kinds=("rf",),
+    tickers=None,
+    workers=None,
+    seed=SEED,
+    split_ratio=SPLIT_RATIO,
+    progress=None
+):
+    """
+    Fit every requested model on every ticker's training rows (the
+    same time-ordered split as the linear model) and score the rest.
+
+    `progress(done, total, task)` is called as tasks finish. Returns a
+    dict: `results` (one row per ticker × model), `tickers`, `workers`,
+    `seconds` (wall clock) and `task_seconds` (summed fit time).
+    """
+    t0 = time.perf_counter()
+    X, y, close, rows = design_tensor(cube)
+    train, test = split_rows(rows, split_ratio)
+    names = list(cube.tickers)
+    wanted = range(len(names)) if tickers is None else [names.index(t) for t in tickers]
+
+    tasks = [(i, kind, task_seed(seed, names[i], kind)) for i in wanted for kind in kinds]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+
+    # unused rows carry NaN targets; zero them so workers see finite data
+    arrays = {"X": X, "y": np.nan_to_num(y), "train": train, "test": test}
+    done = []
+    with SharedArrays(arrays) as shared:
+        if workers == 1:
+            _init_worker(shared.spec)
+            for n, task in enumerate(tasks, 1):
+                done.append(_fit_one(*task))
+                if progress:
+                    progress(n, len(tasks), done[-1])
+            _worker.clear()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(shared.spec,)
+            ) as pool:
+                futures = [pool.submit(_fit_one, *task) for task in tasks]
+                for n, future in enumerate(as_completed(futures), 1):
+                    done.append(future.result())
+                    if progress:
+                        progress(n, len(tasks), done[-1])
+
+    T = rows.shape[1]
+    last = T - 1 - np.argmax(rows[:, ::-1], axis=1)
+    results = pd.DataFrame(done).sort_values(["index", "kind"]).reset_index(drop=True)
+    idx = results["index"].to_numpy()
+    results.insert(0, "Ticker", [names[i] for i in idx])
+    results["latest_price"] = np.where(rows[idx].any(axis=1), close[idx, last[idx]], np.nan)
+
+    return {
+        "tickers": names,
+        "results": results.drop(columns="index"),
+        "workers": workers,
+        "seconds": time.perf_counter() - t0,
+        "task_seconds": float(results["seconds"].sum()),
+    }
+
+
+def layer2_table(report, kind):
+    """One model's results in the layer2_ml_results.csv layout."""
+    r = report["results"][report["results"]["kind"] == kind]
+    return results_table({
+        "tickers": list(r["Ticker"]),
+        "rmse": r["rmse"].to_numpy(),
+        "latest_price": r["latest_price"].to_numpy(),
+        "latest_vol": r["latest_vol"].to_numpy(),
+    })
+
+
+def timing_report(report):
+    """Per-model fit-time summary plus the pool's speed-up over serial."""
+    r = report["results"]
+    summary = r.groupby("kind").agg(
+        Tickers=("Ticker", "size"),
+        Mean_RMSE=("rmse", "mean"),
+        Fit_Seconds=("seconds", "sum"),
+        Slowest_Fit=("seconds", "max"),
+    )
+    speedup = report["task_seconds"] / max(report["seconds"], 1e-9)
+    footer = (
+        f"{len(r)} fits on {report['workers']} worker(s): {report['seconds']:.1f}s wall, "
+        f"{report['task_seconds']:.1f}s of fitting ({speedup:.1f}× speed-up)"
+    )
+    return summary, footer
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .cube import ensure_cube, open_cube
+
+    kinds = [a for a in sys.argv[1:] if a in MODEL_SPECS] or ["rf"]
+    workers = next((int(a) for a in sys.argv[1:] if a.isdigit()), None)
+
+    def show(done, total, task):
+        print(f"\r[{done}/{total}] {task['kind']:>3} fitted in {task['seconds']:.2f}s", end="", flush=True)
+
+    report = train_tree_models(open_cube(ensure_cube()), kinds, workers=workers, progress=show)
+    summary, footer = timing_report(report)
+    print()
+    print(summary.round(4).to_string())
+    print(footer)
@@ -0,0 +1,208 @@
+# =========================================================
+# BATCHED VOLATILITY FORECAST TRAINING
+# The Layer-2 linear model (future 5-day volatility from five
+# daily features) for every ticker in one solve: an N × T × F
+# design tensor with per-ticker row masks and batched normal
+# equations, instead of one sklearn fit per ticker.
+# =========================================================
+
+import numpy as np
+import pandas as pd
+
+from .rolling import rolling_stat
+
+FEATURES = ("Daily Return", "20d Volatility", "20d MA", "Intraday_Range", "Log_Volume")
+HORIZON = 5
+BURN_IN = 20
+SPLIT_RATIO = 0.8
+
+ML_COLUMNS = [
+    "Ticker", "RMSE", "Latest_Price", "Predicted_5D_Vol", "Price_Lower_68", "Price_Upper_68"
+]
+
+
+# =========================================================
+# DESIGN TENSOR
+# =========================================================
+def future_volatility(returns, horizon=HORIZON):
+    """
+    (T, N) std of the next `horizon` daily returns (rows t+1 … t+h);
+    NaN when any of them is missing or runs past the panel end.
+    """
+    vol = rolling_stat(returns, horizon, "std")
+    out = np.full_like(vol, np.nan)
+    out[:-horizon] = vol[horizon:]
+    return out
+
+
+def feature_tensor(cube, features=FEATURES, burn_in=BURN_IN):
+    """
+    Model inputs without the target, for scoring dates whose outcome
+    is not known yet:
+
+    X      (N, T, F)  features (missing → 0 where the row is unusable)
+    close  (N, T)     Close, for the price bands
+    usable (N, T)     past the burn-in, all features and Close present
+    """
+    field = cube.field
+    engineered = {
+        "Intraday_Range": lambda: (field("High") - field("Low")) / field("Close"),
+        "Log_Volume": lambda: np.log(field("Volume")),
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        X = np.stack(
+            [engineered[f]() if f in engineered else field(f) for f in features], axis=-1
+        )
+    close = field("Close")
+
+    usable = np.isfinite(X).all(axis=2) & np.isfinite(close)
+    usable[:burn_in] = False
+
+    X = np.where(usable[:, :, None], X, 0.0).transpose(1, 0, 2)
+    return X, close.T, usable.T
+
+
+def design_tensor(cube, features=FEATURES, horizon=HORIZON, burn_in=BURN_IN):
+    """
+    Stack the model inputs for every ticker:
+
+    X     (N, T, F)  features (missing → 0 where the row is unused)
+    y     (N, T)     future `horizon`-day volatility
+    close (N, T)     Close, for the price bands
+    rows  (N, T)     usable rows: past the burn-in, nothing missing
+    """
+    X, close, usable = feature_tensor(cube, features, burn_in)
+    y = future_volatility(cube.field("Daily Return"), horizon).T
+
+    rows = usable & np.isfinite(y)
+    X = np.where(rows[:, :, None], X, 0.0)
+    return X, y, close, rows
+
+
+def split_rows(rows, split_ratio=SPLIT_RATIO):
+    """Time-ordered train / test masks: the first `split_ratio` of each ticker's rows."""
+    rank = np.cumsum(rows, axis=1)
+    n_train = (rows.sum(axis=1) * split_ratio).astype(np.int64)
+    train = rows & (rank <= n_train[:, None])
+    return train, rows & ~train
+
+
+# =========================================================
+# BATCHED OLS
+# =========================================================
+class BatchedOLS:
+    """
+    N independent least-squares fits y ≈ X·β + c sharing one (N, T, F)
+    tensor. Each ticker's features are standardized on its own
+    training rows, then all F × F normal equations are solved at once.
+    """
+
+    def __init__(self, coef=None, intercept=None):
+        self.coef = coef
+        self.intercept = intercept
+
+    def fit(self, X, y, mask):
+        w = mask.astype(np.float64)
+        n = np.maximum(w.sum(axis=1), 1.0)[:, None]
+
+        x_mean = np.einsum("nt,ntf->nf", w, X) / n
+        y_mean = (w * np.nan_to_num(y)).sum(axis=1, keepdims=True) / n
+        Xc = (X - x_mean[:, None, :]) * w[:, :, None]
+        yc = (np.nan_to_num(y) - y_mean) * w
+
+        # scale each column to unit norm so the normal equations stay well conditioned
+        scale = np.sqrt(np.einsum("ntf,ntf->nf", Xc, Xc))
+        scale = np.where(scale > 0, scale, 1.0)
+        Z = Xc / scale[:, None, :]
+
+        gram = np.einsum("ntf,ntg->nfg", Z, Z)
+        rhs = np.einsum("ntf,nt->nf", Z, yc)
+        try:
+            beta = np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+        except np.linalg.LinAlgError:
+            # a rank-deficient ticker (e.g. a constant feature): minimum-norm solution
+            beta = np.einsum("nfg,ng->nf", np.linalg.pinv(gram), rhs)
+
+        self.coef = beta / scale
+        self.intercept = y_mean[:, 0] - (x_mean * self.coef).sum(axis=1)
+        return self
+
+    def predict(self, X):
+        """(N, T) predictions for an (N, T, F) tensor."""
+        return np.einsum("ntf,nf->nt", X, self.coef) + self.intercept[:, None]
+
+
+# =========================================================
+# UNIVERSE TRAINING
+# =========================================================
+def train_universe(cube, split_ratio=SPLIT_RATIO):
+    """
+    Fit every ticker on its training rows and score the rest. Returns
+    the model plus per-ticker `rmse`, `latest_price` and `latest_vol`
+    (the prediction on the last usable row, as the notebook reports).
+    """
+    X, y, close, rows = design_tensor(cube)
+    train, test = split_rows(rows, split_ratio)
+    model = BatchedOLS().fit(X, y, train)
+
+    pred = model.predict(X)
+    err = np.where(test, pred - np.nan_to_num(y), 0.0)
+    rmse = np.sqrt((err * err).sum(axis=1) / np.maximum(test.sum(axis=1), 1))
+
+    T = rows.shape[1]
+    last = T - 1 - np.argmax(rows[:, ::-1], axis=1)
+    has_rows = rows.any(axis=1)
+    idx = np.arange(len(rows))
+    dates = pd.DatetimeIndex(cube.dates)
+
+    return {
+        "tickers": list(cube.tickers),
+        "model": model,
+        "rmse": np.where(test.any(axis=1), rmse, np.nan),
+        "latest_price": np.where(has_rows, close[idx, last], np.nan),
+        "latest_vol": np.where(has_rows, pred[idx, last], np.nan),
+        "latest_date": dates[last],
+        "n_train": train.sum(axis=1),
+        "train_start": dates[np.argmax(train, axis=1)],
+        "train_end": dates[T - 1 - np.argmax(train[:, ::-1], axis=1)],
+    }
+
+
+def results_table(fit):
+    """layer2_ml_results.csv layout: one row per ticker, tickers sorted."""
+    price, vol = fit["latest_price"], fit["latest_vol"]
+    table = pd.DataFrame({
+        "Ticker": fit["tickers"],
+        "RMSE": fit["rmse"],
+        "Latest_Price": price,
+        "Predicted_5D_Vol": vol,
+        "Price_Lower_68": price * (1 - vol),
+        "Price_Upper_68": price * (1 + vol),
+    })
+    return table.dropna().sort_values("Ticker").reset_index(drop=True)[ML_COLUMNS]
+
+
+def coefficient_table(fit, features=FEATURES):
+    """Per-ticker intercept and raw-unit feature coefficients."""
+    model = fit["model"]
+    table = pd.DataFrame(model.coef, columns=list(features))
+    table.insert(0, "Intercept", model.intercept)
+    table.insert(0, "Ticker", fit["tickers"])
+    return table
+
+
+if __name__ == "__main__":
+    import time
+
+    from .cube import ensure_cube, open_cube
+    from .manifest import record
+    from .paths import ML_RESULTS_CSV
+
+    cube = open_cube(ensure_cube())
+    t0 = time.perf_counter()
+    fit = train_universe(cube)
+    seconds = time.perf_counter() - t0
+
+    results_table(fit).to_csv(ML_RESULTS_CSV, index=False)
+    record("layer2_ml_results.csv")
+    print(f"Trained {len(fit['tickers'])} tickers in {seconds * 1000:.1f} ms → {ML_RESULTS_CSV}")
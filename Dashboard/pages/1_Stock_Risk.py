@@ -5,15 +5,16 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 
-import os
-
-BASE_DIR = os.path.dirname(
-    os.path.dirname(
-        os.path.dirname(os.path.abspath(__file__))
-    )
+from core.data import (
+    load_drawdowns,
+    load_live_risk,
+    load_returns,
+    load_rolling_beta,
+    load_stock_risk,
+    load_tail_risk,
 )
-
-DATA_DIR = os.path.join(BASE_DIR, "Data")
+from core.beta import BETA_WINDOWS, equal_weight_returns, rolling_beta
+from core.drawdown import underwater
 
 
 # -------------------------------------------------
@@ -290,14 +291,11 @@ section[data-testid="stSidebar"] {
 # -------------------------------------------------
 # LOAD DATA
 # -------------------------------------------------
-@st.cache_data
-def load_stock_risk_data():
-    return pd.read_csv(
-        os.path.join(DATA_DIR, "stock_risk_summary.csv")
-    )
-
-
-df = load_stock_risk_data()
+df = load_stock_risk()
+live_df = load_live_risk().set_index("Stock")
+tail_df = load_tail_risk()
+dd_df = load_drawdowns()
+beta_df = load_rolling_beta()
 
 # -------------------------------------------------
 # PAGE HEADER
@@ -351,6 +349,9 @@ risk_filter = st.sidebar.multiselect(
 stock_row = df[df["Stock"] == selected_stock].iloc[0]
 avg_return = stock_row["Avg_Daily_Return"]
 volatility = stock_row["Avg_20D_Volatility"]
+live_vol = live_df["20d Volatility"].get(selected_stock, np.nan)
+live_as_of = live_df["As_Of"].iloc[0].strftime("%d %b %Y")
+live_note = "" if np.isnan(live_vol) else f" · Latest {live_vol*100:.3f}% ({live_as_of})"
 
 # Calculate percentile
 percentile = (df["Avg_20D_Volatility"].rank(pct=True)[df["Stock"] == selected_stock].values[0])
@@ -377,7 +378,7 @@ with col2:
     <div class="metric-card-advanced">
         <div class="metric-label">20D VOLATILITY</div>
         <div class="metric-value-large">{volatility*100:.3f}%</div>
-        <div class="metric-delta">Rolling StdDev</div>
+        <div class="metric-delta">Rolling StdDev{live_note}</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -479,6 +480,81 @@ if view_mode == "Single Stock Deep Dive":
         </div>
         """, unsafe_allow_html=True)
     
+    # Tail Risk
+    st.markdown("""
+    <div class="section-header">
+        <div class="section-icon">⚠️</div>
+        <div class="section-title">HISTORICAL TAIL RISK (VaR / ES)</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    tail_row = tail_df.set_index("Stock").loc[selected_stock]
+    tail_boxes = [
+        ("VaR 95% · 1D", tail_row["VaR_95_1D"]),
+        ("ES 95% · 1D", tail_row["ES_95_1D"]),
+        ("VaR 99% · 1D", tail_row["VaR_99_1D"]),
+        ("ES 99% · 10D", tail_row["ES_99_10D"]),
+    ]
+    
+    for col, (label, value) in zip(st.columns(4), tail_boxes):
+        with col:
+            st.markdown(f"""
+            <div class="stat-box">
+                <div class="stat-box-label">{label}</div>
+                <div class="stat-box-value">{value*100:.2f}%</div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    # Market Sensitivity
+    st.markdown("""
+    <div class="section-header">
+        <div class="section-icon">📡</div>
+        <div class="section-title">MARKET SENSITIVITY (BETA TO EQUAL-WEIGHT UNIVERSE)</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    beta_row = beta_df.set_index("Stock").loc[selected_stock]
+    beta_boxes = [
+        ("Beta · 20D", f"{beta_row['Beta_20D']:.2f}"),
+        ("Beta · 60D", f"{beta_row['Beta_60D']:.2f}"),
+        ("Beta · 120D", f"{beta_row['Beta_120D']:.2f}"),
+        ("Correlation · 60D", f"{beta_row['Corr_60D']:.2f}"),
+    ]
+    
+    for col, (label, value) in zip(st.columns(4), beta_boxes):
+        with col:
+            st.markdown(f"""
+            <div class="stat-box">
+                <div class="stat-box-label">{label}</div>
+                <div class="stat-box-value">{value}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    returns = load_returns()
+    roll = rolling_beta(
+        returns[selected_stock].to_numpy(),
+        equal_weight_returns(returns.to_numpy()),
+        BETA_WINDOWS
+    )
+    
+    beta_fig = go.Figure()
+    for wi, (w, color) in enumerate(zip(BETA_WINDOWS, ['#ffa500', '#00ff88', '#4da6ff'])):
+        beta_fig.add_trace(go.Scatter(
+            x=returns.index, y=roll["beta"][wi, :, 0],
+            name=f"{w}D Beta", line=dict(color=color, width=2)
+        ))
+    beta_fig.add_hline(y=1.0, line_dash="dash", line_color="#8b8d91", annotation_text="Market Beta")
+    beta_fig.update_layout(
+        template="plotly_dark",
+        height=380,
+        yaxis_title="Beta",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter", size=12, color="#e8eaed")
+    )
+    
+    st.plotly_chart(beta_fig, width="stretch")
+    
     # Distribution Analysis
     st.markdown("""
     <div class="section-header">
@@ -621,6 +697,87 @@ elif view_mode == "Cross-Sectional Comparison":
         bottom_10["Avg_20D_Volatility"] = (bottom_10["Avg_20D_Volatility"] * 100).round(3)
         bottom_10["Avg_Daily_Return"] = (bottom_10["Avg_Daily_Return"] * 100).round(3)
         st.dataframe(bottom_10, width="stretch", height=400)
+    
+    # Tail and drawdown risk across the universe
+    st.markdown("""
+    <div class="section-header">
+        <div class="section-icon">⚠️</div>
+        <div class="section-title">TAIL & DRAWDOWN RISK ACROSS THE UNIVERSE</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="chart-explanation">
+        <strong>📖 How to Read:</strong> Historical Value-at-Risk is the loss exceeded on only 5% (or 1%) of days;
+        Expected Shortfall is the average loss on those worst days. 10D figures use overlapping 10-day returns.
+        Max Drawdown is the deepest peak-to-trough fall over the sample and Current Drawdown the distance below the latest high.
+        Drawdown Days run from peak to trough, Recovery Days from trough back to the old peak (blank = not yet recovered).
+        Beta and correlation are measured over 60 days against the equal-weight universe: beta above 1 amplifies market moves.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    cross_df = (
+        df[["Stock", "Avg_20D_Volatility"]]
+        .merge(tail_df, on="Stock", how="left")
+        .merge(beta_df[["Stock", "Beta_60D", "Corr_60D"]], on="Stock", how="left")
+        .merge(
+            dd_df[["Stock", "Max_Drawdown", "Current_Drawdown", "Drawdown_Days",
+                   "Recovery_Days", "Longest_Underwater_Days"]],
+            on="Stock",
+            how="left"
+        )
+    )
+    day_cols = ["Drawdown_Days", "Recovery_Days", "Longest_Underwater_Days"]
+    ratio_cols = ["Beta_60D", "Corr_60D"]
+    pct_cols = [c for c in cross_df.columns if c not in ["Stock", *day_cols, *ratio_cols]]
+    cross_df[pct_cols] = cross_df[pct_cols] * 100
+    
+    rank_by = st.selectbox(
+        "Rank By",
+        ["ES_95_1D", "VaR_99_1D", "Max_Drawdown", "Current_Drawdown",
+         "Longest_Underwater_Days", "Beta_60D"]
+    )
+    cross_df["Rank"] = cross_df[rank_by].rank(ascending=False, method="min", na_option="bottom").astype(int)
+    
+    st.dataframe(
+        cross_df.sort_values("Rank").set_index("Rank").style.format(
+            {
+                **{c: "{:.2f}" for c in pct_cols + ratio_cols},
+                **{c: "{:.0f}" for c in day_cols}
+            },
+            na_rep="—"
+        ),
+        width="stretch",
+        height=420
+    )
+    
+    # Underwater curve of the selected stock vs the equal-weight portfolio
+    returns = load_returns()
+    uw = underwater(np.column_stack([
+        returns[selected_stock].to_numpy(),
+        equal_weight_returns(returns)
+    ]))[1:]
+    
+    uw_fig = go.Figure()
+    uw_fig.add_trace(go.Scatter(
+        x=returns.index, y=uw[:, 0] * 100, name=selected_stock,
+        fill='tozeroy', line=dict(color='#ff4444', width=2)
+    ))
+    uw_fig.add_trace(go.Scatter(
+        x=returns.index, y=uw[:, 1] * 100, name='Equal-Weight Universe',
+        line=dict(color='#ffa500', width=2, dash='dash')
+    ))
+    uw_fig.update_layout(
+        template="plotly_dark",
+        height=420,
+        title=f"Underwater Curve — {selected_stock}",
+        yaxis_title="Drawdown from Peak (%)",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter", size=12, color="#e8eaed")
+    )
+    
+    st.plotly_chart(uw_fig, width="stretch")
 
 # -------------------------------------------------
 # ADVANCED ANALYTICS VIEW
@@ -10,15 +10,22 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-import os
 
-BASE_DIR = os.path.dirname(
-    os.path.dirname(
-        os.path.dirname(os.path.abspath(__file__))
-    )
+from core.data import (
+    load_correlation,
+    load_monte_carlo,
+    load_portfolio_vol,
+    load_returns,
+    load_risk_engine,
+    load_simulation_pool,
+    load_stock_risk,
+    load_stress_engine,
+    load_tail_risk,
+    load_weights,
 )
-
-DATA_DIR = os.path.join(BASE_DIR, "Data")
+from core.risk import IncrementalRisk, random_tilts
+from core.stress import STRESS_HORIZONS, UNIFORM_SHOCKS
+from core.tail_risk import portfolio_var_es
 
 
 # =========================================================
@@ -233,28 +240,11 @@ section[data-testid="stSidebar"] {
 # =========================================================
 # DATA LOADING
 # =========================================================
-@st.cache_data
-def load_data():
-    weights = pd.read_csv(
-        os.path.join(DATA_DIR, "portfolio_weights_percentage.csv")
-    )
-
-    corr = pd.read_csv(
-        os.path.join(DATA_DIR, "stock_return_correlation_matrix.csv"),
-        index_col=0
-    )
-
-    port_vol = pd.read_csv(
-        os.path.join(DATA_DIR, "portfolio_volatility_all_stocks.csv")
-    )
-
-    stock_risk = pd.read_csv(
-        os.path.join(DATA_DIR, "stock_risk_summary.csv")
-    )
-
-    return weights, corr, port_vol, stock_risk
-
-weights_df, corr_df, port_vol_df, stock_risk_df = load_data()
+weights_df = load_weights()
+corr_df = load_correlation()
+port_vol_df = load_portfolio_vol()
+stock_risk_df = load_stock_risk()
+base_weights = weights_df.set_index("Stock")["Portfolio_Weight_Percent"] / 100
 
 # =========================================================
 # TERMINAL HEADER
@@ -298,6 +288,7 @@ analysis_view = st.sidebar.radio(
         "Correlation Risk",
         "Volatility Trend",
         "Risk Contribution",
+        "What-If Sweep",
         "Stress Scenarios"
     ],
     label_visibility="collapsed"
@@ -313,26 +304,89 @@ st.sidebar.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+cov_model = st.sidebar.radio(
+    "Covariance Model",
+    ["Full Correlation", "PCA Factor Model"],
+    help="Factor model: K principal factors of daily returns plus "
+         "stock-specific variance; scales as O(N·K) instead of O(N²)."
+)
+if cov_model == "PCA Factor Model":
+    n_factors = st.sidebar.slider("Factors (K)", 1, 20, 5)
+    engine_args = ("factor", n_factors)
+    risk_engine = load_risk_engine(*engine_args)
+    st.sidebar.caption(
+        f"{n_factors} factors explain "
+        f"{risk_engine.model.explained.sum() * 100:.1f}% of return variance"
+    )
+else:
+    engine_args = ("full",)
+    risk_engine = load_risk_engine()
+
+# per-session risk state; rebuilt only when the engine's inputs change
+if st.session_state.get("risk_state_engine") is not risk_engine:
+    st.session_state["risk_state"] = IncrementalRisk(risk_engine, base_weights)
+    st.session_state["risk_state_engine"] = risk_engine
+risk_state = st.session_state["risk_state"]
+
+st.sidebar.markdown("""
+<div class="sidebar-box">
+    <div class="sidebar-title">WEIGHT EDITOR</div>
+    <div class="sidebar-note">
+        Nudge individual weights; volatility, MCTR and the
+        master risk table update from the edited allocation.
+    </div>
+</div>
+""", unsafe_allow_html=True)
+
+edit_tickers = st.sidebar.multiselect(
+    "Adjust Weights",
+    options=risk_engine.tickers,
+    key="weight_edit_tickers"
+)
+edited = {
+    t: st.sidebar.number_input(
+        f"{t} Weight (%)",
+        min_value=0.0,
+        max_value=100.0,
+        value=float(base_weights[t] * 100),
+        step=0.25,
+        key=f"weight_edit_{t}"
+    ) / 100
+    for t in edit_tickers
+}
+
+# only names whose weight moved cost an O(N) update
+risk_state.set_weights({
+    t: edited.get(t, base_weights[t])
+    for t in set(edited) | risk_state.touched
+})
+risk = risk_state.result()
+
+if risk_state.touched:
+    st.sidebar.caption(
+        f"Edited {len(risk_state.touched)} weight(s) · "
+        f"total {risk['table']['Weight'].sum() * 100:.2f}% · "
+        f"vol {risk['portfolio_vol'] * 100:.3f}%"
+    )
 
 # =========================================================
 # PORTFOLIO-LEVEL AGGREGATED METRICS
 # =========================================================
 
-# Latest portfolio volatility
-portfolio_vol_latest = port_vol_df["Portfolio_All_20d_Volatility"].iloc[-1]
-
-# Weighted return & volatility
-weighted_return = np.sum(
-    weights_df["Avg_Daily_Return"] *
-    (weights_df["Portfolio_Weight_Percent"] / 100)
+# Everything below follows the current (possibly edited) weights
+# (engine order == weights_df order)
+alloc_df = weights_df.assign(
+    Portfolio_Weight_Percent=risk["table"]["Weight"].to_numpy() * 100
 )
 
-weighted_vol = np.sum(
-    weights_df["Avg_20D_Volatility"] *
-    (weights_df["Portfolio_Weight_Percent"] / 100)
-)
+# Correlation-adjusted volatility of the current allocation
+portfolio_vol_latest = risk["portfolio_vol"]
+
+# Weighted return & volatility
+weighted_return = float(risk_state.w @ risk_engine.returns)
+weighted_vol = risk_state.w_vol
 
-diversification_ratio = weighted_vol / portfolio_vol_latest
+diversification_ratio = risk["diversification_ratio"]
 
 # =========================================================
 # TOP METRIC DASHBOARD
@@ -389,7 +443,7 @@ if analysis_view == "Portfolio Overview":
     """, unsafe_allow_html=True)
 
     fig = px.bar(
-        weights_df.sort_values("Portfolio_Weight_Percent", ascending=False),
+        alloc_df.sort_values("Portfolio_Weight_Percent", ascending=False),
         x="Stock",
         y="Portfolio_Weight_Percent",
         color="Avg_20D_Volatility",
@@ -431,7 +485,7 @@ elif analysis_view == "Allocation Analysis":
     """, unsafe_allow_html=True)
 
     fig = px.scatter(
-        weights_df,
+        alloc_df,
         x="Avg_20D_Volatility",
         y="Avg_Daily_Return",
         size="Portfolio_Weight_Percent",
@@ -557,23 +611,90 @@ elif analysis_view == "Risk Contribution":
     </div>
     """, unsafe_allow_html=True)
 
-    # --- Risk contribution math ---
-    weights = weights_df["Portfolio_Weight_Percent"].values / 100
-    vols = weights_df["Avg_20D_Volatility"].values
-    corr = corr_df.values
-
-    cov_matrix = corr * np.outer(vols, vols)
-    portfolio_variance = weights @ cov_matrix @ weights
-    portfolio_vol = np.sqrt(portfolio_variance)
-
-    marginal_risk = (cov_matrix @ weights) / portfolio_vol
-    risk_contribution = weights * marginal_risk
-    risk_contribution_pct = (risk_contribution / risk_contribution.sum()) * 100
-
-    rc_df = weights_df.copy()
-    rc_df["Risk_Contribution_%"] = risk_contribution_pct
+    # --- Risk contribution ---
+    rc_df = alloc_df.assign(**{
+        "Risk_Contribution_%": risk["table"]["Contribution_%"].to_numpy()
+    })
     rc_df = rc_df.sort_values("Risk_Contribution_%", ascending=False)
 
+    # --- Historical tail risk of the current allocation ---
+    returns = load_returns()[risk_engine.tickers].to_numpy()
+    p_var, p_es = portfolio_var_es(returns, risk_state.w, levels=(0.95, 0.99), horizons=(1, 10))
+    tail_cards = [
+        ("PORTFOLIO VaR 95% (1D)", p_var[0, 0, 0], "Loss exceeded on 1 day in 20"),
+        ("PORTFOLIO ES 95% (1D)", p_es[0, 0, 0], "Average loss beyond VaR"),
+        ("PORTFOLIO VaR 99% (10D)", p_var[0, 1, 1], "Overlapping 10-day windows"),
+    ]
+
+    for col, (label, value, note) in zip(st.columns(3), tail_cards):
+        with col:
+            st.markdown(f"""
+            <div class="metric-card">
+                <div class="metric-label">{label}</div>
+                <div class="metric-value">{value*100:.2f}%</div>
+                <div class="metric-sub">{note}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # --- Monte Carlo VaR (on demand: seconds, not milliseconds) ---
+    with st.expander("🎲 Monte Carlo VaR / ES (correlated simulation)"):
+        mc_paths = st.select_slider(
+            "Simulated Paths",
+            options=[100_000, 250_000, 500_000, 1_000_000],
+            value=250_000,
+            format_func=lambda n: f"{n:,}"
+        )
+        mc_key = (engine_args, risk_state.w.tobytes(), mc_paths)
+
+        if st.button("Run Simulation"):
+            with st.spinner("Simulating correlated return paths..."):
+                st.session_state["mc_result"] = (
+                    mc_key,
+                    load_monte_carlo(*engine_args).run(
+                        risk_state.w, n_paths=mc_paths, pool=load_simulation_pool()
+                    )
+                )
+
+        mc = st.session_state.get("mc_result")
+        if mc is not None and mc[0] == mc_key:
+            mc = mc[1]
+            mc_table = pd.DataFrame({
+                "Confidence": [f"{a:.0%}" for a in mc["levels"]],
+                "Monte Carlo VaR (%)": mc["var"] * 100,
+                "Monte Carlo ES (%)": mc["es"] * 100,
+                "Normal VaR (%)": mc["parametric_var"] * 100,
+                "Historical VaR (%)": p_var[0, :, 0] * 100,
+                "Historical ES (%)": p_es[0, :, 0] * 100,
+            })
+            st.dataframe(
+                mc_table.style.format({c: "{:.3f}" for c in mc_table.columns[1:]}),
+                width="stretch",
+                hide_index=True
+            )
+
+            comp_df = pd.DataFrame({
+                "Stock": risk_engine.tickers,
+                "Component VaR 95% (%)": mc["component_var"][0] * 100,
+            }).nlargest(15, "Component VaR 95% (%)")
+
+            comp_fig = go.Figure(go.Bar(
+                x=comp_df["Stock"],
+                y=comp_df["Component VaR 95% (%)"],
+                marker_color="#ffa500"
+            ))
+            comp_fig.update_layout(
+                template="plotly_dark",
+                height=380,
+                title="Top 15 Component VaR (95%, 1D)",
+                paper_bgcolor="rgba(0,0,0,0)"
+            )
+            st.plotly_chart(comp_fig, width="stretch")
+
+            st.caption(
+                f"{mc['n_paths']:,} paths on {mc['workers']} worker process(es) "
+                f"in {mc['seconds']:.2f}s · component VaR sums to portfolio VaR"
+            )
+
     # --- Bar Chart ---
     fig = go.Figure()
 
@@ -645,6 +766,173 @@ elif analysis_view == "Risk Contribution":
 
     st.markdown('</div>', unsafe_allow_html=True)
 
+# =========================================================
+# SECTION: WHAT-IF WEIGHT SWEEP
+# =========================================================
+elif analysis_view == "What-If Sweep":
+
+    st.markdown("""
+    <div class="section-header">
+        <div class="section-title">WHAT-IF ALLOCATION SWEEP</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("""
+    <div class="explain-box">
+        Scores thousands of candidate allocations at once: random long-only
+        tilts around the current weights, or your own candidates uploaded
+        as a CSV (one row per candidate, one column per ticker).
+    </div>
+    """, unsafe_allow_html=True)
+
+    # sweep around the (possibly edited) current allocation
+    engine = risk_engine
+    base_w = risk_state.w
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        n_candidates = st.slider("Candidates", 100, 10_000, 2_000, step=100)
+    with c2:
+        tilt_size = st.slider("Tilt Size", 0.1, 2.0, 0.5, step=0.1)
+    with c3:
+        seed = st.number_input("Seed", min_value=0, value=42, step=1)
+
+    uploaded = st.file_uploader("Candidate weights (optional CSV)", type="csv")
+
+    candidates = None
+    if uploaded is not None:
+        cand = pd.read_csv(uploaded).reindex(columns=engine.tickers, fill_value=0.0)
+        raw = cand.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        totals = raw.sum(axis=1)
+        # rows that cannot be scaled to sum to one: blanks / text, or zero net weight
+        usable = np.isfinite(raw).all(axis=1) & (np.abs(totals) > 1e-12)
+        n_bad = int((~usable).sum())
+        if n_bad:
+            rows = ", ".join(str(i) for i in np.flatnonzero(~usable)[:10] + 1)
+            st.warning(
+                f"Skipped {n_bad} of {len(raw)} uploaded rows with missing, non-numeric "
+                f"or zero-sum weights (rows {rows}{' …' if n_bad > 10 else ''})."
+            )
+        if usable.any():
+            candidates = raw[usable] / totals[usable, None]
+            candidate_ids = np.flatnonzero(usable) + 1
+        else:
+            st.warning("No usable rows in the upload; showing random tilts instead.")
+
+    if candidates is None:
+        candidates = random_tilts(
+            base_w, n_candidates, concentration=100.0 / tilt_size**2, seed=int(seed)
+        )
+        candidate_ids = np.arange(1, len(candidates) + 1)
+
+    sweep = engine.evaluate(np.vstack([base_w, candidates]))
+    current = {k: v[0] for k, v in sweep.items()}
+
+    sweep_df = pd.DataFrame({
+        "Candidate": candidate_ids,
+        "Volatility (%)": sweep["portfolio_vol"][1:] * 100,
+        "Expected Return (%)": sweep["expected_return"][1:] * 100,
+        "Diversification Ratio": sweep["diversification_ratio"][1:],
+        "Top Risk Driver": np.asarray(engine.tickers)[
+            sweep["contribution_pct"][1:].argmax(axis=1)
+        ],
+        "Max Contribution (%)": sweep["contribution_pct"][1:].max(axis=1),
+    })
+    sweep_df["Return / Vol"] = (
+        sweep_df["Expected Return (%)"] / sweep_df["Volatility (%)"]
+    )
+
+    # --- Metrics ---
+    best = sweep_df.loc[sweep_df["Return / Vol"].idxmax()]
+    m1, m2, m3 = st.columns(3)
+    with m1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">CURRENT VOL / RETURN</div>
+            <div class="metric-value">{current['portfolio_vol']*100:.2f}%</div>
+            <div class="metric-sub">Return {current['expected_return']*100:.3f}%</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with m2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">BEST RETURN / VOL</div>
+            <div class="metric-value">#{int(best['Candidate'])}</div>
+            <div class="metric-sub">{best['Return / Vol']:.3f} vs {current['expected_return']/current['portfolio_vol']:.3f} current</div>
+        </div>
+        """, unsafe_allow_html=True)
+    with m3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">LOWEST VOL CANDIDATE</div>
+            <div class="metric-value">{sweep_df['Volatility (%)'].min():.2f}%</div>
+            <div class="metric-sub">{len(sweep_df):,} candidates scored</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # --- Risk / return cloud ---
+    fig = go.Figure()
+
+    fig.add_trace(go.Scattergl(
+        x=sweep_df["Volatility (%)"],
+        y=sweep_df["Expected Return (%)"],
+        mode="markers",
+        marker=dict(
+            size=5,
+            color=sweep_df["Diversification Ratio"],
+            colorscale="Viridis",
+            colorbar=dict(title="DR"),
+            opacity=0.7
+        ),
+        text=sweep_df["Candidate"],
+        name="Candidates"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=[current["portfolio_vol"] * 100],
+        y=[current["expected_return"] * 100],
+        mode="markers",
+        marker=dict(size=16, color="#ffa500", symbol="star"),
+        name="Current Portfolio"
+    ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        height=560,
+        xaxis_title="Portfolio Volatility (%)",
+        yaxis_title="Expected Daily Return (%)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        legend=dict(orientation="h", y=1.1)
+    )
+
+    st.plotly_chart(fig, width="stretch")
+
+    st.markdown("""
+    <div class="explain-box">
+        ⭐ <b>How to Read This:</b><br>
+        Each dot is one candidate allocation; colour shows its diversification
+        ratio. Candidates up and to the left of the star earn more per unit of
+        risk than the current portfolio.
+    </div>
+    """, unsafe_allow_html=True)
+
+    # --- Ranked candidates ---
+    st.markdown('<div class="dataframe-box">', unsafe_allow_html=True)
+
+    st.dataframe(
+        sweep_df.sort_values("Return / Vol", ascending=False).head(50).style.format({
+            "Volatility (%)": "{:.3f}",
+            "Expected Return (%)": "{:.4f}",
+            "Diversification Ratio": "{:.2f}",
+            "Max Contribution (%)": "{:.2f}",
+            "Return / Vol": "{:.3f}"
+        }),
+        width="stretch",
+        height=420
+    )
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
 # =========================================================
 # SECTION: STRESS SCENARIO ANALYSIS
 # =========================================================
@@ -658,55 +946,130 @@ elif analysis_view == "Stress Scenarios":
 
     st.markdown("""
     <div class="explain-box">
-        Simulates extreme market shocks applied uniformly to the portfolio.
-        Used to understand downside exposure during crisis events.
+        Replays actual historical windows against the current holdings —
+        the worst 1, 5 and 20-day periods of this allocation and named
+        market events — alongside user-defined per-ticker shocks.
+        Every scenario is priced in one scenario × holdings product.
     </div>
     """, unsafe_allow_html=True)
 
-    scenarios = {
-        "Mild Correction (-10%)": -0.10,
-        "Market Selloff (-20%)": -0.20,
-        "Financial Crisis (-30%)": -0.30,
-        "Black Swan (-40%)": -0.40
-    }
-
+    stress_engine = load_stress_engine()
     base_value = 1_000_000
-    stress_results = []
-
-    for name, shock in scenarios.items():
-        stressed_value = base_value * (1 + shock)
-        stress_results.append({
-            "Scenario": name,
-            "Shock": f"{shock*100:.0f}%",
-            "Portfolio Value ($)": stressed_value,
-            "Loss ($)": base_value - stressed_value
-        })
-
-    stress_df = pd.DataFrame(stress_results)
-
-    # --- Waterfall chart ---
-    fig = go.Figure(go.Waterfall(
-        x=stress_df["Scenario"],
-        y=stress_df["Portfolio Value ($)"] - base_value,
-        decreasing={"marker": {"color": "#ff4444"}},
-        increasing={"marker": {"color": "#00ff88"}},
-        connector={"line": {"color": "#ffa500"}}
-    ))
 
+    # current weights in the stress engine's (panel) ticker order
+    stress_w = (
+        pd.Series(risk_state.w, index=risk_engine.tickers)
+        .reindex(stress_engine.tickers, fill_value=0.0)
+        .to_numpy()
+    )
+
+    s1, s2 = st.columns([2, 1])
+    with s1:
+        n_worst = st.slider("Worst Windows per Horizon", 1, 50, 5)
+    with s2:
+        horizons = st.multiselect(
+            "Horizons (days)", list(STRESS_HORIZONS), default=list(STRESS_HORIZONS)
+        )
+
+    with st.expander("🛠 Custom Shock"):
+        market_shock = st.number_input(
+            "Market Shock (%)", min_value=-100.0, max_value=100.0, value=-15.0, step=1.0
+        ) / 100
+        shocked = st.multiselect("Override Tickers", options=stress_engine.tickers)
+        overrides = {
+            t: st.number_input(
+                f"{t} Shock (%)", min_value=-100.0, max_value=100.0,
+                value=market_shock * 100, step=1.0, key=f"stress_shock_{t}"
+            ) / 100
+            for t in shocked
+        }
+
+    custom = dict(UNIFORM_SHOCKS)
+    custom["Custom Shock"] = {"*": market_shock, **overrides}
+
+    scenarios = (
+        stress_engine.worst_windows(stress_w, horizons, n_worst)
+        + stress_engine.date_ranges()
+        + stress_engine.custom(custom)
+    )
+    stress_df = scenarios.table(stress_w, notional=base_value)
+    stress_df["Portfolio Value ($)"] = base_value + stress_df["PnL"]
+
+    # --- Headline cards ---
+    historical = stress_df[stress_df["Type"] != "Custom"]
+    worst = historical.loc[historical["PnL"].idxmin()] if len(historical) else None
+    cards = [
+        ("SCENARIOS PRICED", f"{len(stress_df)}", "Windows, events and custom shocks"),
+        (
+            "WORST HISTORICAL LOSS",
+            f"${-worst['PnL']:,.0f}" if worst is not None else "—",
+            worst["Scenario"] if worst is not None else "No history selected"
+        ),
+        (
+            "CUSTOM SHOCK P&L",
+            f"${stress_df['PnL'].iloc[-1]:,.0f}",
+            f"{len(overrides)} ticker override(s)"
+        ),
+    ]
+    for col, (label, value, note) in zip(st.columns(3), cards):
+        with col:
+            st.markdown(f"""
+            <div class="metric-card">
+                <div class="metric-label">{label}</div>
+                <div class="metric-value">{value}</div>
+                <div class="metric-sub">{note}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # --- Scenario P&L chart ---
+    ranked = stress_df.sort_values("PnL").head(30)
+    fig = px.bar(
+        ranked,
+        x="PnL",
+        y="Scenario",
+        color="Type",
+        orientation="h",
+        template="plotly_dark",
+        hover_data={"Start": True, "End": True, "Days": True}
+    )
     fig.update_layout(
+        height=max(420, 22 * len(ranked)),
+        title="Stress Impact on Portfolio Value (30 Worst Scenarios)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        yaxis=dict(autorange="reversed")
+    )
+    st.plotly_chart(fig, width="stretch")
+
+    # --- Drill-down: which holdings drive a scenario ---
+    pick = st.selectbox("Scenario Drill-Down", options=list(stress_df["Scenario"]))
+    k = scenarios.names.index(pick)
+    drill_df = pd.DataFrame({
+        "Stock": stress_engine.tickers,
+        "Shock (%)": scenarios.shocks[k] * 100,
+        "P&L ($)": scenarios.contributions(k, stress_w) * base_value,
+    })
+    drill_df = drill_df[stress_w > 0].sort_values("P&L ($)").head(15)
+
+    drill_fig = go.Figure(go.Bar(
+        x=drill_df["Stock"],
+        y=drill_df["P&L ($)"],
+        marker_color=np.where(drill_df["P&L ($)"] < 0, "#ff4444", "#00ff88")
+    ))
+    drill_fig.update_layout(
         template="plotly_dark",
-        height=520,
-        title="Stress Impact on Portfolio Value",
+        height=380,
+        title=f"Largest Holding Losses — {pick}",
         paper_bgcolor="rgba(0,0,0,0)"
     )
-
-    st.plotly_chart(fig, width="stretch")
+    st.plotly_chart(drill_fig, width="stretch")
 
     st.markdown("""
     <div class="explain-box">
         ⭐ <b>How to Read This:</b><br>
-        Each bar represents portfolio value change under a stress scenario.<br>
-        Larger drops indicate higher vulnerability to tail-risk events.<br><br>
+        Each bar is the P&L of the current allocation had a scenario
+        been replayed on a $1M book.<br>
+        Historical windows keep the real cross-section of moves, so
+        concentrated or highly correlated holdings show up as larger losses.<br><br>
         This helps define <b>capital buffers</b> and
         <b>maximum acceptable drawdowns</b>.
     </div>
@@ -716,12 +1079,14 @@ elif analysis_view == "Stress Scenarios":
     st.markdown('<div class="dataframe-box">', unsafe_allow_html=True)
 
     st.dataframe(
-        stress_df.style.format({
-            "Portfolio Value ($)": "${:,.0f}",
-            "Loss ($)": "${:,.0f}"
+        stress_df.drop(columns="Portfolio_Return").style.format({
+            "Start": lambda d: "" if pd.isna(d) else f"{d:%Y-%m-%d}",
+            "End": lambda d: "" if pd.isna(d) else f"{d:%Y-%m-%d}",
+            "PnL": "${:,.0f}",
+            "Portfolio Value ($)": "${:,.0f}"
         }),
         width="stretch",
-        height=260
+        height=420
     )
 
     st.markdown('</div>', unsafe_allow_html=True)
@@ -790,21 +1155,17 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-master_df = weights_df.copy()
+master_df = alloc_df.copy()
 
 master_df["Weight (%)"] = master_df["Portfolio_Weight_Percent"]
 master_df["Return (%)"] = master_df["Avg_Daily_Return"] * 100
 master_df["Volatility (%)"] = master_df["Avg_20D_Volatility"] * 100
 
-# recompute risk contribution for table safety
-weights = master_df["Weight (%)"].values / 100
-vols = master_df["Volatility (%)"].values / 100
-cov = corr_df.values * np.outer(vols, vols)
+master_df["Risk Contribution (%)"] = risk["table"]["Contribution_%"].to_numpy()
 
-port_var = weights @ cov @ weights
-port_vol = np.sqrt(port_var)
-marginal = (cov @ weights) / port_vol
-master_df["Risk Contribution (%)"] = (weights * marginal) / np.sum(weights * marginal) * 100
+tail_cols = load_tail_risk().set_index("Stock")[["VaR_95_1D", "ES_95_1D"]]
+master_df["VaR 95% (%)"] = tail_cols["VaR_95_1D"].reindex(master_df["Stock"]).to_numpy() * 100
+master_df["ES 95% (%)"] = tail_cols["ES_95_1D"].reindex(master_df["Stock"]).to_numpy() * 100
 
 display_master = master_df[[
     "Stock",
@@ -812,6 +1173,8 @@ display_master = master_df[[
     "Return (%)",
     "Volatility (%)",
     "Risk Contribution (%)",
+    "VaR 95% (%)",
+    "ES 95% (%)",
     "Risk_Adjusted_Score"
 ]].sort_values("Risk Contribution (%)", ascending=False)
 
@@ -823,6 +1186,8 @@ st.dataframe(
         "Return (%)": "{:.2f}",
         "Volatility (%)": "{:.2f}",
         "Risk Contribution (%)": "{:.2f}",
+        "VaR 95% (%)": "{:.2f}",
+        "ES 95% (%)": "{:.2f}",
         "Risk_Adjusted_Score": "{:.2f}"
     }),
     width="stretch",
@@ -857,7 +1222,7 @@ st.markdown("""
 • Correlation-adjusted volatility computation<br>
 • Diversification diagnostics<br>
 • Risk contribution decomposition<br>
-• Stress scenario impact estimation<br><br>
+• Historical-replay stress scenarios<br><br>
 
 <b>What Layer 1 Does NOT Do:</b><br>
 • No forecasting<br>
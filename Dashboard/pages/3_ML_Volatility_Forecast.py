@@ -10,15 +10,10 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-import os 
 
-BASE_DIR = os.path.dirname(
-    os.path.dirname(
-        os.path.dirname(os.path.abspath(__file__))
-    )
-)
-
-DATA_DIR = os.path.join(BASE_DIR, "Data")
+from core.data import load_forecast_service, load_garch_results, load_ml_results, load_walk_forward
+from core.garch import GARCH_HORIZONS
+from core.walk_forward import backtest_frame
 
 
 # =========================================================
@@ -227,14 +222,7 @@ section[data-testid="stSidebar"] {
 # =========================================================
 # DATA LOADING
 # =========================================================
-@st.cache_data
-def load_ml_data():
-    return pd.read_csv(
-        os.path.join(DATA_DIR, "layer2_ml_results.csv")
-    )
-
-
-df = load_ml_data()
+df = load_ml_results()
 
 # =========================================================
 # HEADER
@@ -268,6 +256,37 @@ Select forecasting lens & diagnostics to explore predictive risk regimes.
 </div>
 """, unsafe_allow_html=True)
 
+GARCH_SOURCES = {"GARCH(1,1)": "GARCH", "GJR-GARCH(1,1)": "GJR-GARCH"}
+
+forecast_source = st.sidebar.radio(
+    "Forecast Source",
+    ["Notebook Snapshot", "Model Registry", *GARCH_SOURCES]
+)
+
+if forecast_source == "Model Registry":
+    service = load_forecast_service()
+    registry = service.registry
+    as_of = st.sidebar.date_input(
+        "As-Of Date",
+        value=service.dates[-1].date(),
+        min_value=service.first_complete_date.date(),
+        max_value=service.dates[-1].date()
+    )
+    df = service.forecast_table(as_of)
+    # version 0: no saved registry yet, fitted in memory for this panel
+    model_label = f"v{registry.version}" if registry.version else "fitted in memory"
+    st.sidebar.caption(
+        f"Models {model_label} · trained on "
+        f"{pd.Timestamp(registry.train_start.min()):%Y-%m-%d} → "
+        f"{pd.Timestamp(registry.train_end.max()):%Y-%m-%d}"
+    )
+elif forecast_source in GARCH_SOURCES:
+    df = load_garch_results(GARCH_SOURCES[forecast_source])
+    st.sidebar.caption(
+        f"Conditional-variance model · median persistence "
+        f"{df['Persistence'].median():.3f} · half-life {df['Half_Life_Days'].median():.0f} days"
+    )
+
 selected_stock = st.sidebar.selectbox(
     "Stock Selection",
     sorted(df["Ticker"].unique())
@@ -279,6 +298,7 @@ view_mode = st.sidebar.radio(
         "Single Stock Forecast",
         "Cross-Stock Risk Map",
         "Model Accuracy Diagnostics",
+        "Walk-Forward Backtest",
         "Uncertainty Decomposition"
     ]
 )
@@ -385,6 +405,91 @@ if view_mode == "Single Stock Forecast":
     </div>
     """, unsafe_allow_html=True)
 
+    if forecast_source == "Model Registry":
+
+        st.markdown("""
+        <div class="section-header">
+            <div class="section-title">FORECAST HISTORY</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        hist = service.history(selected_stock)
+        fig = go.Figure(go.Scatter(
+            x=hist["Date"], y=hist["Predicted_5D_Vol"] * 100,
+            mode="lines", line=dict(color="#ffa500", width=2),
+            name="Predicted 5D Vol"
+        ))
+
+        fig.add_vline(x=row["As_Of"], line_color="#ff4444", line_dash="dash", line_width=2)
+
+        i = registry.tickers.index(selected_stock)
+        fig.add_vrect(
+            x0=pd.Timestamp(registry.train_start[i]), x1=pd.Timestamp(registry.train_end[i]),
+            fillcolor="rgba(255,255,255,0.05)", line_width=0,
+            annotation_text="Training Window", annotation_position="top left"
+        )
+
+        fig.update_layout(
+            template="plotly_dark",
+            height=380,
+            yaxis_title="Predicted 5-Day Volatility (%)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)"
+        )
+
+        st.plotly_chart(fig, width='stretch')
+
+        st.markdown("""
+        <div class="explain-box">
+        ⭐ <b>How to Read:</b><br>
+        The registry model scored on every date of the current panel; the red dashed line is the as-of date shown above.<br>
+        Dates inside the shaded training window are in-sample. Days added since training are genuine fresh forecasts.
+        </div>
+        """, unsafe_allow_html=True)
+
+    elif forecast_source in GARCH_SOURCES:
+
+        st.markdown("""
+        <div class="section-header">
+            <div class="section-title">VOLATILITY TERM STRUCTURE</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        horizons = list(GARCH_HORIZONS)
+        term = [row[f"Predicted_{h}D_Vol"] * 100 for h in horizons]
+        long_run = np.sqrt(row["Omega"] / (1 - row["Persistence"])) * 100
+
+        fig = go.Figure(go.Scatter(
+            x=horizons, y=term,
+            mode="lines+markers", line=dict(color="#ffa500", width=3),
+            marker=dict(size=10),
+            name="Avg. Daily Vol over Horizon"
+        ))
+
+        fig.add_hline(
+            y=long_run, line_color="#00d4ff", line_dash="dash",
+            annotation_text="Long-Run Vol", annotation_position="bottom right"
+        )
+
+        fig.update_layout(
+            template="plotly_dark",
+            height=380,
+            xaxis_title="Horizon (Trading Days)",
+            yaxis_title="Daily Volatility (%)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)"
+        )
+
+        st.plotly_chart(fig, width='stretch')
+
+        st.markdown(f"""
+        <div class="explain-box">
+        ⭐ <b>How to Read:</b><br>
+        Expected average daily volatility over the next 1–20 trading days from the fitted {forecast_source} model.<br>
+        Today’s volatility decays toward the long-run level (dashed line); with persistence {row['Persistence']:.3f}, half of the gap closes in about {row['Half_Life_Days']:.0f} days.
+        </div>
+        """, unsafe_allow_html=True)
+
 # =========================================================
 # VIEW 2: CROSS-STOCK MAP
 # =========================================================
@@ -396,10 +501,10 @@ elif view_mode == "Cross-Stock Risk Map":
     </div>
     """, unsafe_allow_html=True)
 
-    df["Bubble"] = (df["Predicted_5D_Vol"] * 1000).clip(lower=8)
+    map_df = df.assign(Bubble=(df["Predicted_5D_Vol"] * 1000).clip(lower=8))
 
     fig = px.scatter(
-        df,
+        map_df,
         x="Predicted_5D_Vol",
         y="RMSE",
         size="Bubble",
@@ -473,7 +578,93 @@ elif view_mode == "Model Accuracy Diagnostics":
     """, unsafe_allow_html=True)
 
 # =========================================================
-# VIEW 4: UNCERTAINTY
+# VIEW 4: WALK-FORWARD BACKTEST
+# =========================================================
+elif view_mode == "Walk-Forward Backtest":
+
+    st.markdown("""
+    <div class="section-header">
+        <div class="section-title">WALK-FORWARD FORECAST VS REALIZED</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    wf_result, wf_summary = load_walk_forward()
+    wf = backtest_frame(wf_result, selected_stock)
+    wf_row = wf_summary[wf_summary["Ticker"] == selected_stock].iloc[0]
+
+    w1, w2, w3, w4 = st.columns(4)
+    for col, label, value, sub in [
+        (w1, "WALK-FORWARD RMSE", f"{wf_row['WF_RMSE']:.4f}", f"vs {rmse:.4f} on 80/20 split"),
+        (w2, "WALK-FORWARD MAE", f"{wf_row['WF_MAE']:.4f}", "Mean Absolute Error"),
+        (w3, "FORECAST BIAS", f"{wf_row['WF_Bias'] * 100:+.2f}%", "Forecast − Realized"),
+        (w4, "DIRECTION HIT RATE", f"{wf_row['Direction_Hit_Rate'] * 100:.1f}%", f"{int(wf_row['Forecasts'])} Out-of-Sample Days"),
+    ]:
+        col.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-label">{label}</div>
+            <div class="metric-value">{value}</div>
+            <div class="metric-sub">{sub}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=wf["Date"], y=wf["Realized"] * 100,
+        mode="lines", line=dict(color="#00d4ff", width=2),
+        name="Realized 5D Vol"
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=wf["Date"], y=wf["Forecast"] * 100,
+        mode="lines", line=dict(color="#ffa500", width=2, dash="dot"),
+        name="Walk-Forward Forecast"
+    ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        height=440,
+        yaxis_title="5-Day Volatility (%)",
+        hovermode="x unified",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)"
+    )
+
+    st.plotly_chart(fig, width='stretch')
+
+    fig = px.scatter(
+        wf_summary.merge(df[["Ticker", "RMSE"]], on="Ticker"),
+        x="RMSE",
+        y="WF_RMSE",
+        hover_name="Ticker",
+        color="Direction_Hit_Rate",
+        color_continuous_scale="RdYlGn",
+        template="plotly_dark",
+        height=420,
+        labels={"RMSE": "80/20 Split RMSE", "WF_RMSE": "Walk-Forward RMSE"}
+    )
+
+    top = float(np.nanmax(wf_summary["WF_RMSE"]))
+    fig.add_shape(type="line", x0=0, y0=0, x1=top, y1=top, line=dict(color="#8b8d91", dash="dash"))
+
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)"
+    )
+
+    st.plotly_chart(fig, width='stretch')
+
+    st.markdown("""
+    <div class="explain-box">
+    ⭐ <b>How to Read:</b><br>
+    Every point on the orange line is a genuine out-of-sample forecast: the model only learned from days whose 5-day outcome was already known.<br>
+    It starts from a fit on the first 60 usable days and absorbs one new day at a time by recursive least squares.<br><br>
+    The scatter compares each stock’s walk-forward error with the single 80/20 split; points above the dashed line did worse when evaluated on every date.
+    </div>
+    """, unsafe_allow_html=True)
+
+# =========================================================
+# VIEW 5: UNCERTAINTY
 # =========================================================
 else:
 
@@ -483,13 +674,13 @@ else:
     </div>
     """, unsafe_allow_html=True)
 
-    df["Uncertainty_%"] = (
+    unc_df = df.assign(**{"Uncertainty_%": (
         (df["Price_Upper_68"] - df["Price_Lower_68"]) /
         df["Latest_Price"]
-    ) * 100
+    ) * 100})
 
     fig = px.bar(
-        df.sort_values("Uncertainty_%", ascending=False).head(15),
+        unc_df.sort_values("Uncertainty_%", ascending=False).head(15),
         x="Ticker",
         y="Uncertainty_%",
         color="Uncertainty_%",
@@ -3,15 +3,17 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import os
 
-BASE_DIR = os.path.dirname(
-    os.path.dirname(
-        os.path.dirname(os.path.abspath(__file__))
-    )
+from core.data import (
+    load_live_regimes,
+    load_portfolio_vol,
+    load_regime_hmm,
+    load_returns,
+    load_risk_engine,
+    load_weights,
 )
-
-DATA_DIR = os.path.join(BASE_DIR, "Data")
+from core.hmm import state_labels
+from core.regime import regime_frame
 
 
 # ============================================================
@@ -139,27 +141,8 @@ section[data-testid="stSidebar"] {
 # ============================================================
 # LOAD DATA
 # ============================================================
-@st.cache_data
-def load_data():
-    weights = pd.read_csv(
-        os.path.join(DATA_DIR, "portfolio_weights_percentage.csv")
-    )
-
-    corr = pd.read_csv(
-        os.path.join(DATA_DIR, "stock_return_correlation_matrix.csv"),
-        index_col=0
-    )
-
-    port_vol = pd.read_csv(
-        os.path.join(DATA_DIR, "portfolio_volatility_all_stocks.csv")
-    )
-
-    port_vol["Date"] = pd.to_datetime(port_vol["Date"])
-
-    return weights, corr, port_vol
-
-
-weights_df, corr_df, port_vol_df = load_data()
+weights_df = load_weights()
+port_vol_df = load_portfolio_vol()
 
 # =========================================================
 # TERMINAL HEADER
@@ -184,10 +167,35 @@ st.sidebar.markdown("""
 
 mode = st.sidebar.radio(
     "Select Analysis Dimension",
-    ["Market Risk Regime Detection", "Portfolio Risk Contribution"],
+    ["Market Risk Regime Detection", "Markov Regime Model (HMM)", "Portfolio Risk Contribution"],
     label_visibility="collapsed"
 )
 
+if mode == "Market Risk Regime Detection":
+    threshold_mode = st.sidebar.radio(
+        "Regime Thresholds",
+        ["In-Sample Quantiles", "Expanding (No Lookahead)", "Rolling Window"],
+        help="Online modes label each day only from volatility observed before it."
+    )
+    regime_window = (
+        st.sidebar.slider("Threshold Window (days)", 20, 120, 60)
+        if threshold_mode == "Rolling Window" else None
+    )
+
+if mode == "Markov Regime Model (HMM)":
+    n_states = st.sidebar.slider("Hidden States (K)", 2, 4, 3)
+    prob_mode = st.sidebar.radio(
+        "Regime Probabilities",
+        ["Filtered (No Lookahead)", "Smoothed (Full Sample)"]
+    )
+
+if mode == "Portfolio Risk Contribution":
+    cov_model = st.sidebar.radio("Covariance Model", ["Full Correlation", "PCA Factor Model"])
+    if cov_model == "PCA Factor Model":
+        risk_engine = load_risk_engine("factor", st.sidebar.slider("Factors (K)", 1, 20, 5))
+    else:
+        risk_engine = load_risk_engine()
+
 st.sidebar.markdown("""
 <div class="sidebar-box">
 <div style="font-size:11px; color:#8b8d91;">
@@ -203,17 +211,17 @@ Used to identify WHEN market risk shifts and WHO drives volatility.
 if mode == "Market Risk Regime Detection":
 
     # --- Calculations ---
-    vol_series = port_vol_df.copy()
-    vol_values = vol_series["Portfolio_All_20d_Volatility"]
-    low_q = vol_values.quantile(0.33)
-    high_q = vol_values.quantile(0.66)
-
-    def classify_regime(v):
-        if v <= low_q: return "Low Risk"
-        elif v <= high_q: return "Medium Risk"
-        else: return "High Risk"
-
-    vol_series["Risk_Regime"] = vol_values.apply(classify_regime)
+    regime_mode = {
+        "In-Sample Quantiles": "full",
+        "Expanding (No Lookahead)": "expanding",
+        "Rolling Window": "rolling",
+    }[threshold_mode]
+    vol_series = regime_frame(
+        port_vol_df["Date"],
+        port_vol_df["Portfolio_All_20d_Volatility"],
+        regime_mode,
+        regime_window
+    ).rename(columns={"Value": "Portfolio_All_20d_Volatility"})
     current = vol_series.iloc[-1]
 
     # --- Metrics ---
@@ -236,8 +244,15 @@ if mode == "Market Risk Regime Detection":
         vol_series, x="Date", y="Portfolio_All_20d_Volatility",
         template="plotly_dark", color_discrete_sequence=["#ffa500"]
     )
-    line_fig.add_hline(y=low_q, line_dash="dash", line_color="#00ff88", annotation_text="Low Threshold")
-    line_fig.add_hline(y=high_q, line_dash="dash", line_color="#ff4444", annotation_text="High Threshold")
+    if regime_mode == "full":
+        line_fig.add_hline(y=current["Low_Threshold"], line_dash="dash", line_color="#00ff88", annotation_text="Low Threshold")
+        line_fig.add_hline(y=current["High_Threshold"], line_dash="dash", line_color="#ff4444", annotation_text="High Threshold")
+    else:
+        for col, color in [("Low_Threshold", "#00ff88"), ("High_Threshold", "#ff4444")]:
+            line_fig.add_trace(go.Scatter(
+                x=vol_series["Date"], y=vol_series[col], name=col.replace("_", " "),
+                line=dict(color=color, dash="dash", width=1.5)
+            ))
     line_fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", height=500)
     st.plotly_chart(line_fig, width='stretch')
 
@@ -248,35 +263,126 @@ if mode == "Market Risk Regime Detection":
     pie_fig = px.pie(
         regime_dist, names="Risk_Regime", values="Count",
         color="Risk_Regime",
-        color_discrete_map={"Low Risk": "#00FF9C", "Medium Risk": "#FFD166", "High Risk": "#EF476F"},
+        color_discrete_map={"Low Risk": "#00FF9C", "Medium Risk": "#FFD166", "High Risk": "#EF476F", "Warming Up": "#8b8d91"},
         template="plotly_dark", hole=0.4
     )
     pie_fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
     st.plotly_chart(pie_fig, width='stretch')
 
-    st.markdown("""<div class="explain-box">⭐ <b>Analyst Note:</b> Risk regimes are adaptive. Thresholds shift based on historical volatility quantiles rather than fixed numbers.</div>""", unsafe_allow_html=True)
+    # --- Live per-stock regimes ---
+    live_df = load_live_regimes()
+    live_as_of = live_df["As_Of"].iloc[0]
+    st.markdown(f'<div class="section-header"><div class="section-title">Live Stock Regimes · {live_as_of:%Y-%m-%d}</div></div>', unsafe_allow_html=True)
+
+    l1, l2 = st.columns([1, 2])
+    with l1:
+        live_counts = live_df["Risk_Regime"].value_counts()
+        for label, color in [("High Risk", "#EF476F"), ("Medium Risk", "#FFD166"), ("Low Risk", "#00FF9C")]:
+            st.markdown(f"""<div class="metric-card"><div class="metric-label">{label.upper()} STOCKS</div>
+            <div class="metric-value" style="color:{color};">{int(live_counts.get(label, 0))}</div></div>""", unsafe_allow_html=True)
+    with l2:
+        pct_cols = ["20d Volatility", "Low_Threshold", "High_Threshold"]
+        live_table = live_df.drop(columns="As_Of").sort_values("20d Volatility", ascending=False)
+        live_table[pct_cols] = live_table[pct_cols] * 100
+        st.dataframe(
+            live_table.style.format({c: "{:.2f}%" for c in pct_cols}),
+            width='stretch', height=420, hide_index=True
+        )
+
+    st.markdown("""<div class="explain-box">⭐ <b>Analyst Note:</b> Risk regimes are adaptive. Thresholds shift based on historical volatility quantiles rather than fixed numbers. Expanding and rolling modes classify each day only against volatility observed before it, so past labels never change as new data arrives. Live stock regimes bin each stock's latest 20d volatility from the online rolling state against that stock's own volatility history.</div>""", unsafe_allow_html=True)
+
+# ============================================================
+# PART 3: MARKOV REGIME MODEL
+# ============================================================
+elif mode == "Markov Regime Model (HMM)":
+
+    # --- Calculations ---
+    hmm, hmm_returns, hmm_filtered = load_regime_hmm(n_states)
+    labels = state_labels(n_states)
+    probs = hmm.smoothed(hmm_returns) if prob_mode.startswith("Smoothed") else hmm_filtered
+    filtered_now = hmm_filtered[:, -1]
+    hmm_dates = load_returns().index
+
+    port_probs = pd.DataFrame(probs[0], columns=labels).assign(Date=hmm_dates)
+    current_state = int(filtered_now[0].argmax())
+    durations = hmm.expected_durations()
+    stationary = hmm.stationary()
+
+    # --- Metrics ---
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.markdown(f"""<div class="metric-card"><div class="metric-label">CURRENT REGIME (FILTERED)</div>
+        <div class="metric-value">{labels[current_state]}</div></div>""", unsafe_allow_html=True)
+    with c2:
+        st.markdown(f"""<div class="metric-card"><div class="metric-label">REGIME PROBABILITY</div>
+        <div class="metric-value">{filtered_now[0, current_state]*100:.1f}%</div></div>""", unsafe_allow_html=True)
+    with c3:
+        st.markdown(f"""<div class="metric-card"><div class="metric-label">EXPECTED DURATION</div>
+        <div class="metric-value">{durations[0, current_state]:.1f} days</div></div>""", unsafe_allow_html=True)
+
+    # --- Probability timeline ---
+    st.markdown('<div class="section-header"><div class="section-title">Portfolio Regime Probabilities</div></div>', unsafe_allow_html=True)
+    regime_colors = dict(zip(labels, px.colors.sample_colorscale("RdYlGn_r", n_states)))
+    prob_fig = px.area(
+        port_probs, x="Date", y=list(labels),
+        template="plotly_dark", color_discrete_map=regime_colors
+    )
+    prob_fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", height=460,
+        yaxis_title="Probability", legend_title_text="Regime"
+    )
+    st.plotly_chart(prob_fig, width='stretch')
+
+    # --- Transition matrix & state profile ---
+    st.markdown('<div class="section-header"><div class="section-title">Transition Matrix & State Profile</div></div>', unsafe_allow_html=True)
+    t1, t2 = st.columns([1, 1])
+    with t1:
+        trans_fig = px.imshow(
+            hmm.A[0], x=list(labels), y=list(labels), text_auto=".2f",
+            color_continuous_scale="Oranges", zmin=0, zmax=1, template="plotly_dark",
+            labels=dict(x="To", y="From", color="P")
+        )
+        trans_fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", height=380)
+        st.plotly_chart(trans_fig, width='stretch')
+    with t2:
+        state_df = pd.DataFrame({
+            "Regime": labels,
+            "Ann. Volatility (%)": np.sqrt(hmm.var[0] * 252) * 100,
+            "Mean Daily Return (%)": hmm.mu[0] * 100,
+            "Expected Days": durations[0],
+            "Long-Run Share (%)": stationary[0] * 100,
+            "Now (%)": filtered_now[0] * 100,
+        })
+        st.dataframe(state_df.style.format({c: "{:.2f}" for c in state_df.columns[1:]}), width='stretch', hide_index=True)
+
+    # --- Cross-section: every stock fitted in the same batch ---
+    st.markdown('<div class="section-header"><div class="section-title">Stock Regimes (Batched Fit)</div></div>', unsafe_allow_html=True)
+    stock_state = filtered_now[1:].argmax(axis=1)
+    stock_df = pd.DataFrame({
+        "Stock": hmm.names[1:],
+        "Current Regime": np.array(labels)[stock_state],
+        "Probability (%)": filtered_now[1:].max(axis=1) * 100,
+        f"P({labels[-1]}) (%)": filtered_now[1:, -1] * 100,
+        "Turbulent Ann. Vol (%)": np.sqrt(hmm.var[1:, -1] * 252) * 100,
+        "Expected Days in Regime": durations[1:][np.arange(len(stock_state)), stock_state],
+    }).sort_values(f"P({labels[-1]}) (%)", ascending=False)
+    st.dataframe(stock_df.style.format({c: "{:.2f}" for c in stock_df.columns[2:]}), width='stretch', height=420, hide_index=True)
+
+    st.markdown("""<div class="explain-box">⭐ <b>Analyst Note:</b> Each series is modelled as switching between hidden Gaussian return regimes ordered from calm to turbulent. Filtered probabilities use only returns up to each day, so they are what a live desk would have seen; smoothed probabilities use the full sample. Expected duration is 1 / (1 − probability of staying), from the diagonal of the transition matrix.</div>""", unsafe_allow_html=True)
 
 # ============================================================
 # PART 2: RISK CONTRIBUTION BREAKDOWN
 # ============================================================
 else:
     # --- Math Prep ---
-    df = weights_df.copy()
-    df["Weight"] = df["Portfolio_Weight_Percent"] / 100
-    vols = df.set_index("Stock")["Avg_20D_Volatility"]
-    corr = corr_df.loc[vols.index, vols.index]
-    cov_matrix = np.outer(vols, vols) * corr.values
-    weights = df.set_index("Stock")["Weight"].values
-    
-    portfolio_vol = np.sqrt(weights.T @ cov_matrix @ weights)
-    marginal_contrib = (cov_matrix @ weights) / portfolio_vol
-    total_contrib = weights * marginal_contrib
+    risk = risk_engine.decompose(weights_df["Portfolio_Weight_Percent"].to_numpy() / 100)
+    portfolio_vol = risk["portfolio_vol"]
 
     contrib_df = pd.DataFrame({
-        "Stock": vols.index,
-        "Weight (%)": weights * 100,
-        "Volatility": vols.values,
-        "Risk Contribution %": total_contrib / total_contrib.sum() * 100
+        "Stock": risk["table"]["Stock"],
+        "Weight (%)": risk["table"]["Weight"] * 100,
+        "Volatility": risk["table"]["Volatility"],
+        "Risk Contribution %": risk["table"]["Contribution_%"]
     }).sort_values("Risk Contribution %", ascending=False)
 
     # --- Metrics ---
@@ -0,0 +1,31 @@
+# =========================================================
+# SHARED FIXTURES
+# The committed clean panel, parsed once per test session. The
+# cube is written to a temporary directory, so the suite never
+# touches the derived stores under Data/.
+# Run from Dashboard/: python -m pytest tests
+# =========================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.cube import open_cube, write_cube
+from core.paths import CLEAN_PANEL_CSV
+from core.schema import DATE_COL
+
+
+@pytest.fixture(scope="session")
+def panel():
+    return pd.read_csv(CLEAN_PANEL_CSV, parse_dates=[DATE_COL])
+
+
+@pytest.fixture(scope="session")
+def cube(panel, tmp_path_factory):
+    return open_cube(write_cube(panel, str(tmp_path_factory.mktemp("panel_cube"))))
+
+
+@pytest.fixture(scope="session")
+def returns(cube):
+    """(T, N) Daily Return panel; row 0 is all NaN."""
+    return np.asarray(cube.field("Daily Return"))
@@ -0,0 +1,27 @@
+import numpy as np
+
+from core.beta import equal_weight_returns, rolling_beta
+
+
+def test_rolling_beta_matches_polyfit(returns):
+    y = returns[:, :15]
+    x = equal_weight_returns(returns)
+    out = rolling_beta(y, x, windows=(60,))
+
+    for t in (59, 200, len(y) - 1):
+        rows = slice(t - 59, t + 1)
+        for j in range(y.shape[1]):
+            ok = ~np.isnan(y[rows, j]) & ~np.isnan(x[rows])
+            if ok.sum() < 48:
+                assert np.isnan(out["beta"][0, t, j])
+                continue
+            xs, ys = x[rows][ok], y[rows, j][ok]
+            slope, intercept = np.polyfit(xs, ys, 1)
+            assert np.isclose(out["beta"][0, t, j], slope)
+            assert np.isclose(out["alpha"][0, t, j], intercept, atol=1e-12)
+            assert np.isclose(out["corr"][0, t, j], np.corrcoef(xs, ys)[0, 1])
+
+
+def test_short_history_is_nan(returns):
+    out = rolling_beta(returns[:, :3], windows=(20,))
+    assert np.isnan(out["beta"][0, :19]).all()
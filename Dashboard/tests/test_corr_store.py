@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from core.corr_store import open_corr_store, read_corr_store, write_corr_store
+from core.paths import CORR_CSV
+
+
+def test_dense_round_trips_to_csv(tmp_path):
+    corr = pd.read_csv(CORR_CSV, index_col=0)
+    store = open_corr_store(write_corr_store(corr, str(tmp_path)))
+
+    # float32 packing: ~7 significant digits
+    pd.testing.assert_frame_equal(store.dense(), corr, check_exact=False, atol=1e-6)
+
+
+def test_block_and_pair_match_dense(tmp_path):
+    corr = pd.read_csv(CORR_CSV, index_col=0)
+    store = open_corr_store(write_corr_store(corr, str(tmp_path)))
+    rows, cols = list(corr.index[[7, 2, 30]]), list(corr.index[[0, 30, 11, 5]])
+
+    dense = store.dense()
+    pd.testing.assert_frame_equal(store.block(rows, cols), dense.loc[rows, cols])
+    assert store.pair(rows[0], cols[2]) == dense.loc[rows[0], cols[2]]
+
+
+def test_rewrite_publishes_one_data_file(tmp_path):
+    corr = pd.read_csv(CORR_CSV, index_col=0)
+    old = open_corr_store(write_corr_store(corr, str(tmp_path)))
+    write_corr_store(corr * 0.5 + np.eye(len(corr)) * 0.5, str(tmp_path))
+
+    assert sum(p.suffix == ".f4" for p in tmp_path.iterdir()) == 1
+    assert old.pair(corr.index[0], corr.index[1]) == np.float32(corr.iloc[0, 1])
+
+
+def test_read_corr_store_packs_in_memory(tmp_path):
+    store = read_corr_store(CORR_CSV, str(tmp_path / "corr_store"))
+    assert not store.packed.flags.writeable
+    assert not (tmp_path / "corr_store").exists()
+    assert np.allclose(store.dense(), pd.read_csv(CORR_CSV, index_col=0), atol=1e-6)
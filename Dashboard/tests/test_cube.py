@@ -0,0 +1,50 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from core.cube import append_cube, open_cube, panel_to_cube, read_cube, write_cube
+from core.paths import CLEAN_PANEL_CSV
+from core.schema import DATE_COL
+
+
+def test_round_trip(panel, tmp_path):
+    cube = open_cube(write_cube(panel, str(tmp_path)))
+    values, tickers, fields = panel_to_cube(panel)
+
+    assert cube.tickers == tickers and cube.fields == fields
+    np.testing.assert_array_equal(np.asarray(cube.values), values)
+    np.testing.assert_array_equal(cube.dates, pd.to_datetime(panel[DATE_COL]).to_numpy())
+
+
+def test_append_matches_full_write(panel, tmp_path):
+    head = open_cube(write_cube(panel.iloc[:200], str(tmp_path)))
+    values, _, _ = panel_to_cube(panel.iloc[200:], head.tickers, head.fields)
+    append_cube(values, panel[DATE_COL].iloc[200:], str(tmp_path))
+
+    full = open_cube(str(tmp_path))
+    want, _, _ = panel_to_cube(panel, head.tickers, head.fields)
+    np.testing.assert_array_equal(np.asarray(full.values), want)
+    assert len(full.dates) == len(panel)
+
+
+def test_rewrite_leaves_open_maps_intact(panel, tmp_path):
+    old = open_cube(write_cube(panel, str(tmp_path)))
+    before = np.array(old.values)
+
+    write_cube(panel.iloc[:100], str(tmp_path))
+
+    np.testing.assert_array_equal(np.asarray(old.values), before)
+    assert open_cube(str(tmp_path)).shape[0] == 100
+
+
+def test_read_cube_builds_in_memory_without_writing(panel, tmp_path):
+    csv = tmp_path / "clean.csv"
+    shutil.copy(CLEAN_PANEL_CSV, csv)
+    cube_dir = tmp_path / "panel_cube"
+
+    cube = read_cube(str(csv), str(cube_dir))
+    want, _, _ = panel_to_cube(panel)
+    np.testing.assert_array_equal(cube.values, want)
+    assert not cube.values.flags.writeable
+    assert not cube_dir.exists()
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data import _frozen, load_correlation, load_returns, load_weights
+
+
+def test_frozen_numeric_columns_are_read_only():
+    df = pd.DataFrame({"Stock": ["A", "B"], "w": [0.4, 0.6], "n": [1, 2]})
+    out = _frozen(df)
+    pd.testing.assert_frame_equal(out, df)
+    for col in ("w", "n"):
+        with pytest.raises(ValueError):
+            out[col].to_numpy()[0] = 0
+    # the source frame is untouched and still writable
+    df.loc[0, "w"] = 1.0
+
+
+def test_loaders_share_one_copy():
+    assert load_weights() is load_weights()
+    assert load_returns() is load_returns()
+    corr = load_correlation()
+    assert corr is load_correlation()
+    assert np.allclose(np.diag(corr), 1.0, atol=1e-6)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from core.drawdown import drawdown_stats
+
+
+def _brute_force(r):
+    """One column, one day at a time."""
+    wealth, peak, peak_row = 1.0, 1.0, 0
+    max_dd, trough, dd_peak = 0.0, 0, 0
+    spell, longest = 0, 0
+    curve = [1.0]
+    for t, x in enumerate(r, start=1):
+        wealth *= 1.0 + (0.0 if np.isnan(x) else x)
+        curve.append(wealth)
+        if wealth >= peak:
+            peak, peak_row, spell = wealth, t, 0
+        else:
+            spell += 1
+        longest = max(longest, spell)
+        dd = 1.0 - wealth / peak
+        if dd > max_dd:
+            max_dd, trough, dd_peak = dd, t, peak_row
+
+    recovery = next(
+        (t for t in range(trough, len(curve)) if curve[t] >= curve[dd_peak]), -1
+    )
+    return max_dd, 1.0 - wealth / peak, dd_peak, trough, recovery, longest
+
+
+def test_matches_brute_force(returns):
+    x = returns[:, ::7]
+    s = drawdown_stats(x)
+    for j in range(x.shape[1]):
+        max_dd, current, peak, trough, recovery, longest = _brute_force(x[:, j])
+        assert np.isclose(s["max_drawdown"][j], max_dd)
+        assert np.isclose(s["current_drawdown"][j], current)
+        assert (s["peak"][j], s["trough"][j]) == (peak, trough)
+        assert s["recovery"][j] == recovery
+        assert s["longest"][j] == longest
+
+
+def test_recovered_drawdown():
+    s = drawdown_stats(np.array([0.1, -0.5, 0.2, 1.0, -0.1]))
+    assert np.isclose(s["max_drawdown"][0], 0.5)
+    assert (s["peak"][0], s["trough"][0], s["recovery"][0]) == (1, 2, 4)
+    assert s["longest"][0] == 2
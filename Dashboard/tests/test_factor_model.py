@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from core.factor_model import MIN_IDIO, FactorModel, FactorRiskEngine
+from core.risk import covariance_matrix
+
+
+@pytest.fixture(scope="module")
+def panel():
+    rng = np.random.default_rng(0)
+    mix = rng.standard_normal((6, 6))
+    return rng.standard_normal((300, 6)) @ mix * 0.01
+
+
+def test_all_factors_reproduce_sample_correlation(panel):
+    model = FactorModel.fit(panel, list("ABCDEF"), n_factors=6)
+    want = np.corrcoef(panel, rowvar=False) + MIN_IDIO * np.eye(6)
+    np.testing.assert_allclose(model.correlation(), want, atol=1e-10)
+    assert np.isclose(model.explained.sum(), 1)
+
+
+def test_engine_products_match_dense_covariance(panel, tmp_path):
+    model = FactorModel.fit(panel, list("ABCDEF"), n_factors=2)
+    model = FactorModel.load(model.save(str(tmp_path / "factor_model.npz")))
+
+    tickers = list("FBDA")
+    vols = np.array([0.02, 0.01, 0.03, 0.015])
+    engine = FactorRiskEngine(tickers, vols, model)
+    dense = covariance_matrix(vols, model.subset(tickers).correlation())
+
+    w = np.array([0.1, 0.4, 0.2, 0.3])
+    np.testing.assert_allclose(engine.cov_dot(w), dense @ w)
+    np.testing.assert_allclose(engine.cov_column(2), dense[:, 2])
+    assert np.isclose(engine.decompose(w)["portfolio_vol"], np.sqrt(w @ dense @ w))
@@ -0,0 +1,28 @@
+import numpy as np
+
+from core.garch import BatchedGARCH
+
+
+def _scalar_variance(x, mu, backcast, omega, alpha, gamma, beta):
+    h = [backcast]
+    for r in x:
+        if np.isnan(r):
+            e2, neg = backcast, 0.5
+        else:
+            e2, neg = (r - mu) ** 2, float(r < mu)
+        h.append(omega + (alpha + gamma * neg) * e2 + beta * h[-1])
+    return np.array(h)
+
+
+def test_recursion_matches_scalar_loop(returns):
+    x = returns[:, :12]
+    for asymmetric in (False, True):
+        model = BatchedGARCH(asymmetric).fit(x)
+        h = model.variance(x)
+        for j in range(x.shape[1]):
+            expected = _scalar_variance(
+                x[:, j], model.mu[j], model.backcast[j],
+                model.omega[j], model.alpha[j], model.gamma[j], model.beta[j]
+            )
+            np.testing.assert_allclose(h[:, j], expected, rtol=1e-12)
+        assert (model.persistence < 1).all()
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from core.hmm import GaussianHMM, RegimeFilter
+
+
+@pytest.fixture(scope="module")
+def fitted(returns):
+    x = returns[:, :6]
+    return GaussianHMM.fit(x, [f"S{j}" for j in range(6)], n_states=2), x
+
+
+def test_filtered_rows_are_distributions(fitted):
+    model, x = fitted
+    filtered = model.filtered(x)
+    assert filtered.shape == (6, len(x), 2)
+    np.testing.assert_allclose(filtered.sum(axis=2), 1.0)
+    np.testing.assert_allclose(model.smoothed(x).sum(axis=2), 1.0)
+    # states are ordered calm → turbulent
+    assert (np.diff(model.var, axis=1) > 0).all()
+
+
+def test_step_matches_batch_filter(fitted):
+    model, x = fitted
+    f = model.filter(x[:200])
+    for row in x[200:]:
+        f.step(row)
+    np.testing.assert_allclose(f.probabilities, model.filtered(x)[:, -1], atol=1e-12)
+
+
+def test_filter_save_load_round_trip(fitted, tmp_path):
+    model, x = fitted
+    f = model.filter(x)
+    loaded = RegimeFilter.load(f.save(str(tmp_path / "hmm_model.npz")))
+    np.testing.assert_allclose(loaded.probabilities, f.probabilities)
+    np.testing.assert_allclose(loaded.model.A, model.A)
+    assert loaded.model.names == model.names
@@ -0,0 +1,68 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.incremental import append_bars
+from core.paths import CLEAN_PANEL_CSV, DATA_DIR, PORTFOLIO_VOL_CSV
+from core.schema import DATE_COL, split_column
+
+CUT = 240
+
+# artifacts append_bars rolls forward, and the key to compare them on
+ROLLED = {
+    "clean_sp100_data.csv": "Date",
+    "stock_risk_summary.csv": "Stock",
+    "portfolio_weights_percentage.csv": "Stock",
+    "portfolio_volatility_all_stocks.csv": "Date",
+    "stock_return_correlation_matrix.csv": None,
+    "layer2_ml_results.csv": "Ticker",
+    "layer2_garch_results.csv": None,
+}
+
+
+@pytest.fixture(scope="module")
+def appended(tmp_path_factory):
+    """Data/ cut back to CUT rows, then caught up in two appends."""
+    data_dir = str(tmp_path_factory.mktemp("data"))
+    for name in os.listdir(DATA_DIR):
+        if name.endswith(".csv"):
+            shutil.copy(os.path.join(DATA_DIR, name), data_dir)
+
+    with open(CLEAN_PANEL_CSV, "rb") as f:
+        lines = f.read().split(b"\r\n")
+    with open(os.path.join(data_dir, os.path.basename(CLEAN_PANEL_CSV)), "wb") as f:
+        f.write(b"\r\n".join(lines[:CUT + 1]) + b"\r\n")
+
+    full = pd.read_csv(CLEAN_PANEL_CSV)
+    port_vol = pd.read_csv(PORTFOLIO_VOL_CSV)
+    port_vol[pd.to_datetime(port_vol["Date"]) < pd.to_datetime(full[DATE_COL][CUT])].to_csv(
+        os.path.join(data_dir, os.path.basename(PORTFOLIO_VOL_CSV)), index=False, lineterminator="\r\n"
+    )
+
+    raw = {"Close", "High", "Low", "Open", "Volume"}
+    bars = full.iloc[CUT:][[DATE_COL] + [c for c in full.columns if c != DATE_COL and split_column(c)[1] in raw]]
+    assert append_bars(bars.iloc[:6], data_dir) == 6
+    assert append_bars(bars.iloc[6:], data_dir) == len(bars) - 6
+    return data_dir
+
+
+@pytest.mark.parametrize("name", list(ROLLED))
+def test_append_matches_full_build(appended, name):
+    got = pd.read_csv(os.path.join(appended, name))
+    want = pd.read_csv(os.path.join(DATA_DIR, name))
+    key = ROLLED[name]
+    if key is not None:
+        # equal scores may land in either order
+        got = got.sort_values(key, kind="stable").reset_index(drop=True)
+        want = want.sort_values(key, kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False, rtol=1e-8, atol=1e-10)
+
+
+def test_state_written_for_current_panel(appended):
+    from core.manifest import file_hash
+
+    with np.load(os.path.join(appended, "incremental_state.npz")) as state:
+        assert str(state["source_hash"]) == file_hash(os.path.join(appended, "clean_sp100_data.csv"))
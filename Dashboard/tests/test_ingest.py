@@ -0,0 +1,35 @@
+import os
+
+import pandas as pd
+
+from core.cube import open_cube
+from core.ingest import ingest_raw_panel, read_raw_panel
+from core.manifest import is_current
+from core.panel_store import load_panel
+from core.paths import CLEAN_PANEL_CSV
+
+
+def test_raw_panel_matches_clean_csv():
+    clean = pd.read_csv(CLEAN_PANEL_CSV, parse_dates=["Date"])
+    pd.testing.assert_frame_equal(read_raw_panel(), clean, check_dtype=False)
+
+
+def test_ingest_writes_clean_csv(tmp_path):
+    out = tmp_path / "clean_sp100_data.csv"
+    ingest_raw_panel(clean_path=str(out), build_stores=False)
+    pd.testing.assert_frame_equal(
+        pd.read_csv(out), pd.read_csv(CLEAN_PANEL_CSV), check_dtype=False
+    )
+
+
+def test_ingest_builds_stores_next_to_clean_csv(tmp_path):
+    out = str(tmp_path / "clean_sp100_data.csv")
+    panel = ingest_raw_panel(clean_path=out)
+
+    store_dir, cube_dir = str(tmp_path / "panel_store"), str(tmp_path / "panel_cube")
+    assert is_current(store_dir, out) and is_current(cube_dir, out)
+    assert open_cube(cube_dir).shape[0] == len(panel)
+    assert len(load_panel(["AAPL"], ["Close"], store_dir=store_dir)) == len(panel)
+    assert sorted(n for n in os.listdir(tmp_path) if not n.startswith("manifest.")) == [
+        "clean_sp100_data.csv", "panel_cube", "panel_store"
+    ]
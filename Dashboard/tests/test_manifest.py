@@ -0,0 +1,55 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.manifest import artifact_hash, is_current, read_manifest, record, stamp_derived
+
+
+def _write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_hash_rows_and_columns(tmp_path):
+    _write(tmp_path / "a.csv", "x,y\n1,2\n3,4\n")
+    entry = record("a.csv", data_dir=str(tmp_path))
+    assert entry["sha256"] == hashlib.sha256(b"x,y\n1,2\n3,4\n").hexdigest()
+    assert (entry["rows"], entry["columns"]) == (2, 2)
+
+
+def test_changed_file_is_rehashed(tmp_path):
+    _write(tmp_path / "a.csv", "x\n1\n")
+    before = artifact_hash("a.csv", str(tmp_path))
+    _write(tmp_path / "a.csv", "x\n1\n2\n")
+    os.utime(tmp_path / "a.csv", ns=(1, 1))
+    assert artifact_hash("a.csv", str(tmp_path)) != before
+    assert read_manifest(str(tmp_path))["a.csv"]["rows"] == 2
+
+
+def test_stamp_tracks_source_content(tmp_path):
+    _write(tmp_path / "src.csv", "x\n1\n")
+    out = tmp_path / "derived"
+    out.mkdir()
+    stamp_derived(str(out), str(tmp_path / "src.csv"))
+    assert is_current(str(out), str(tmp_path / "src.csv"))
+
+    _write(tmp_path / "src.csv", "x\n2\n")
+    os.utime(tmp_path / "src.csv", ns=(1, 1))
+    assert not is_current(str(out), str(tmp_path / "src.csv"))
+
+
+def _record_all(data_dir, names):
+    for name in names:
+        record(name, data_dir=data_dir)
+
+
+def test_concurrent_recorders_keep_every_entry(tmp_path):
+    names = [f"f{i}.csv" for i in range(40)]
+    for name in names:
+        _write(tmp_path / name, f"x\n{name}\n")
+
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_record_all, [str(tmp_path)] * 4, [names[i::4] for i in range(4)]))
+
+    assert sorted(read_manifest(str(tmp_path))) == sorted(names)
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
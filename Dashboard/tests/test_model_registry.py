@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.model_registry import ForecastService, ModelRegistry
+from core.vol_forecast import train_universe
+
+
+@pytest.fixture(scope="module")
+def registry(cube):
+    return ModelRegistry.from_fit(train_universe(cube), version=3, source_hash="abc")
+
+
+def test_save_load_round_trip(registry, tmp_path):
+    loaded = ModelRegistry.load(registry.save(str(tmp_path / "vol_model_registry.npz")))
+
+    assert loaded.tickers == registry.tickers and loaded.features == registry.features
+    assert (loaded.version, loaded.source_hash) == (3, "abc")
+    np.testing.assert_array_equal(loaded.coef, registry.coef)
+    np.testing.assert_array_equal(loaded.train_end, registry.train_end)
+
+
+def test_forecast_table_as_of_uses_rows_up_to_date(cube, registry):
+    service = ForecastService(registry, cube)
+    as_of = service.dates[150]
+    table = service.forecast_table(as_of).set_index("Ticker")
+
+    assert (table["As_Of"] <= as_of).all()
+    for ticker in table.index[::10]:
+        one = service.forecast(ticker, as_of)
+        assert one["As_Of"] == table.loc[ticker, "As_Of"]
+        assert np.isclose(one["Predicted_5D_Vol"], table.loc[ticker, "Predicted_5D_Vol"])
+        # the as-of row matches the full scored history on that date
+        hist = service.history(ticker).set_index("Date")
+        assert np.isclose(hist.loc[one["As_Of"], "Predicted_5D_Vol"], one["Predicted_5D_Vol"])
+
+
+def test_forecast_before_first_usable_row_is_none(cube, registry):
+    service = ForecastService(registry, cube)
+    assert service.forecast(registry.tickers[0], service.dates[0]) is None
+    assert service.forecast_table(service.dates[0] - pd.Timedelta(days=1)).empty
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from core.monte_carlo import MonteCarloVaR, _rescale, simulation_pool
+from core.risk import RiskEngine
+
+
+@pytest.fixture(scope="module")
+def engine():
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((8, 8))
+    cov = a @ a.T / 100
+    return RiskEngine(list("ABCDEFGH"), np.sqrt(np.diag(cov)), cov, np.zeros(8))
+
+
+def test_monte_carlo_independent_of_pool(engine):
+    mc = MonteCarloVaR.from_engine(engine)
+    w = np.full(8, 1 / 8)
+    serial = mc.run(w, n_paths=20_000, chunk_size=4_000)
+    with simulation_pool(2) as pool:
+        pooled = mc.run(w, n_paths=20_000, chunk_size=4_000, pool=pool, workers=3)
+    np.testing.assert_allclose(serial["var"], pooled["var"])
+    np.testing.assert_allclose(serial["es"], pooled["es"])
+
+
+def test_components_add_up_to_var_and_es(engine):
+    out = MonteCarloVaR.from_engine(engine).run(np.full(8, 1 / 8), n_paths=20_000)
+    np.testing.assert_allclose(out["component_var"].sum(axis=1), out["var"])
+    np.testing.assert_allclose(out["component_es"].sum(axis=1), out["es"])
+
+
+def test_zero_weights_stay_finite(engine):
+    out = MonteCarloVaR.from_engine(engine).run(np.zeros(8), n_paths=2_000)
+    assert np.isfinite(out["component_var"]).all()
+    assert np.isfinite(out["component_es"]).all()
+
+
+def test_rescale_keeps_rows_with_cancelling_sums():
+    components = np.array([[1.0, 2.0, 1.0], [1.0, -1.0, 0.0]])
+    out = _rescale(components, np.array([8.0, 3.0]))
+    np.testing.assert_allclose(out, [[2.0, 4.0, 2.0], [1.0, -1.0, 0.0]])
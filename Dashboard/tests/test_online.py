@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.online import OnlineRiskBook, RollingVolState
+
+
+@pytest.fixture(scope="module")
+def closes(cube):
+    return np.asarray(cube.field("Close"))[:, :8]
+
+
+def _streamed(cube, closes, n):
+    book = OnlineRiskBook({t: RollingVolState() for t in cube.tickers[:8]})
+    for date, row in zip(cube.dates[:n], closes[:n]):
+        book.update(date, dict(zip(cube.tickers[:8], row)))
+    return book
+
+
+@pytest.mark.parametrize("n", [25, 61, 300])
+def test_streamed_matches_batch_rolling(cube, closes, n):
+    frame = _streamed(cube, closes, n).frame()
+    for j in range(8):
+        c = pd.Series(closes[:n, j]).dropna()
+        r = c.pct_change().dropna()
+        assert np.isclose(frame["20d Volatility"][j], r.rolling(20).std().iloc[-1], equal_nan=True)
+        assert np.isclose(frame["20d MA"][j], c.rolling(20).mean().iloc[-1], equal_nan=True)
+        assert np.isclose(frame["Cumulative Return"][j], (1 + r).prod(), rtol=1e-12)
+
+
+def test_snapshot_restore_round_trip(cube, closes, tmp_path):
+    book = _streamed(cube, closes, 100)
+    restored = OnlineRiskBook.restore(book.snapshot(str(tmp_path / "online_state.npz")))
+    assert restored.as_of == book.as_of
+    pd.testing.assert_frame_equal(restored.frame(), book.frame())
+
+    # and both keep streaming identically
+    for date, row in zip(cube.dates[100:140], closes[100:140]):
+        book.update(date, dict(zip(cube.tickers[:8], row)))
+        restored.update(date, dict(zip(cube.tickers[:8], row)))
+    pd.testing.assert_frame_equal(restored.frame(), book.frame())
+
+
+def test_from_cube_matches_download_columns(cube):
+    frame = OnlineRiskBook.from_cube(cube).frame().set_index("Stock")
+    for field in ("20d Volatility", "20d MA"):
+        last = pd.DataFrame(np.asarray(cube.field(field)), columns=cube.tickers).ffill().iloc[-1]
+        np.testing.assert_allclose(frame[field], last[frame.index], rtol=1e-9)
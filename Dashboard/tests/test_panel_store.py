@@ -0,0 +1,26 @@
+import pandas as pd
+
+from core.panel_store import load_panel, panel_layout, write_panel_store
+from core.schema import DATE_COL
+
+
+def test_round_trip(panel, tmp_path):
+    write_panel_store(panel, str(tmp_path))
+    pd.testing.assert_frame_equal(load_panel(store_dir=str(tmp_path)), panel, check_dtype=False)
+
+
+def test_projected_read(panel, tmp_path):
+    write_panel_store(panel, str(tmp_path))
+    tickers = panel_layout(str(tmp_path))["tickers"][:3]
+    start, end = panel[DATE_COL].iloc[[20, 40]]
+
+    got = load_panel(tickers, ["Close", "Volume"], start, end, store_dir=str(tmp_path))
+    cols = [DATE_COL] + [f"{t}_{f}" for t in tickers for f in ("Close", "Volume")]
+    want = panel.loc[20:40, cols].reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_appended_parts_read_as_one(panel, tmp_path):
+    write_panel_store(panel.iloc[:200], str(tmp_path))
+    write_panel_store(panel.iloc[200:], str(tmp_path), part=1)
+    pd.testing.assert_frame_equal(load_panel(store_dir=str(tmp_path)), panel, check_dtype=False)
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.paths import PORTFOLIO_VOL_CSV
+from core.regime import MIN_HISTORY, REGIME_QUANTILES, classify, regime_frame, regime_thresholds
+
+
+@pytest.fixture(scope="module")
+def vol():
+    return pd.read_csv(PORTFOLIO_VOL_CSV)["Portfolio_All_20d_Volatility"].to_numpy()
+
+
+def _naive(values, window=None):
+    """Quantiles of the values strictly before each day, one day at a time."""
+    codes = []
+    for t, v in enumerate(values):
+        hist = values[:t][~np.isnan(values[:t])]
+        if window is not None:
+            hist = hist[-window:]
+        if np.isnan(v) or len(hist) < MIN_HISTORY:
+            codes.append(-1)
+            continue
+        codes.append(int((v > np.quantile(hist, REGIME_QUANTILES)).sum()))
+    return np.array(codes)
+
+
+@pytest.mark.parametrize("mode, window", [("expanding", None), ("rolling", 60)])
+def test_online_matches_naive_loop(vol, mode, window):
+    frame = regime_frame(np.arange(len(vol)), vol, mode, window)
+    np.testing.assert_array_equal(frame["Regime_Code"], _naive(vol, window))
+
+
+def test_full_mode_bins_on_in_sample_quantiles(vol):
+    frame = regime_frame(np.arange(len(vol)), vol, "full")
+    edges = regime_thresholds(vol)
+    want = np.where(np.isnan(vol), -1, (vol[:, None] > edges).sum(axis=1))
+    np.testing.assert_array_equal(frame["Regime_Code"], want)
+    np.testing.assert_array_equal(classify(vol, np.tile(edges, (len(vol), 1))), want)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.rolling import STATS, rolling_stat, rolling_stats
+
+
+@pytest.mark.parametrize("window", [5, 20, 60])
+@pytest.mark.parametrize("stat", STATS)
+def test_matches_pandas_rolling(returns, window, stat):
+    x = returns[:, :12]
+    want = getattr(pd.DataFrame(x).rolling(window), stat)().to_numpy()
+    np.testing.assert_allclose(rolling_stat(x, window, stat), want, rtol=1e-9, atol=1e-12)
+
+
+def test_skip_missing_matches_per_column_dropna(returns):
+    x = returns[:, :12].copy()
+    x[np.random.default_rng(0).random(x.shape) < 0.05] = np.nan
+
+    got = rolling_stats(x, (20,), ("std", "mean"), skip_missing=True)
+    for j in range(x.shape[1]):
+        col = pd.Series(x[:, j]).dropna()
+        for stat in ("std", "mean"):
+            want = getattr(col.rolling(20), stat)()
+            np.testing.assert_allclose(got.get(stat, 20)[col.index, j], want, rtol=1e-9, atol=1e-12)
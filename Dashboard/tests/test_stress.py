@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from core.stress import StressEngine
+
+
+@pytest.fixture(scope="module")
+def frame(cube):
+    return cube.field_frame("Daily Return").iloc[:, :10].copy()
+
+
+def test_date_range_compounds_daily_returns(frame):
+    engine = StressEngine(frame)
+    start, end = frame.index[[30, 34]]
+    got = engine.date_ranges({"window": (start, end)})
+
+    want = (1 + frame.iloc[30:35].fillna(0)).prod() - 1
+    np.testing.assert_allclose(got.shocks[0], want.to_numpy())
+    assert got.meta[0]["Days"] == 5
+
+
+def test_worst_day_matches_brute_force(frame):
+    engine = StressEngine(frame)
+    w = np.full(10, 0.1)
+    worst = engine.worst_windows(w, horizons=(1,), n=3)
+
+    daily = frame.iloc[1:].fillna(0).to_numpy() @ w
+    np.testing.assert_allclose(worst.apply(w), np.sort(daily)[:3])
+
+
+def test_worst_windows_do_not_overlap(frame):
+    worst = StressEngine(frame).worst_windows(np.full(10, 0.1), horizons=(5,), n=5)
+    spans = sorted((m["Start"], m["End"]) for m in worst.meta)
+    assert all(a[1] < b[0] for a, b in zip(spans, spans[1:]))
+
+
+def test_custom_shocks(frame):
+    engine = StressEngine(frame)
+    first = frame.columns[0]
+    got = engine.custom({"flat": -0.1, "one": {first: -0.5, "*": 0.01}})
+    assert np.all(got.shocks[0] == -0.1)
+    assert got.shocks[1][0] == -0.5 and np.all(got.shocks[1][1:] == 0.01)
+    assert got.table(np.full(10, 0.1), notional=100)["PnL"].iloc[0] == pytest.approx(-10)
@@ -0,0 +1,27 @@
+import numpy as np
+
+from core.tail_risk import LEVELS, horizon_returns, portfolio_returns, var_es
+
+
+def _naive(x, level):
+    losses = np.sort(-x[~np.isnan(x)])[::-1]
+    k = max(int(np.ceil(len(losses) * (1 - level) - 1e-9)), 1)
+    return losses[k - 1], losses[:k].mean()
+
+
+def test_var_es_match_full_sort(returns):
+    for horizon in (1, 10):
+        x = horizon_returns(returns, horizon)
+        var, es = var_es(x, LEVELS)
+        for j in range(0, x.shape[1], 5):
+            for l_i, level in enumerate(LEVELS):
+                v, e = _naive(x[:, j], level)
+                assert np.isclose(var[j, l_i], v)
+                assert np.isclose(es[j, l_i], e)
+
+
+def test_portfolio_returns_skip_empty_days(returns):
+    w = np.full(returns.shape[1], 1.0 / returns.shape[1])
+    port = portfolio_returns(returns, w)[:, 0]
+    assert np.isnan(port[0])
+    assert not np.isnan(port[1:]).any()
@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from core.train_pool import task_seed, train_tree_models
+
+KINDS = ("rf", "gbm")
+
+
+@pytest.fixture(scope="module")
+def tickers(cube):
+    pytest.importorskip("sklearn")
+    return list(cube.tickers[:3])
+
+
+def _scores(report):
+    return report["results"].set_index(["Ticker", "kind"])[["rmse", "mae", "latest_vol"]].sort_index()
+
+
+def test_same_seed_same_predictions_across_worker_counts(cube, tickers):
+    serial = train_tree_models(cube, KINDS, tickers=tickers, workers=1)
+    pooled = train_tree_models(cube, KINDS, tickers=tickers, workers=2)
+    assert pooled["workers"] == 2
+    pd.testing.assert_frame_equal(_scores(serial), _scores(pooled))
+
+
+def test_seeds_follow_the_ticker_not_its_position(cube, tickers):
+    forward = train_tree_models(cube, KINDS, tickers=tickers, workers=1)
+    backward = train_tree_models(cube, KINDS, tickers=tickers[::-1], workers=1)
+    pd.testing.assert_frame_equal(_scores(forward), _scores(backward))
+
+
+def test_task_seeds_differ_by_ticker_and_model():
+    seeds = {task_seed(42, t, k) for t in ("AAPL", "MSFT") for k in KINDS}
+    assert len(seeds) == 4
+    assert task_seed(42, "AAPL", "rf") == task_seed(42, "AAPL", "rf")
+    assert task_seed(42, "AAPL", "rf") != task_seed(7, "AAPL", "rf")
@@ -0,0 +1,16 @@
+import numpy as np
+
+from core.vol_forecast import BatchedOLS, design_tensor, split_rows
+
+
+def test_batched_ols_matches_per_ticker_lstsq(cube):
+    X, y, _, rows = design_tensor(cube)
+    train, _ = split_rows(rows)
+    model = BatchedOLS().fit(X, y, train)
+    pred = model.predict(X)
+
+    for i in range(0, X.shape[0], 7):
+        A = np.column_stack([X[i, train[i]], np.ones(train[i].sum())])
+        coef, *_ = np.linalg.lstsq(A, y[i, train[i]], rcond=None)
+        np.testing.assert_allclose(model.coef[i], coef[:-1], rtol=1e-6)
+        np.testing.assert_allclose(pred[i, train[i]], A @ coef, rtol=1e-9)
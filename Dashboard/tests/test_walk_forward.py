@@ -0,0 +1,17 @@
+import numpy as np
+
+from core.vol_forecast import design_tensor
+from core.walk_forward import walk_forward
+
+
+def test_rls_matches_batch_refit(cube):
+    result = walk_forward(cube, horizon=5)
+    X, y, _, rows = design_tensor(cube, horizon=5)
+
+    i = 0
+    t = int(np.flatnonzero(~np.isnan(result["forecast"][i]))[-1])
+    seen = rows[i] & (np.arange(rows.shape[1]) <= t - 5)
+    A = np.column_stack([np.ones(seen.sum()), X[i, seen]])
+    coef, *_ = np.linalg.lstsq(A, y[i, seen], rcond=None)
+    expected = coef[0] + X[i, t] @ coef[1:]
+    assert np.isclose(result["forecast"][i, t], expected, rtol=1e-6)